@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Pokemon Red — Pathfinding Benchmark
+
+Times find_path, find_path_to_warp and find_route over every scanned map in
+game_state/maps using seeded random start/goal pairs that are known to be
+reachable. Needs only the map files — no emulator or ROM.
+
+Each function is measured twice:
+    cold — derived search caches (routing graph, BFS/flow fields) cleared
+           before every query
+    warm — caches left in place, the server's steady state
+
+find_path is also run with algorithm="astar" and algorithm="jps" forced on
+the same queries, so the nodes-expanded gain of JPS can be checked against
+the A* baseline, and in auto mode with jps_auto=True. The "jps_auto" section
+compares that with plain auto (what the server uses): p50 speedup, and how
+many queries came back as a different (equally short) step sequence.
+
+Reported per function/mode: p50/p95/mean latency, nodes expanded per query,
+and peak allocation per query (measured in a separate tracemalloc pass so
+it doesn't skew the timings). Results are written as JSON so runs can be
+compared with --baseline.
+
+Usage:
+    python scripts/bench_pathfinder.py
+    python scripts/bench_pathfinder.py --pairs 500 --seed 7 --out /tmp/after.json
+    python scripts/bench_pathfinder.py --baseline logs/pathfinder_bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tracemalloc
+from functools import partial
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+import pathfinder
+from pathfinder import (
+    find_path, find_path_to_warp, find_route, load_all_maps, compile_map,
+    clear_caches, search_stats, reset_search_stats, _bfs_field,
+)
+
+PROJECT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT = PROJECT / "logs" / "pathfinder_bench.json"
+
+Query = Tuple[Callable, tuple]
+
+
+def _tiles(map_data: Dict[str, Any]) -> List[Tuple[int, int]]:
+    return [tuple(int(c) for c in key.split(",")) for key in map_data["tiles"]]
+
+
+def _reachable(map_data: Dict[str, Any], x: int, y: int) -> List[Tuple[int, int]]:
+    """Tiles reachable on foot from (x, y)."""
+    cm = compile_map(map_data)
+    dist, _ = _bfs_field(cm, cm.index(x, y))
+    return [cm.coords(i) for i, d in enumerate(dist) if d > 0]
+
+
+def generate_queries(maps: Dict[str, Dict[str, Any]], pairs: int,
+                     rng: random.Random) -> Dict[str, List[Tuple[str, Query]]]:
+    """Seeded (map label, (function, args)) queries per benchmarked function."""
+    names = sorted(maps)
+    queries: Dict[str, List[Tuple[str, Query]]] = {
+        "find_path": [], "find_path_to_warp": [], "find_route": [],
+    }
+
+    # find_path: every map gets its share of same-map pairs
+    per_map = max(1, pairs // len(names))
+    for name in names:
+        tiles = _tiles(maps[name])
+        for _ in range(per_map * 20):
+            if sum(1 for label, _ in queries["find_path"] if label == name) >= per_map:
+                break
+            sx, sy = rng.choice(tiles)
+            reachable = _reachable(maps[name], sx, sy)
+            if reachable:
+                gx, gy = rng.choice(reachable)
+                queries["find_path"].append((name, (find_path, (name, sx, sy, gx, gy))))
+
+    # The same pairs with each single-map algorithm forced, and with auto
+    # allowed to pick JPS
+    variants = {"astar": {"algorithm": "astar"}, "jps": {"algorithm": "jps"}, "auto+jps": {"jps_auto": True}}
+    for variant, kwargs in variants.items():
+        queries[f"find_path[{variant}]"] = [
+            (label, (partial(find_path, **kwargs), args))
+            for label, (_, args) in queries["find_path"]
+        ]
+
+    # find_path_to_warp: starts from which some warp to the target map is reachable
+    warp_targets = {
+        name: sorted({info["map_name"] for dirs in maps[name]["warps"].values() for info in dirs.values()})
+        for name in names
+    }
+    candidates = [n for n in names if warp_targets[n]]
+    for _ in range(pairs * 20):
+        if len(queries["find_path_to_warp"]) >= pairs or not candidates:
+            break
+        name = rng.choice(candidates)
+        sx, sy = rng.choice(_tiles(maps[name]))
+        target = rng.choice(warp_targets[name])
+        if find_path_to_warp(name, sx, sy, target) is not None:
+            queries["find_path_to_warp"].append((name, (find_path_to_warp, (name, sx, sy, target))))
+
+    # find_route: random cross-map pairs with an existing route
+    for _ in range(pairs * 20):
+        if len(queries["find_route"]) >= pairs:
+            break
+        a, b = rng.choice(names), rng.choice(names)
+        if a == b:
+            continue
+        sx, sy = rng.choice(_tiles(maps[a]))
+        gx, gy = rng.choice(_tiles(maps[b]))
+        if find_route(a, sx, sy, b, gx, gy) is not None:
+            queries["find_route"].append((f"{a} -> {b}", (find_route, (a, sx, sy, b, gx, gy))))
+
+    return queries
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def _summarize(latencies_us: List[float], expanded: List[int], alloc_kb: List[float]) -> Dict[str, Any]:
+    return {
+        "queries": len(latencies_us),
+        "p50_us": round(_percentile(latencies_us, 50), 2),
+        "p95_us": round(_percentile(latencies_us, 95), 2),
+        "mean_us": round(sum(latencies_us) / len(latencies_us), 2) if latencies_us else 0.0,
+        "expanded_p50": _percentile(expanded, 50),
+        "expanded_mean": round(sum(expanded) / len(expanded), 1) if expanded else 0.0,
+        "alloc_peak_kb_p50": round(_percentile(alloc_kb, 50), 2),
+        "alloc_peak_kb_p95": round(_percentile(alloc_kb, 95), 2),
+    }
+
+
+def run_queries(queries: List[Tuple[str, Query]], cold: bool) -> Dict[str, Any]:
+    """Time every query, then re-run under tracemalloc for allocation peaks."""
+    latencies: List[float] = []
+    expanded: List[int] = []
+    by_label: Dict[str, List[float]] = {}
+
+    if not cold:
+        for _, (fn, args) in queries:
+            fn(*args)  # warm-up pass
+
+    for label, (fn, args) in queries:
+        if cold:
+            clear_caches()
+        reset_search_stats()
+        t0 = time.perf_counter_ns()
+        fn(*args)
+        elapsed_us = (time.perf_counter_ns() - t0) / 1000
+        latencies.append(elapsed_us)
+        expanded.append(search_stats()["expanded"])
+        by_label.setdefault(label, []).append(elapsed_us)
+
+    alloc_kb: List[float] = []
+    tracemalloc.start()
+    try:
+        for _, (fn, args) in queries:
+            if cold:
+                clear_caches()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(*args)
+            alloc_kb.append((tracemalloc.get_traced_memory()[1] - base) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    summary = _summarize(latencies, expanded, alloc_kb)
+    summary["by_map"] = {
+        label: {"queries": len(v), "p50_us": round(_percentile(v, 50), 2), "p95_us": round(_percentile(v, 95), 2)}
+        for label, v in sorted(by_label.items())
+    } if len(by_label) <= 32 else {}
+    return summary
+
+
+def run_benchmark(pairs: int = 200, seed: int = 1) -> Dict[str, Any]:
+    maps = load_all_maps()
+    if not maps:
+        raise RuntimeError(f"No maps found in {pathfinder.MAPS_DIR}")
+
+    rng = random.Random(seed)
+    queries = generate_queries(maps, pairs, rng)
+
+    results: Dict[str, Any] = {}
+    for fn_name, fn_queries in queries.items():
+        results[fn_name] = {
+            "cold": run_queries(fn_queries, cold=True),
+            "warm": run_queries(fn_queries, cold=False),
+        }
+
+    auto, jps = results["find_path"], results["find_path[auto+jps]"]
+    jps_auto = {
+        "queries": len(queries["find_path"]),
+        "different_paths": sum(
+            find_path(*args) != find_path(*args, jps_auto=True) for _, (_, args) in queries["find_path"]
+        ),
+        **{f"{mode}_p50_speedup": round(auto[mode]["p50_us"] / jps[mode]["p50_us"], 2) if jps[mode]["p50_us"] else 0.0
+           for mode in ("cold", "warm")},
+    }
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "seed": seed,
+            "pairs": pairs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "maps": {name: len(data["tiles"]) for name, data in sorted(maps.items())},
+        },
+        "results": results,
+        "jps_auto": jps_auto,
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    print(f"{'function':<20}{'mode':<6}{'n':>6}{'p50 us':>11}{'p95 us':>11}{'expanded':>10}{'alloc kB':>10}")
+    for fn_name, modes in report["results"].items():
+        for mode, s in modes.items():
+            line = (f"{fn_name:<20}{mode:<6}{s['queries']:>6}{s['p50_us']:>11.1f}{s['p95_us']:>11.1f}"
+                    f"{s['expanded_mean']:>10.0f}{s['alloc_peak_kb_p50']:>10.1f}")
+            base = (baseline or {}).get("results", {}).get(fn_name, {}).get(mode)
+            if base and s["p50_us"]:
+                line += f"   x{base['p50_us'] / s['p50_us']:.2f} p50 vs baseline"
+            print(line)
+    j = report.get("jps_auto")
+    if j:
+        print(f"\nauto with JPS vs auto: x{j['cold_p50_speedup']:.2f} cold, x{j['warm_p50_speedup']:.2f} warm p50; "
+              f"{j['different_paths']}/{j['queries']} paths differ (same length)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pokemon Red Pathfinding Benchmark")
+    parser.add_argument("--pairs", type=int, default=200, help="Queries per function")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for query generation")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="JSON results file")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(pairs=args.pairs, seed=args.seed)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,17 +25,21 @@ from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from queue import Queue, Empty
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import uvicorn
 from fastapi import FastAPI, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse, FileResponse
 
 # Add scripts dir to path so we can import game, pathfinder, etc.
 SCRIPT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(SCRIPT_DIR))
 
-from game import PokemonGame, MAP_NAMES
+from game import (
+    PokemonGame, WatchEvent, MAP_NAMES, REWIND_EVERY_FRAMES, MACRO_MAX_FRAMES, validate_macro,
+)
+from state_model import GameState
 
 PROJECT_ROOT = SCRIPT_DIR.parent
 ROM_PATH = PROJECT_ROOT / "PokemonRed.gb"
@@ -50,6 +54,14 @@ MAPS_DIR = PROJECT_ROOT / "game_state" / "maps"
 LOGS_DIR.mkdir(exist_ok=True)
 SCREENSHOTS_DIR.mkdir(exist_ok=True)
 
+# Watches that mark the cached state stale; fields nothing watches (money,
+# badges, PP) are picked up by a slow periodic refresh
+STATE_WATCHES = ("map_id", "position", "battle_type", "text_box_id", "party_hp")
+STATE_REFRESH_TICKS = 60
+
+# Recent distinct states kept for /api/state?since= deltas
+STATE_HISTORY = 64
+
 # ============================================================
 # Emulator Manager — runs PyBoy in a background thread
 # ============================================================
@@ -57,7 +69,8 @@ SCREENSHOTS_DIR.mkdir(exist_ok=True)
 class EmulatorManager:
     """Thread-safe wrapper around PokemonGame that runs continuously."""
 
-    def __init__(self, rom_path: str, save_name: Optional[str] = None, turbo: bool = False):
+    def __init__(self, rom_path: str, save_name: Optional[str] = None, turbo: bool = False,
+                 rewind_every: int = REWIND_EVERY_FRAMES):
         self.game = PokemonGame(
             rom_path=rom_path,
             headless=True,
@@ -67,6 +80,7 @@ class EmulatorManager:
         )
         self.save_name = save_name
         self.turbo = turbo
+        self.rewind_every = rewind_every  # 0 = no rewind ring
 
         # Thread safety
         self.lock = threading.Lock()
@@ -82,8 +96,12 @@ class EmulatorManager:
 
         # Cached state
         self.state_lock = threading.Lock()
-        self.cached_state: Dict[str, Any] = {}
-        self.state_counter = 0
+        self.cached_state: Optional[GameState] = None
+        self.state_counter = 0  # Bumped only when the state actually changes
+        self.state_history: deque = deque(maxlen=STATE_HISTORY)  # (counter, GameState)
+        self.state_dirty = True
+        # Frame the latest battle started on, from the battle_type watch
+        self.battle_started_frame: Optional[int] = None
 
         # Decision counter for logging
         self.decision_counter = 0
@@ -101,6 +119,11 @@ class EmulatorManager:
             if not self.game.load_state(self.save_name):
                 print(f"Warning: Could not load save '{self.save_name}', starting fresh")
 
+        for name in STATE_WATCHES:
+            self.game.watch(name, self._on_watch)
+        if self.rewind_every:
+            self.game.enable_rewind(every=self.rewind_every)
+
         # Initial tick to render first frame
         self.game.tick(1)
         self._capture_frame()
@@ -144,8 +167,9 @@ class EmulatorManager:
             if tick_count % self.frame_capture_interval == 0:
                 self._capture_frame()
 
-            # Update state less frequently (every 15 ticks)
-            if tick_count % 15 == 0:
+            # Update state when a watched value changed, and now and then
+            # for the fields nothing watches
+            if self.state_dirty or tick_count % STATE_REFRESH_TICKS == 0:
                 self._update_state()
 
             # Frame pacing (only when not in turbo mode)
@@ -171,28 +195,34 @@ class EmulatorManager:
                 wait = cmd.get("wait", 16)
                 reasoning = cmd.get("reasoning", "")
 
-                # Check if we were NOT in battle before this command
-                with self.lock:
-                    was_in_battle = self.game.get_full_state().get("in_battle", False)
-
                 # Record state before action
                 with self.lock:
-                    before_state = self.game.get_player_position()
+                    before_state = self.game.get_state()
+                self.battle_started_frame = None
 
-                # Execute button presses
+                # Execute button presses (or one RAM-timed step, or a macro)
                 with self.lock:
-                    self.game.press_buttons(buttons, hold_frames=hold, wait_frames=wait)
+                    if cmd.get("macro") is not None:
+                        macro = self.game.run_macro(cmd["macro"], cmd["until"], cmd["max_frames"])
+                        cmd["_macro"] = macro
+                        buttons = [t["press"] for t in macro["trace"] if "press" in t]
+                        hold, wait = macro["frames"], 0
+                    elif cmd.get("step"):
+                        hold, wait = self.game.step(cmd["step"])["frames"], 0
+                    else:
+                        self.game.press_buttons(buttons, hold_frames=hold, wait_frames=wait)
 
                 # Capture frame after action
                 self._capture_frame()
 
                 # Record state after action
                 with self.lock:
-                    after_state = self.game.get_full_state()
+                    after = self.game.get_state()
+                after_state = after.to_dict()
 
-                # If a battle just started, flush the remaining queue
-                # so the agent can detect and handle the battle
-                if not was_in_battle and after_state.get("in_battle", False):
+                # If a battle started during this command, flush the remaining
+                # queue so the agent can detect and handle the battle
+                if self.battle_started_frame is not None:
                     flushed = 0
                     try:
                         while True:
@@ -206,10 +236,11 @@ class EmulatorManager:
                     except Empty:
                         pass
                     if flushed > 0:
-                        print(f"  ⚔️ Battle detected! Flushed {flushed} queued commands")
+                        print(f"  ⚔️ Battle detected at frame {self.battle_started_frame}! "
+                              f"Flushed {flushed} queued commands")
 
                 # Log the action
-                self._log_action(buttons, hold, wait, reasoning, before_state, after_state)
+                self._log_action(buttons, hold, wait, reasoning, before_state, after)
 
                 # Signal command complete
                 done_event = cmd.get("_done_event")
@@ -249,41 +280,52 @@ class EmulatorManager:
         except Exception as e:
             print(f"Frame capture error: {e}")
 
+    def _on_watch(self, event: WatchEvent):
+        """Watch callback (emulator thread, lock held): just note what changed."""
+        self.state_dirty = True
+        if event.name == "battle_type" and event.old == b"\x00":
+            self.battle_started_frame = event.frame
+
     def _update_state(self):
         """Update cached game state."""
+        self.state_dirty = False
         try:
             with self.lock:
-                state = self.game.get_full_state()
+                state = self.game.get_state()
             with self.state_lock:
+                if state != self.cached_state:
+                    self.state_counter += 1
+                    self.state_history.append((self.state_counter, state))
                 self.cached_state = state
-                self.state_counter += 1
         except Exception as e:
             print(f"State update error: {e}")
 
-    def _log_action(self, buttons, hold, wait, reasoning, before, after):
+    def _log_action(self, buttons, hold, wait, reasoning, before: GameState, after: GameState):
         """Write action to gameplay.jsonl."""
         self.decision_counter += 1
-        pos = after.get("position", {})
+        pos, prev = after.position, before.position
         entry = {
             "decision": self.decision_counter,
             "ts": datetime.now(timezone.utc).isoformat(),
             "action": ", ".join(buttons),
             "reasoning": reasoning,
             "before": {
-                "x": before.get("x"),
-                "y": before.get("y"),
-                "map": before.get("map_name", ""),
+                "x": prev.x,
+                "y": prev.y,
+                "map": prev.map_name,
             },
-            "position": pos,
-            "moved": (before.get("x") != pos.get("x") or before.get("y") != pos.get("y")
-                      or before.get("map_name") != pos.get("map_name")),
-            "in_battle": after.get("in_battle", False),
-            "battle": after.get("battle"),
+            "position": pos.to_dict(),
+            "moved": (pos.x, pos.y, pos.map_id) != (prev.x, prev.y, prev.map_id),
+            "in_battle": after.in_battle,
+            "battle": after.battle.to_dict() if after.battle else None,
+            # The dashboard reads party_hp from every entry, so it is always
+            # written; "changes" has only what this action changed
             "party_hp": [
-                {"name": p["name"], "hp": p["hp"], "max_hp": p["max_hp"],
-                 "level": p["level"], "moves": [m["name"] for m in p.get("moves", [])]}
-                for p in after.get("party", [])
+                {"name": p.name, "hp": p.hp, "max_hp": p.max_hp,
+                 "level": p.level, "moves": [m.name for m in p.moves]}
+                for p in after.party
             ],
+            "changes": after.diff(before),
             "screenshot": f"decision_{self.decision_counter:04d}.png",
         }
 
@@ -313,7 +355,25 @@ class EmulatorManager:
     def get_state(self) -> Dict[str, Any]:
         """Get cached game state."""
         with self.state_lock:
-            return dict(self.cached_state)
+            state = self.cached_state
+        return state.to_dict() if state is not None else {}
+
+    def get_state_delta(self, since: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Changes to the cached state since state_counter was `since`.
+
+        Returns:
+            (current counter, diff) — diff is None when `since` is older
+            than the history (the caller should fetch the full state)
+        """
+        with self.state_lock:
+            counter, state = self.state_counter, self.cached_state
+            old = next((s for c, s in self.state_history if c == since), None)
+        if since == counter:
+            return counter, {}
+        if old is None or state is None:
+            return counter, None
+        return counter, state.diff(old)
 
     def get_fresh_state(self) -> Dict[str, Any]:
         """Force a fresh state read."""
@@ -348,6 +408,46 @@ class EmulatorManager:
             return cmd.get("_result", {})
         return {"status": "queued"}
 
+    def step(self, direction: str, reasoning: str = "") -> Dict[str, Any]:
+        """Queue one walking step timed by PokemonGame.step and wait for it."""
+        done_event = threading.Event()
+        cmd = {
+            "buttons": [direction],
+            "step": direction,
+            "reasoning": reasoning,
+            "_done_event": done_event,
+            "_result": None,
+        }
+        self.button_queue.put(cmd)
+        done_event.wait(timeout=30)
+        return cmd.get("_result", {})
+
+    def run_macro(self, program: List[Any], until: Tuple[str, ...] = (),
+                  max_frames: int = MACRO_MAX_FRAMES, reasoning: str = "") -> Dict[str, Any]:
+        """
+        Queue an input macro (PokemonGame.run_macro) and wait for it.
+
+        Raises ValueError for a bad program before anything is queued.
+
+        Returns:
+            {"macro": stopped/frames/trace, "state": state after}
+        """
+        until = (until,) if isinstance(until, str) else tuple(until)
+        validate_macro(program, until)
+        done_event = threading.Event()
+        cmd = {
+            "buttons": [],
+            "macro": program,
+            "until": until,
+            "max_frames": max_frames,
+            "reasoning": reasoning,
+            "_done_event": done_event,
+            "_result": None,
+        }
+        self.button_queue.put(cmd)
+        done_event.wait(timeout=60)
+        return {"macro": cmd.get("_macro"), "state": cmd.get("_result") or {}}
+
     def save_state(self, name: str) -> bool:
         """Save emulator state."""
         try:
@@ -371,11 +471,32 @@ class EmulatorManager:
             print(f"Load error: {e}")
             return False
 
+    def rewind(self, frames: int) -> Optional[Dict[str, Any]]:
+        """Restore the newest in-memory savestate at least `frames` frames back."""
+        with self.lock:
+            now = self.game.frame_count
+            entry = self.game.rewind(frames)
+        if entry is None:
+            return None
+        self._capture_frame()
+        self._update_state()
+        return {**entry, "frames_back": now - entry["frame"]}
+
+    def rewind_snapshots(self) -> Dict[str, Any]:
+        """Savestates in the rewind ring, and its size."""
+        with self.lock:
+            ring = self.game.rewind_ring
+            if ring is None:
+                return {"enabled": False, "frame": self.game.frame_count, "snapshots": []}
+            return {"enabled": True, "frame": self.game.frame_count,
+                    "snapshots": ring.entries(), "stats": ring.stats()}
+
     def set_speed(self, turbo: bool):
         """Toggle turbo mode."""
         self.turbo = turbo
         with self.lock:
-            self.game.pyboy.set_emulation_speed(0 if turbo else 1)
+            self.game.speed = 0 if turbo else 1  # Restored after each macro
+            self.game.pyboy.set_emulation_speed(self.game.speed)
 
 
 # ============================================================
@@ -428,12 +549,23 @@ async def mjpeg_stream():
 # --- API Endpoints ---
 
 @app.get("/api/state")
-async def api_state():
-    """Return current game state."""
+async def api_state(since: Optional[int] = Query(None)):
+    """
+    Return current game state.
+
+    With ?since=<counter> from an earlier response, returns only the fields
+    that changed since then ("delta"), or the full state if that counter
+    has dropped out of the history.
+    """
     if emu is None:
         return JSONResponse({"status": "not_running"}, status_code=503)
+    if since is not None:
+        counter, delta = emu.get_state_delta(since)
+        if delta is not None:
+            return JSONResponse({"status": "ok", "counter": counter, "since": since, "delta": delta})
+    counter = emu.state_counter  # Read first: a newer state only repeats changes
     state = emu.get_state()
-    return JSONResponse({"status": "ok", "data": state})
+    return JSONResponse({"status": "ok", "counter": counter, "data": state})
 
 
 @app.get("/api/screenshot")
@@ -512,6 +644,32 @@ async def api_press(request: Request):
     return JSONResponse({"status": "ok", "state": result})
 
 
+@app.post("/api/macro")
+async def api_macro(request: Request):
+    """Run a whole input program in the emulator thread, at full speed.
+    
+    Body: {"program": ["a", {"press": "down", "hold": 6, "wait": 20},
+                       {"repeat": 8, "do": [{"press": "a", "hold": 4, "wait": 15}]}],
+           "until": ["battle_end"], "max_frames": 3600, "reasoning": "why"}
+    
+    Steps are frame-exact; the macro stops as soon as any "until" condition
+    fires (battle_start, battle_end, text_open, text_closed, map_change,
+    hp_change). Returns the state after, and the macro's trace.
+    """
+    if emu is None:
+        return JSONResponse({"status": "not_running"}, status_code=503)
+
+    body = await request.json()
+    try:
+        result = await run_in_threadpool(
+            emu.run_macro, body.get("program", []), body.get("until", []),
+            int(body.get("max_frames", MACRO_MAX_FRAMES)), body.get("reasoning", ""),
+        )
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    return JSONResponse({"status": "ok", "data": result["state"], "macro": result["macro"]})
+
+
 @app.post("/api/command")
 async def api_command(request: Request):
     """Execute a command (save/load/speed).
@@ -545,6 +703,26 @@ async def api_command(request: Request):
         return JSONResponse({"status": "error", "message": f"Unknown command: {cmd}"}, status_code=400)
 
 
+@app.post("/api/rewind")
+async def api_rewind(frames: int = Query(default=REWIND_EVERY_FRAMES, ge=0)):
+    """Rewind to the newest in-memory savestate at least `frames` frames back."""
+    if emu is None:
+        return JSONResponse({"status": "not_running"}, status_code=503)
+    restored = emu.rewind(frames)
+    if restored is None:
+        return JSONResponse({"status": "error", "message": f"No savestate {frames} frames back"},
+                            status_code=404)
+    return JSONResponse({"status": "ok", "restored": restored, "state": emu.get_state()})
+
+
+@app.get("/api/snapshots")
+async def api_snapshots():
+    """List the rewind ring's savestates (frame, reason) and its memory use."""
+    if emu is None:
+        return JSONResponse({"status": "not_running"}, status_code=503)
+    return JSONResponse({"status": "ok", "data": emu.rewind_snapshots()})
+
+
 @app.get("/api/history")
 async def api_history(limit: int = Query(default=50, ge=1, le=500)):
     """Return last N gameplay log entries."""
@@ -687,17 +865,16 @@ async def api_destinations():
 @app.get("/api/maps")
 async def api_maps():
     """List which maps have been scanned (pathfinding available)."""
+    from pathfinder import MAP_CACHE
+
     scanned = []
-    if MAPS_DIR.exists():
-        for p in sorted(MAPS_DIR.glob("*.json")):
-            name = p.stem.replace("_", " ").title()
-            try:
-                data = json.loads(p.read_text())
-                tiles = len(data.get("walkable", []))
-                warps = len(data.get("warps", []))
-                scanned.append({"file": p.name, "name": name, "tiles": tiles, "warps": warps})
-            except Exception:
-                scanned.append({"file": p.name, "name": name, "tiles": 0, "warps": 0})
+    for p, data in MAP_CACHE.files():
+        scanned.append({
+            "file": p.name,
+            "name": data.get("map_name", p.stem.replace("_", " ").title()),
+            "tiles": len(data.get("tiles", {})),
+            "warps": len(data.get("warps", {})),
+        })
     return JSONResponse({"status": "ok", "count": len(scanned), "maps": scanned})
 
 
@@ -761,7 +938,7 @@ def _resolve_destination(destination: str):
 
 def _navigate_sync(destination: str) -> dict:
     """Synchronous navigate implementation — runs in threadpool."""
-    from pathfinder import find_route
+    from pathfinder import find_route, route_problem
 
     resolved = _resolve_destination(destination)
     if not resolved:
@@ -784,7 +961,9 @@ def _navigate_sync(destination: str) -> dict:
         return {"status": "error", "message": f"Pathfinding error: {e}"}
 
     if not route:
-        return {"status": "error", "message": f"No route from {current_map} ({x},{y}) to {dest_map} ({dest_x},{dest_y})"}
+        message = f"No route from {current_map} ({x},{y}) to {dest_map} ({dest_x},{dest_y})"
+        problem = route_problem(current_map, x, y, dest_map, dest_x, dest_y)
+        return {"status": "error", "message": f"{message}: {problem}" if problem else message}
 
     try:
         total_steps = sum(len(steps) for _, steps in route)
@@ -794,10 +973,10 @@ def _navigate_sync(destination: str) -> dict:
             if not steps:
                 continue
             for step in steps:
-                emu.press_buttons([step], hold=8, wait=16, reasoning=f"Navigate: {map_name} → {dest_map}", sync=True)
+                # The step's result is the state right after it
+                fresh = emu.step(step, reasoning=f"Navigate: {map_name} → {dest_map}") or {}
                 steps_taken += 1
 
-                fresh = emu.get_fresh_state()
                 if fresh.get("in_battle", False):
                     return {
                         "status": "battle",
@@ -846,7 +1025,7 @@ async def api_route(request: Request):
         return JSONResponse({"status": "error", "message": "No destination"}, status_code=400)
 
     try:
-        from pathfinder import find_route
+        from pathfinder import find_route, route_problem
     except ImportError:
         return JSONResponse({"status": "error", "message": "Pathfinder not available"}, status_code=500)
 
@@ -871,7 +1050,9 @@ async def api_route(request: Request):
         return JSONResponse({"status": "error", "message": f"Pathfinding error: {e}"})
 
     if not route:
-        return JSONResponse({"status": "error", "message": f"No route from {current_map} ({x},{y}) to {dest_map} ({dest_x},{dest_y})"})
+        message = f"No route from {current_map} ({x},{y}) to {dest_map} ({dest_x},{dest_y})"
+        problem = route_problem(current_map, x, y, dest_map, dest_x, dest_y)
+        return JSONResponse({"status": "error", "message": f"{message}: {problem}" if problem else message})
 
     # Flatten into a single step list with map annotations
     all_steps = []
@@ -896,6 +1077,8 @@ def main():
     parser.add_argument("--save", type=str, default=None, help="Save state to load on startup")
     parser.add_argument("--turbo", action="store_true", help="Run emulator at max speed")
     parser.add_argument("--rom", type=str, default=str(ROM_PATH), help="Path to ROM file")
+    parser.add_argument("--rewind-every", type=int, default=REWIND_EVERY_FRAMES,
+                        help="Frames between in-memory rewind savestates (0 = off)")
     args = parser.parse_args()
 
     global emu
@@ -909,12 +1092,19 @@ def main():
         rom_path=args.rom,
         save_name=args.save,
         turbo=args.turbo,
+        rewind_every=args.rewind_every,
     )
 
     if not emu.start():
         print("❌ Failed to start emulator")
         sys.exit(1)
 
+    try:
+        from navigator import warm_destinations
+        print(f"   Flow fields: {warm_destinations()} destinations ready")
+    except ImportError:
+        pass
+
     print(f"✅ Emulator running! Dashboard: http://localhost:{args.port}")
 
     try:
@@ -10,9 +10,12 @@ import json
 import time
 import base64
 import io
+import struct
 import argparse
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, Callable, List, Tuple
 
 try:
     from pyboy import PyBoy
@@ -21,6 +24,9 @@ except ImportError:
     print("Missing dependencies. Install with: pip install pyboy pillow")
     sys.exit(1)
 
+from state_model import GameState, Position, PartyMember, Move, BattleState, Combatant, BADGE_NAMES
+from state_store import SavestateRing, RING_CAPACITY, RING_MAX_BYTES
+
 
 # ============================================================
 # Pokemon Red Memory Addresses (International/English version)
@@ -34,6 +40,11 @@ ADDR = {
     "map_id": 0xD35E,
     "player_direction": 0xC109,  # 0=down, 4=up, 8=left, 0xC=right
 
+    # Movement
+    "walk_counter": 0xCFC5,      # Counts down to 0 while a step animates
+    "movement_flags": 0xD736,    # Bit 0/1 = door step-out pending/running, bit 6 = ledge jump
+    "bg_palette": 0xFF47,        # rBGP — changes while the screen fades (warps, battles)
+
     # Party
     "party_count": 0xD163,
     "party_species": [0xD164, 0xD165, 0xD166, 0xD167, 0xD168, 0xD169],
@@ -186,16 +197,203 @@ MAP_NAMES = {
 }
 
 
+# ============================================================
+# Bulk RAM snapshots
+# Every address get_full_state reads lies in two small WRAM ranges, so a
+# couple of slice copies replace ~100 single-byte reads, and all values in
+# a state come from the same frame.
+# ============================================================
+
+SNAPSHOT_REGIONS = (
+    (0xC100, 0xC110),  # Player sprite data (facing)
+    (0xCFC0, 0xD380),  # Battle block, text box, party, items, money, badges, position
+)
+
+# Party Pokemon block (44 bytes from D16B): species, HP, status, moves,
+# PP, level, max HP — the fields get_party reads
+PARTY_DATA_START = 0xD16B
+PARTY_DATA_SIZE = 0x2C
+PARTY_MON = struct.Struct(">BHxB3x4s17x4sBH")
+
+
+SNAPSHOT_BASE = SNAPSHOT_REGIONS[0][0]
+SNAPSHOT_SIZE = SNAPSHOT_REGIONS[-1][1] - SNAPSHOT_BASE
+
+
+class RamSnapshot:
+    """
+    A copy of the SNAPSHOT_REGIONS of WRAM, indexed by absolute address.
+
+    Bytes between the regions aren't copied and read as 0.
+    """
+
+    __slots__ = ("data", "frame")
+
+    def __init__(self, data: bytes, frame: int = 0):
+        self.data = data
+        self.frame = frame
+
+    @classmethod
+    def read(cls, memory, frame: int = 0) -> "RamSnapshot":
+        """Copy the regions out of PyBoy memory, one slice read each."""
+        data = bytearray(SNAPSHOT_SIZE)
+        for start, end in SNAPSHOT_REGIONS:
+            data[start - SNAPSHOT_BASE:end - SNAPSHOT_BASE] = bytes(memory[start:end])
+        return cls(bytes(data), frame)
+
+    def __getitem__(self, addr: int) -> int:
+        return self.data[addr - SNAPSHOT_BASE]
+
+    def unpack(self, fmt: struct.Struct, addr: int) -> tuple:
+        return fmt.unpack_from(self.data, addr - SNAPSHOT_BASE)
+
+
+# ============================================================
+# RAM watchpoints
+# Named byte ranges compared after each tick() batch (or after every frame
+# for watches registered with exact=True); a change fires the watch's
+# callbacks and queues a WatchEvent.
+# ============================================================
+
+WATCH_PRESETS = {
+    "map_id": ((ADDR["map_id"], ADDR["map_id"] + 1),),
+    "position": ((ADDR["player_y"], ADDR["player_x"] + 1),),
+    "battle_type": ((ADDR["battle_type"], ADDR["battle_type"] + 1),),
+    "text_box_id": ((ADDR["text_box_id"], ADDR["text_box_id"] + 1),),
+    # Current HP (2 bytes) of each of the 6 party slots
+    "party_hp": tuple(
+        (PARTY_DATA_START + 1 + i * PARTY_DATA_SIZE, PARTY_DATA_START + 3 + i * PARTY_DATA_SIZE)
+        for i in range(6)
+    ),
+}
+
+# Queued events kept for poll_events() (oldest are dropped)
+WATCH_EVENT_LIMIT = 256
+
+
+class WatchEvent:
+    """
+    A watched range changed: its bytes before and after, and the frames it
+    changed between (after frame `since`, at or before `frame`; one frame
+    apart for exact watches, a whole tick() batch apart otherwise).
+    """
+
+    __slots__ = ("name", "old", "new", "frame", "since")
+
+    def __init__(self, name: str, old: bytes, new: bytes, frame: int, since: Optional[int] = None):
+        self.name = name
+        self.old = old
+        self.new = new
+        self.frame = frame
+        self.since = frame - 1 if since is None else since
+
+    def __repr__(self):
+        return f"WatchEvent({self.name}: {self.old.hex()} -> {self.new.hex()} @ {self.since + 1}..{self.frame})"
+
+
+class _Watch:
+    __slots__ = ("ranges", "value", "callbacks", "exact")
+
+    def __init__(self, ranges: Tuple[Tuple[int, int], ...]):
+        self.ranges = ranges
+        self.value: Optional[bytes] = None  # None until first read (emulator not started)
+        self.callbacks: List[Callable[[WatchEvent], None]] = []
+        self.exact = False  # True = compared after every frame
+
+
+# Rewind ring defaults: a savestate every REWIND_EVERY_FRAMES frames, plus
+# one whenever a REWIND_EVENTS watch fires (map change, battle start/end)
+REWIND_EVERY_FRAMES = 300
+REWIND_EVENTS = ("map_id", "battle_type")
+
+
+# ============================================================
+# Input macros
+# A macro is a list of steps run back to back in one call, frame by frame:
+#     "a"                                     press with the default hold/wait
+#     {"press": "a", "hold": 6, "wait": 20}   press with explicit frame counts
+#     {"wait": 30}                            idle frames
+#     {"repeat": 8, "do": [...]}              loop over nested steps
+# ============================================================
+
+MACRO_HOLD_FRAMES = 8
+MACRO_WAIT_FRAMES = 16
+MACRO_MAX_FRAMES = 3600  # Hard cap per macro (one minute of game time)
+MACRO_MAX_DEPTH = 8      # Nested repeat levels
+
+_ZERO = bytes(1)
+
+# Stop conditions: the WATCH_PRESETS range each one compares frame to frame,
+# and whether a change from old to new bytes ends the macro
+MACRO_CONDITIONS = {
+    "battle_start": ("battle_type", lambda old, new: old == _ZERO and new != _ZERO),
+    "battle_end":   ("battle_type", lambda old, new: old != _ZERO and new == _ZERO),
+    "text_open":    ("text_box_id", lambda old, new: old == _ZERO and new != _ZERO),
+    "text_closed":  ("text_box_id", lambda old, new: old != _ZERO and new == _ZERO),
+    "map_change":   ("map_id", lambda old, new: True),
+    "hp_change":    ("party_hp", lambda old, new: True),
+}
+
+
+def validate_macro(program: List[Any], until: Tuple[str, ...] = (), depth: int = 0):
+    """
+    Check a macro program and stop conditions, raising ValueError on the
+    first problem (run_macro checks too; this is for callers that queue
+    macros for another thread).
+    """
+    for name in until:
+        if name not in MACRO_CONDITIONS:
+            raise ValueError(f"Unknown stop condition: {name}. Valid: {list(MACRO_CONDITIONS)}")
+    if not isinstance(program, list):
+        raise ValueError(f"Macro must be a list of steps, got {type(program).__name__}")
+    if depth > MACRO_MAX_DEPTH:
+        raise ValueError(f"Macro nested deeper than {MACRO_MAX_DEPTH} repeats")
+    for step in program:
+        if isinstance(step, str):
+            step = {"press": step}
+        if not isinstance(step, dict):
+            raise ValueError(f"Invalid macro step: {step!r}")
+        if "repeat" in step:
+            if not isinstance(step["repeat"], int) or step["repeat"] < 0:
+                raise ValueError(f"repeat must be a non-negative int: {step!r}")
+            validate_macro(step.get("do", []), (), depth + 1)
+        elif "press" in step:
+            if not isinstance(step["press"], str) or step["press"].lower() not in PokemonGame.VALID_BUTTONS:
+                raise ValueError(f"Invalid button: {step['press']}. Valid: {PokemonGame.VALID_BUTTONS}")
+            for key in ("hold", "wait"):
+                if not isinstance(step.get(key, 0), int) or step.get(key, 0) < 0:
+                    raise ValueError(f"{key} must be a non-negative int: {step!r}")
+        elif "wait" in step:
+            if not isinstance(step["wait"], int) or step["wait"] < 0:
+                raise ValueError(f"wait must be a non-negative int: {step!r}")
+        else:
+            raise ValueError(f"Macro step needs press, wait or repeat: {step!r}")
+
+
+# Movement flags that mean the player is still being moved by the game
+MOVING_FLAGS = 0x43
+
+# step(): frames to hold a direction waiting for the walk to start, frames
+# the player must stay settled before the step counts as finished, and the
+# hard cap on a single step (a warp's fade out + load + fade in fits)
+STEP_HOLD_FRAMES = 8
+STEP_STABLE_FRAMES = 4
+STEP_MAX_FRAMES = 90
+
+
 class PokemonGame:
     """Wrapper around PyBoy for Pokemon Red gameplay."""
 
     VALID_BUTTONS = ["up", "down", "left", "right", "a", "b", "start", "select"]
 
     def __init__(self, rom_path: str, headless: bool = True, speed: int = 1,
-                 save_dir: str = "saves", screenshot_dir: str = "screenshots"):
+                 save_dir: str = "saves", screenshot_dir: str = "screenshots",
+                 render: bool = True):
         self.rom_path = rom_path
         self.headless = headless
         self.speed = speed
+        # False = never render frames (headless fast-forward, e.g. map scanning)
+        self.render = render
         self.save_dir = Path(save_dir)
         self.screenshot_dir = Path(screenshot_dir)
         self.save_dir.mkdir(exist_ok=True)
@@ -205,6 +403,18 @@ class PokemonGame:
         self.frame_count = 0
         self.action_log: List[Dict] = []
 
+        # RAM watchpoints (see watch())
+        self._watches: Dict[str, _Watch] = {}
+        self.events: deque = deque(maxlen=WATCH_EVENT_LIMIT)
+        # Called with no arguments after load_state() or rewind() replaced
+        # the emulator state, so holders of derived state can re-read RAM
+        self.load_callbacks: List[Callable[[], None]] = []
+
+        # In-memory rewind history (see enable_rewind())
+        self.rewind_ring: Optional[SavestateRing] = None
+        self.rewind_every = REWIND_EVERY_FRAMES
+        self._rewind_last = 0
+
     def start(self) -> bool:
         """Initialize and start the emulator."""
         if not os.path.exists(self.rom_path):
@@ -231,15 +441,53 @@ class PokemonGame:
             self.pyboy = None
 
     def tick(self, frames: int = 1, render: bool = True) -> bool:
-        """Advance the emulator by N frames."""
+        """
+        Advance the emulator by N frames in a single PyBoy call.
+
+        Only the last frame of the batch is rendered, and none at all if
+        render is False or rendering is off (self.render / fast_forward()).
+        Watches are compared once, after the batch; only while an exact
+        watch is registered are frames emulated one at a time so its
+        events carry the frame of the change.
+        """
         if not self.pyboy:
             return False
-        for _ in range(frames):
-            if not self.pyboy.tick(1, render):
+        if frames <= 0:
+            return True
+        render = render and self.render
+        if not any(w.exact for w in self._watches.values()):
+            if not self.pyboy.tick(frames, render):
                 return False
-            self.frame_count += 1
+            self.frame_count += frames
+            if self._watches:
+                self._check_watches(self.frame_count - frames)
+        else:
+            for i in range(frames):
+                if not self.pyboy.tick(1, render and i == frames - 1):
+                    return False
+                self.frame_count += 1
+                self._check_watches()
+        if self.rewind_ring is not None and self.frame_count - self._rewind_last >= self.rewind_every:
+            self.save_rewind_point("periodic")
         return True
 
+    @contextmanager
+    def fast_forward(self):
+        """
+        Run a block of ticks, presses and steps without rendering any frame.
+
+        On exit, if rendering was on before, one rendered frame is emulated
+        so the screen is current again.
+        """
+        previous = self.render
+        self.render = False
+        try:
+            yield self
+        finally:
+            self.render = previous
+            if previous and self.pyboy:
+                self.tick(1)
+
     def press_button(self, button: str, hold_frames: int = 8, wait_frames: int = 8):
         """Press and release a button, then wait."""
         button = button.lower()
@@ -251,6 +499,72 @@ class PokemonGame:
         self.pyboy.button_release(button)
         self.tick(wait_frames)
 
+    def step(self, direction: str, max_frames: int = STEP_MAX_FRAMES,
+             wait_transition: bool = True) -> Dict[str, Any]:
+        """
+        Walk one tile, emulating only as many frames as the step takes.
+
+        Holds the direction until the walk animation starts, then advances
+        frame by frame until the walk counter is back to 0, no door
+        step-out or ledge jump is running, and the background palette is
+        back to its value before the step (no fade under way) for
+        STEP_STABLE_FRAMES frames in a row.
+
+        Args:
+            direction: "up", "down", "left" or "right"
+            max_frames: Hard cap on frames emulated
+            wait_transition: After a map change, wait for the fade-in to
+                             finish. False returns as soon as the map id changes.
+
+        Returns:
+            Dict with result ("walk", "blocked", "warp", "battle" or
+            "timeout"), frames emulated, and the final x, y and map_id
+        """
+        mem = self.pyboy.memory
+        x0, y0, map0 = mem[ADDR["player_x"]], mem[ADDR["player_y"]], mem[ADDR["map_id"]]
+        palette = mem[ADDR["bg_palette"]]
+        frames = 0
+        started = False
+
+        # Hold until the step starts; no start within the hold window = blocked
+        self.pyboy.button_press(direction)
+        try:
+            while frames < STEP_HOLD_FRAMES:
+                self.tick(1)
+                frames += 1
+                if (mem[ADDR["walk_counter"]] or mem[ADDR["battle_type"]] or mem[ADDR["map_id"]] != map0
+                        or mem[ADDR["player_x"]] != x0 or mem[ADDR["player_y"]] != y0):
+                    started = True
+                    break
+        finally:
+            self.pyboy.button_release(direction)
+
+        result = "timeout" if started else "blocked"
+        stable = 0
+        while started and frames < max_frames:
+            if mem[ADDR["battle_type"]]:
+                result = "battle"
+                break
+            map_changed = mem[ADDR["map_id"]] != map0
+            if map_changed and not wait_transition:
+                result = "warp"
+                break
+            if (mem[ADDR["walk_counter"]] == 0 and not mem[ADDR["movement_flags"]] & MOVING_FLAGS
+                    and mem[ADDR["bg_palette"]] == palette):
+                stable += 1
+                if stable >= STEP_STABLE_FRAMES:
+                    result = "warp" if map_changed else "walk"
+                    break
+            else:
+                stable = 0
+            self.tick(1)
+            frames += 1
+
+        x, y, map_id = mem[ADDR["player_x"]], mem[ADDR["player_y"]], mem[ADDR["map_id"]]
+        if result == "walk" and (x, y) == (x0, y0):
+            result = "blocked"
+        return {"result": result, "frames": frames, "x": x, "y": y, "map_id": map_id}
+
     def press_buttons(self, buttons: List[str], hold_frames: int = 8, wait_frames: int = 8):
         """Press a sequence of buttons."""
         for btn in buttons:
@@ -273,116 +587,207 @@ class PokemonGame:
         img.save(buf, format="PNG")
         return base64.b64encode(buf.getvalue()).decode()
 
+    # ==========================================
+    # Watchpoints
+    # ==========================================
+
+    def watch(self, name: str, callback: Optional[Callable[[WatchEvent], None]] = None,
+              ranges: Optional[Tuple[Tuple[int, int], ...]] = None, exact: bool = False):
+        """
+        Watch a RAM range for changes, checked after each tick() batch.
+
+        Each change is queued for poll_events() and passed to the callbacks
+        registered for the name, on the emulator's thread, mid-tick (they
+        should only record what happened, not press buttons or tick).
+
+        Args:
+            name: A WATCH_PRESETS name, or any name when ranges is given
+            callback: Called with a WatchEvent on every change
+            ranges: (start, end) address ranges to compare, end exclusive
+            exact: Compare after every frame instead, so events carry the
+                   frame of the change and a change undone within one
+                   batch isn't missed. Any exact watch makes tick() emulate
+                   frame by frame, so leave it off unless the frame matters.
+        """
+        if ranges is None:
+            if name not in WATCH_PRESETS:
+                raise ValueError(f"Unknown watch: {name}. Presets: {list(WATCH_PRESETS)}")
+            ranges = WATCH_PRESETS[name]
+        w = self._watches.get(name)
+        if w is None:
+            w = self._watches[name] = _Watch(tuple(ranges))
+            if self.pyboy:
+                w.value = self._read_watch(w)
+        w.exact = w.exact or exact
+        if callback is not None:
+            w.callbacks.append(callback)
+
+    def unwatch(self, name: str, callback: Optional[Callable[[WatchEvent], None]] = None):
+        """Remove a callback, or the whole watch when callback is None or it was the last one."""
+        w = self._watches.get(name)
+        if w is None:
+            return
+        if callback is not None and callback in w.callbacks:
+            w.callbacks.remove(callback)
+        if callback is None or not w.callbacks:
+            del self._watches[name]
+
+    def poll_events(self) -> List[WatchEvent]:
+        """Take the queued watch events, oldest first."""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def _read_watch(self, w: _Watch) -> bytes:
+        mem = self.pyboy.memory
+        if len(w.ranges) == 1:
+            start, end = w.ranges[0]
+            return bytes(mem[start:end])
+        return b"".join(bytes(mem[start:end]) for start, end in w.ranges)
+
+    def _sync_watches(self):
+        """Take every watch's current bytes as its baseline, firing nothing
+        (after a state load the jump isn't a change the game made), then
+        run load_callbacks."""
+        for w in self._watches.values():
+            w.value = self._read_watch(w)
+        for callback in list(self.load_callbacks):
+            callback()
+
+    def _check_watches(self, since: Optional[int] = None):
+        """Compare every watched range with its bytes at the last check
+        (made at frame `since`, default the frame before this one)."""
+        for name, w in list(self._watches.items()):
+            value = self._read_watch(w)
+            if value == w.value:
+                continue
+            if w.value is None:
+                w.value = value
+                continue
+            event = WatchEvent(name, w.value, value, self.frame_count, since)
+            w.value = value
+            self.events.append(event)
+            for callback in list(w.callbacks):
+                callback(event)
+
     # ==========================================
     # Memory Reading
     # ==========================================
 
-    def _read_byte(self, addr: int) -> int:
-        return self.pyboy.memory[addr]
+    def snapshot(self) -> RamSnapshot:
+        """Copy the WRAM the state readers use (SNAPSHOT_REGIONS) in bulk."""
+        return RamSnapshot.read(self.pyboy.memory, self.frame_count)
+
+    def _read_byte(self, addr: int, ram: Optional[RamSnapshot] = None) -> int:
+        return (self.pyboy.memory if ram is None else ram)[addr]
 
-    def _read_word(self, addr_pair: Tuple[int, int]) -> int:
+    def _read_word(self, addr_pair: Tuple[int, int], ram: Optional[RamSnapshot] = None) -> int:
         """Read 2-byte big-endian value."""
-        return (self.pyboy.memory[addr_pair[0]] << 8) | self.pyboy.memory[addr_pair[1]]
+        mem = self.pyboy.memory if ram is None else ram
+        return (mem[addr_pair[0]] << 8) | mem[addr_pair[1]]
 
-    def _read_bcd(self, addrs: Tuple[int, ...]) -> int:
+    def _read_bcd(self, addrs: Tuple[int, ...], ram: Optional[RamSnapshot] = None) -> int:
         """Read BCD-encoded value."""
+        mem = self.pyboy.memory if ram is None else ram
         result = 0
         for addr in addrs:
-            byte = self.pyboy.memory[addr]
+            byte = mem[addr]
             result = result * 100 + ((byte >> 4) * 10 + (byte & 0x0F))
         return result
 
-    def get_player_position(self) -> Dict[str, Any]:
-        """Get player's current position."""
-        map_id = self._read_byte(ADDR["map_id"])
-        return {
-            "x": self._read_byte(ADDR["player_x"]),
-            "y": self._read_byte(ADDR["player_y"]),
-            "map_id": map_id,
-            "map_name": MAP_NAMES.get(map_id, f"Unknown (0x{map_id:02X})"),
-            "facing": {0: "down", 4: "up", 8: "left", 0xC: "right"}.get(
-                self._read_byte(ADDR["player_direction"]), "unknown"
+    # The readers below take an optional snapshot; without one they read
+    # live memory (or take their own snapshot, for the party)
+
+    def read_position(self, ram: Optional[RamSnapshot] = None) -> Position:
+        """Get player's current position as a Position."""
+        map_id = self._read_byte(ADDR["map_id"], ram)
+        return Position(
+            self._read_byte(ADDR["player_x"], ram),
+            self._read_byte(ADDR["player_y"], ram),
+            map_id,
+            MAP_NAMES.get(map_id, f"Unknown (0x{map_id:02X})"),
+            {0: "down", 4: "up", 8: "left", 0xC: "right"}.get(
+                self._read_byte(ADDR["player_direction"], ram), "unknown"
             ),
-        }
+        )
 
-    def get_party(self) -> List[Dict[str, Any]]:
-        """Get the player's Pokemon party."""
-        count = self._read_byte(ADDR["party_count"])
-        party = []
+    def get_player_position(self, ram: Optional[RamSnapshot] = None) -> Dict[str, Any]:
+        """Get player's current position."""
+        return self.read_position(ram).to_dict()
 
-        # Base address for each party pokemon's detailed data
-        # Each pokemon data block is 44 bytes (0x2C), starting at D16B
-        PKMN_DATA_START = 0xD16B
-        PKMN_DATA_SIZE = 0x2C
+    def read_party(self, ram: Optional[RamSnapshot] = None) -> Tuple[PartyMember, ...]:
+        """Get the player's Pokemon party as PartyMembers."""
+        if ram is None:
+            ram = self.snapshot()
+        count = ram[ADDR["party_count"]]
+        party = []
 
         for i in range(min(count, 6)):
-            base = PKMN_DATA_START + (i * PKMN_DATA_SIZE)
-            species_id = self.pyboy.memory[base]
-            hp = (self.pyboy.memory[base + 1] << 8) | self.pyboy.memory[base + 2]
-            level = self.pyboy.memory[base + 0x21]  # Actual level offset
-            max_hp = (self.pyboy.memory[base + 0x22] << 8) | self.pyboy.memory[base + 0x23]
-            status = self.pyboy.memory[base + 4]
-
-            moves = []
-            for j in range(4):
-                move_id = self.pyboy.memory[base + 8 + j]
-                if move_id > 0:
-                    moves.append({
-                        "id": move_id,
-                        "name": MOVE_NAMES.get(move_id, f"Move_{move_id:02X}"),
-                        "pp": self.pyboy.memory[base + 0x1D + j],
-                    })
-
-            party.append({
-                "species_id": species_id,
-                "name": POKEMON_NAMES.get(species_id, f"Pokemon_{species_id:02X}"),
-                "level": level,
-                "hp": hp,
-                "max_hp": max_hp,
-                "status": self._decode_status(status),
-                "moves": moves,
-            })
-
-        return party
-
-    def get_badges(self) -> Dict[str, bool]:
+            species_id, hp, status, move_ids, pps, level, max_hp = ram.unpack(
+                PARTY_MON, PARTY_DATA_START + i * PARTY_DATA_SIZE)
+
+            moves = tuple(
+                Move(move_id, MOVE_NAMES.get(move_id, f"Move_{move_id:02X}"), pp)
+                for move_id, pp in zip(move_ids, pps) if move_id > 0
+            )
+
+            party.append(PartyMember(
+                species_id,
+                POKEMON_NAMES.get(species_id, f"Pokemon_{species_id:02X}"),
+                level,
+                hp,
+                max_hp,
+                self._decode_status(status),
+                moves,
+            ))
+
+        return tuple(party)
+
+    def get_party(self, ram: Optional[RamSnapshot] = None) -> List[Dict[str, Any]]:
+        """Get the player's Pokemon party."""
+        return [p.to_dict() for p in self.read_party(ram)]
+
+    def get_badges(self, ram: Optional[RamSnapshot] = None) -> Dict[str, bool]:
         """Get badge collection status."""
-        badge_byte = self._read_byte(ADDR["badges"])
-        badge_names = ["Boulder", "Cascade", "Thunder", "Rainbow",
-                       "Soul", "Marsh", "Volcano", "Earth"]
-        return {name: bool(badge_byte & (1 << i)) for i, name in enumerate(badge_names)}
+        badge_byte = self._read_byte(ADDR["badges"], ram)
+        return {name: bool(badge_byte & (1 << i)) for i, name in enumerate(BADGE_NAMES)}
 
-    def get_money(self) -> int:
+    def get_money(self, ram: Optional[RamSnapshot] = None) -> int:
         """Get player's money."""
-        return self._read_bcd(ADDR["money"])
+        return self._read_bcd(ADDR["money"], ram)
 
-    def get_battle_state(self) -> Optional[Dict[str, Any]]:
-        """Get current battle state, or None if not in battle."""
-        battle_type = self._read_byte(ADDR["battle_type"])
+    def read_battle(self, ram: Optional[RamSnapshot] = None) -> Optional[BattleState]:
+        """Get current battle as a BattleState, or None if not in battle."""
+        battle_type = self._read_byte(ADDR["battle_type"], ram)
         if battle_type == 0:
             return None
 
-        enemy_species = self._read_byte(ADDR["enemy_species"])
-        return {
-            "type": {1: "wild", 2: "trainer"}.get(battle_type, f"unknown_{battle_type}"),
-            "enemy": {
-                "species_id": enemy_species,
-                "name": POKEMON_NAMES.get(enemy_species, f"Pokemon_{enemy_species:02X}"),
-                "hp": self._read_word(ADDR["enemy_hp"]),
-                "level": self._read_byte(ADDR["enemy_level"]),
-            },
-            "player": {
-                "hp": self._read_word(ADDR["player_battle_hp"]),
-                "level": self._read_byte(ADDR["player_battle_level"]),
-            },
-        }
-
-    def is_in_battle(self) -> bool:
-        return self._read_byte(ADDR["battle_type"]) != 0
-
-    def is_text_active(self) -> bool:
+        enemy_species = self._read_byte(ADDR["enemy_species"], ram)
+        return BattleState(
+            {1: "wild", 2: "trainer"}.get(battle_type, f"unknown_{battle_type}"),
+            Combatant(
+                self._read_word(ADDR["enemy_hp"], ram),
+                self._read_byte(ADDR["enemy_level"], ram),
+                enemy_species,
+                POKEMON_NAMES.get(enemy_species, f"Pokemon_{enemy_species:02X}"),
+            ),
+            Combatant(
+                self._read_word(ADDR["player_battle_hp"], ram),
+                self._read_byte(ADDR["player_battle_level"], ram),
+            ),
+        )
+
+    def get_battle_state(self, ram: Optional[RamSnapshot] = None) -> Optional[Dict[str, Any]]:
+        """Get current battle state, or None if not in battle."""
+        battle = self.read_battle(ram)
+        return battle.to_dict() if battle else None
+
+    def is_in_battle(self, ram: Optional[RamSnapshot] = None) -> bool:
+        return self._read_byte(ADDR["battle_type"], ram) != 0
+
+    def is_text_active(self, ram: Optional[RamSnapshot] = None) -> bool:
         """Check if a text box / dialogue is currently showing."""
-        return self._read_byte(ADDR["text_box_id"]) != 0
+        return self._read_byte(ADDR["text_box_id"], ram) != 0
 
     def _decode_status(self, status_byte: int) -> str:
         if status_byte == 0:
@@ -400,21 +805,25 @@ class PokemonGame:
             statuses.append(f"SLP({status_byte & 0x07})")
         return "/".join(statuses) if statuses else "OK"
 
+    def get_state(self, ram: Optional[RamSnapshot] = None) -> GameState:
+        """Get comprehensive game state as a GameState, decoded from one snapshot."""
+        if ram is None:
+            ram = self.snapshot()
+        battle = self.read_battle(ram)
+        return GameState(
+            self.read_position(ram),
+            self.read_party(ram),
+            self.get_badges(ram),
+            self.get_money(ram),
+            battle is not None,
+            self.is_text_active(ram),
+            battle,
+            ram.frame,
+        )
+
     def get_full_state(self) -> Dict[str, Any]:
-        """Get comprehensive game state for the AI."""
-        state = {
-            "position": self.get_player_position(),
-            "party": self.get_party(),
-            "badges": self.get_badges(),
-            "money": self.get_money(),
-            "in_battle": self.is_in_battle(),
-            "text_active": self.is_text_active(),
-            "frame": self.frame_count,
-        }
-        battle = self.get_battle_state()
-        if battle:
-            state["battle"] = battle
-        return state
+        """Get comprehensive game state for the AI, as a nested dict."""
+        return self.get_state().to_dict()
 
     # ==========================================
     # Save/Load
@@ -428,16 +837,176 @@ class PokemonGame:
         print(f"State saved: {path}")
 
     def load_state(self, name: str = "quicksave") -> bool:
-        """Load emulator state."""
+        """Load emulator state. The rewind ring restarts from the loaded state."""
         path = self.save_dir / f"{name}.state"
         if not path.exists():
             print(f"Save state not found: {path}")
             return False
         with open(path, "rb") as f:
             self.pyboy.load_state(f)
+        self._sync_watches()
+        if self.rewind_ring is not None:
+            # Ring states are from the timeline before the load
+            self.rewind_ring.clear()
+            self.save_rewind_point("load")
         print(f"State loaded: {path}")
         return True
 
+    # ==========================================
+    # Rewind (in-memory savestate ring)
+    # ==========================================
+
+    def enable_rewind(self, every: int = REWIND_EVERY_FRAMES, capacity: int = RING_CAPACITY,
+                      max_bytes: int = RING_MAX_BYTES, events: Tuple[str, ...] = REWIND_EVENTS):
+        """
+        Keep compressed savestates in memory to rewind to.
+
+        Args:
+            every: Frames between periodic savestates (checked after each tick())
+            capacity: Most savestates kept (oldest dropped first)
+            max_bytes: Most compressed bytes kept
+            events: Watch names whose changes also take a savestate
+        """
+        self.rewind_ring = SavestateRing(capacity, max_bytes)
+        self.rewind_every = every
+        for name in events:
+            self.watch(name, self._on_rewind_event)
+        self.save_rewind_point("start")
+
+    def _on_rewind_event(self, event: WatchEvent):
+        self.save_rewind_point(event.name)
+
+    def save_rewind_point(self, reason: str = "manual"):
+        """Add the current state to the rewind ring (no-op if rewind is off)."""
+        if self.rewind_ring is None:
+            return
+        buf = io.BytesIO()
+        self.pyboy.save_state(buf)
+        self.rewind_ring.push(self.frame_count, buf.getvalue(), reason)
+        self._rewind_last = self.frame_count
+
+    def rewind(self, frames: int) -> Optional[Dict[str, Any]]:
+        """
+        Go back at least `frames` frames, to the newest savestate at or before
+        that point. Savestates after it are discarded and the frame counter
+        goes back with the game.
+
+        Returns:
+            The restored entry ({"frame", "reason"}), or None if the ring
+            holds nothing that old
+        """
+        if self.rewind_ring is None:
+            return None
+        entry = self.rewind_ring.find(self.frame_count - max(frames, 0))
+        if entry is None:
+            return None
+        frame, reason = entry
+        self.pyboy.load_state(io.BytesIO(self.rewind_ring.get(frame)))
+        self.rewind_ring.truncate(frame)
+        self.frame_count = frame
+        self._sync_watches()
+        self._rewind_last = frame
+        return {"frame": frame, "reason": reason}
+
+    # ==========================================
+    # Input macros
+    # ==========================================
+
+    def run_macro(self, program: List[Any], until: Tuple[str, ...] = (),
+                  max_frames: int = MACRO_MAX_FRAMES) -> Dict[str, Any]:
+        """
+        Run an input program (see "Input macros" above) at full speed,
+        without rendering, checking the stop conditions after every frame.
+
+        Args:
+            program: List of macro steps
+            until: MACRO_CONDITIONS names; the first to fire ends the macro
+                   (a held button is released)
+            max_frames: Frames after which the macro is cut off
+
+        Returns:
+            Dict with stopped (the condition that fired, "max_frames", or
+            None if the program ran to the end), frames emulated, and a
+            trace of the steps run: {"press"/"wait", "frame", "frames"}
+        """
+        validate_macro(program, until)
+        checks = []
+        for name in until:
+            preset, fires = MACRO_CONDITIONS[name]
+            w = _Watch(WATCH_PRESETS[preset])
+            w.value = self._read_watch(w)
+            checks.append((name, w, fires))
+
+        start = self.frame_count
+        trace: List[Dict[str, Any]] = []
+
+        def fired() -> Optional[str]:
+            for name, w, fires in checks:
+                value = self._read_watch(w)
+                if value != w.value:
+                    changed, w.value = fires(w.value, value), value
+                    if changed:
+                        return name
+            return None
+
+        def advance(frames: int) -> Optional[str]:
+            for _ in range(frames):
+                if self.frame_count - start >= max_frames:
+                    return "max_frames"
+                self.tick(1)
+                stop = fired()
+                if stop:
+                    return stop
+            return None
+
+        def run(steps: List[Any]) -> Optional[str]:
+            for step in steps:
+                if isinstance(step, str):
+                    step = {"press": step}
+                if "repeat" in step:
+                    for _ in range(step["repeat"]):
+                        stop = run(step.get("do", []))
+                        if stop:
+                            return stop
+                    continue
+                frame = self.frame_count
+                if "press" in step:
+                    button = step["press"].lower()
+                    entry = {"press": button, "frame": frame}
+                    self.pyboy.button_press(button)
+                    try:
+                        stop = advance(step.get("hold", MACRO_HOLD_FRAMES))
+                    finally:
+                        self.pyboy.button_release(button)
+                    if not stop:
+                        stop = advance(step.get("wait", MACRO_WAIT_FRAMES))
+                else:
+                    entry = {"wait": step["wait"], "frame": frame}
+                    stop = advance(step["wait"])
+                entry["frames"] = self.frame_count - frame
+                trace.append(entry)
+                if stop:
+                    return stop
+            return None
+
+        # Like fast_forward(), but the closing rendered frame is counted and
+        # checked as part of the macro
+        rendering = self.render
+        self.render = False
+        self.pyboy.set_emulation_speed(0)
+        try:
+            stopped = run(program)
+        finally:
+            self.render = rendering
+            try:
+                if rendering:
+                    self.tick(1)
+                    stopped = stopped or fired()
+            finally:
+                self.pyboy.set_emulation_speed(self.speed)
+
+        return {"stopped": stopped, "frames": self.frame_count - start, "trace": trace}
+
     # ==========================================
     # High-level helpers
     # ==========================================
@@ -446,10 +1015,15 @@ class PokemonGame:
         """Just advance N frames without input."""
         self.tick(n)
 
-    def mash_a(self, times: int = 5, wait: int = 16):
-        """Mash A button to advance dialogue."""
-        for _ in range(times):
-            self.press_button("a", hold_frames=4, wait_frames=wait)
+    def mash_a(self, times: int = 5, wait: int = 16, until: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """
+        Mash A button to advance dialogue, all `times` presses by default.
+
+        Pass until=("text_closed",) to stop at the first box that closes;
+        dialogue spanning several boxes then needs further calls.
+        """
+        return self.run_macro([{"repeat": times, "do": [{"press": "a", "hold": 4, "wait": wait}]}],
+                              until=until)
 
     def format_state_for_ai(self) -> str:
         """Format game state as a readable string for the AI prompt."""
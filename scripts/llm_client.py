@@ -6,7 +6,7 @@ Use this instead of directly running PyBoy. The emulator runs persistently
 on the server, and this client sends commands via HTTP.
 
 Usage:
-    from llm_client import get_state, press, screenshot, save, load, fight, navigate
+    from llm_client import get_state, press, macro, screenshot, save, load, fight, navigate
 
     state = get_state()
     press(["up", "up", "a"], reasoning="Walking to door and interacting")
@@ -53,6 +53,29 @@ def press(buttons: List[str], hold: int = 8, wait: int = 16,
     return r.json()
 
 
+def macro(program: List[Any], until: Optional[List[str]] = None,
+          reasoning: str = "") -> Dict[str, Any]:
+    """Run a whole input program on the server in one request.
+    
+    Args:
+        program: Steps — "a", {"press": "a", "hold": 6, "wait": 20},
+                 {"wait": 30}, {"repeat": 8, "do": [...]}
+        until: Stop as soon as one of these happens: battle_start,
+               battle_end, text_open, text_closed, map_change, hp_change
+        reasoning: Why this action (logged for review)
+    
+    Returns:
+        Server response: state after ("data") and the macro trace ("macro")
+    """
+    r = requests.post(f"{SERVER}/api/macro", json={
+        "program": program,
+        "until": until or [],
+        "reasoning": reasoning,
+    }, timeout=60)
+    r.raise_for_status()
+    return r.json()
+
+
 def screenshot(save_path: Optional[str] = None) -> bytes:
     """Get current screenshot as PNG bytes.
     
@@ -101,17 +124,17 @@ def run_away(reasoning: str = "") -> Dict[str, Any]:
     """Try to flee from battle.
 
     Opens battle menu, selects RUN (down+right from FIGHT), then mashes A
-    through the result text.
+    through the result text. One macro; ends as soon as the battle does.
     """
-    press(["a"], reasoning=reasoning or "Trying to flee")
-    # Navigate to RUN: down from FIGHT, then right
-    press(["down"], hold=6, wait=20)
-    press(["right"], hold=6, wait=20)
-    press(["a"], hold=6, wait=20)
-    # Mash through result text
-    for _ in range(8):
-        press(["a"], hold=4, wait=15)
-    return get_state()
+    return macro([
+        "a",
+        # Navigate to RUN: down from FIGHT, then right
+        {"press": "down", "hold": 6, "wait": 20},
+        {"press": "right", "hold": 6, "wait": 20},
+        {"press": "a", "hold": 6, "wait": 20},
+        # Mash through result text
+        {"repeat": 8, "do": [{"press": "a", "hold": 4, "wait": 15}]},
+    ], until=["battle_end"], reasoning=reasoning or "Trying to flee")
 
 
 def snapshot() -> Dict[str, Any]:
@@ -199,25 +222,19 @@ def fight(move_index: int = 0, reasoning: str = "") -> Dict[str, Any]:
         reasoning: Why this move
     
     Returns:
-        Game state after the turn
+        Server response with the state after the turn ("data"); one macro
+        that ends early if the battle does
     """
-    # Press A to open fight menu
-    press(["a"], reasoning=reasoning)
-    # Select FIGHT
-    press(["a"], hold=6, wait=20)
+    # Press A to open fight menu, then select FIGHT
+    program = ["a", {"press": "a", "hold": 6, "wait": 20}]
     # Navigate to the right move
-    if move_index == 1:
-        press(["right"])
-    elif move_index == 2:
-        press(["down"])
-    elif move_index == 3:
-        press(["down", "right"])
-    # Select the move
-    press(["a"], hold=6, wait=20)
-    # Mash through battle animations
-    for _ in range(12):
-        press(["a"], hold=4, wait=15)
-    return get_state()
+    program += {1: ["right"], 2: ["down"], 3: ["down", "right"]}.get(move_index, [])
+    # Select the move, then mash through battle animations
+    program += [
+        {"press": "a", "hold": 6, "wait": 20},
+        {"repeat": 12, "do": [{"press": "a", "hold": 4, "wait": 15}]},
+    ]
+    return macro(program, until=["battle_end"], reasoning=reasoning)
 
 
 def navigate(destination: str) -> Dict[str, Any]:
@@ -239,12 +256,11 @@ def go_heal() -> Dict[str, Any]:
     return navigate("nearest_pokecenter")
 
 
-def mash_a(times: int = 5, wait: int = 16) -> Dict[str, Any]:
-    """Mash A button to advance dialogue."""
-    result = None
-    for _ in range(times):
-        result = press(["a"], hold=4, wait=wait, reasoning="Advancing dialogue")
-    return result
+def mash_a(times: int = 5, wait: int = 16, until: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Mash A button to advance dialogue (all presses, unless an `until`
+    condition such as "text_closed" fires first)."""
+    return macro([{"repeat": times, "do": [{"press": "a", "hold": 4, "wait": wait}]}],
+                 until=until, reasoning="Advancing dialogue")
 
 
 def walk(direction: str, steps: int = 1, reasoning: str = "") -> Dict[str, Any]:
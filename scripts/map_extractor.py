@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Pokemon Red — Collision Map Extractor
+
+Builds the same tiles/warps structure map_scanner.scan_map writes, but by
+reading the current map's block data, the tileset's passable-tile list and
+the warp/connection tables straight out of RAM and ROM instead of emulating
+a button press for every direction of every tile. A full map takes
+milliseconds.
+
+The rules follow the game's own movement code (pokered disassembly):
+    - a step's collision tile is the bottom-left 8x8 tile of the 16x16
+      square being entered; it must be in the tileset's passable list
+    - a few tile pairs block movement even when both are passable
+      (cave/forest elevation edges)
+    - stepping onto a warp whose tile is a door/stairs tile warps at once;
+      other warps (entrance mats) fire when walking off the map edge from them
+    - walking off the map edge onto a connected map is recorded as a warp,
+      like the scanner does
+    - ledges come out "blocked", as the scanner records them
+
+NPCs are not obstacles here (the scanner sees them wherever they stood).
+map_scanner's --extract mode spot-checks a fraction of tiles by probing.
+
+Usage:
+    from map_extractor import extract_map
+    map_data = extract_map(game)
+"""
+
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+from game import PokemonGame, MAP_NAMES
+
+# ============================================================
+# RAM / ROM locations (English Red/Blue)
+# ============================================================
+
+CUR_MAP_TILESET = 0xD367
+CUR_MAP_HEIGHT = 0xD368       # In blocks (2x2 player steps)
+CUR_MAP_WIDTH = 0xD369
+MAP_CONNECTIONS = 0xD370      # Bit 3 = north, 2 = south, 1 = west, 0 = east
+LAST_MAP = 0xD365             # Destination of warps to "the previous map"
+NUM_WARPS = 0xD3AE
+WARP_ENTRIES = 0xD3AF         # y, x, destination warp index, destination map
+TILESET_BANK = 0xD52B
+TILESET_BLOCKS_PTR = 0xD52C
+TILESET_COLLISION_PTR = 0xD530
+OVERWORLD_MAP = 0xC6E8        # Current map's blocks with a border of connection blocks
+MAP_BORDER = 3
+
+# Connection headers: map id, strip src/dest, strip length, map width,
+# y alignment, x alignment, view pointer (11 bytes each)
+CONNECTIONS = {
+    "up":    (0x08, 0xD371),
+    "down":  (0x04, 0xD37C),
+    "left":  (0x02, 0xD387),
+    "right": (0x01, 0xD392),
+}
+
+# ROM tables giving each map's header (for destination warp coordinates)
+MAP_HEADER_POINTERS = (0x00, 0x01AE)
+MAP_HEADER_BANKS = (0x03, 0x423D)
+LAST_MAP_ID = 0xFF
+
+DIRECTIONS = {
+    "up":    (0, -1),
+    "down":  (0,  1),
+    "left":  (-1, 0),
+    "right": ( 1, 0),
+}
+
+# Tilesets (wCurMapTileset values)
+OVERWORLD, REDS_HOUSE_1, MART, FOREST, REDS_HOUSE_2, DOJO, POKECENTER, GYM = range(8)
+HOUSE, FOREST_GATE, MUSEUM, UNDERGROUND, GATE, SHIP, SHIP_PORT, CEMETERY = range(8, 16)
+INTERIOR, CAVERN, LOBBY, MANSION, LAB, CLUB, FACILITY, PLATEAU = range(16, 24)
+
+# Tiles that warp the moment the player steps on them (doors, stairs, ladders)
+WARP_TILE_IDS = {
+    OVERWORLD:    {0x1B, 0x58},
+    REDS_HOUSE_1: {0x1A, 0x1C},
+    REDS_HOUSE_2: {0x1A, 0x1C},
+    MART:         {0x5E},
+    POKECENTER:   {0x5E},
+    FOREST:       {0x5A, 0x5C, 0x3A},
+    DOJO:         {0x4A},
+    GYM:          {0x4A},
+    HOUSE:        {0x54, 0x5C, 0x32},
+    FOREST_GATE:  {0x3B},
+    MUSEUM:       {0x3B},
+    GATE:         {0x3B},
+    UNDERGROUND:  {0x13},
+    SHIP:         {0x37, 0x39, 0x1E, 0x4A},
+    SHIP_PORT:    set(),
+    CEMETERY:     {0x1B, 0x13},
+    INTERIOR:     {0x15, 0x55, 0x04},
+    CAVERN:       {0x18, 0x1A, 0x22},
+    LOBBY:        {0x1A, 0x1C, 0x38},
+    MANSION:      {0x1A, 0x1C, 0x53},
+    LAB:          {0x34},
+    CLUB:         {0x1A, 0x1C},
+    FACILITY:     {0x43, 0x58, 0x20, 0x1B, 0x13},
+    PLATEAU:      {0x1B, 0x3B},
+}
+
+# Passable tile pairs the player still can't step between (either way)
+TILE_PAIR_COLLISIONS = {
+    (CAVERN, 0x20, 0x05), (CAVERN, 0x41, 0x05), (CAVERN, 0x2A, 0x05), (CAVERN, 0x05, 0x21),
+    (FOREST, 0x30, 0x2E), (FOREST, 0x52, 0x2E), (FOREST, 0x55, 0x2E), (FOREST, 0x56, 0x2E),
+    (FOREST, 0x20, 0x2E), (FOREST, 0x5E, 0x2E), (FOREST, 0x5F, 0x2E),
+}
+
+
+def _map_name(map_id: int) -> str:
+    return MAP_NAMES.get(map_id, f"Unknown_0x{map_id:02X}")
+
+
+class _Memory:
+    """Byte/word reads over PyBoy memory, with ROM bank selection."""
+
+    def __init__(self, game: PokemonGame):
+        self.mem = game.pyboy.memory
+
+    def byte(self, addr: int) -> int:
+        return self.mem[addr]
+
+    def word(self, addr: int) -> int:
+        return self.mem[addr] | (self.mem[addr + 1] << 8)
+
+    def rom(self, bank: int, addr: int) -> int:
+        # Bank 0 is always mapped at 0x0000-0x3FFF
+        return self.mem[0 if addr < 0x4000 else bank, addr]
+
+    def rom_word(self, bank: int, addr: int) -> int:
+        return self.rom(bank, addr) | (self.rom(bank, addr + 1) << 8)
+
+
+def map_warp_table(game: PokemonGame, map_id: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Warp entries of any map, read from its ROM header.
+
+    Returns:
+        List of (y, x, destination warp index, destination map id)
+    """
+    m = _Memory(game)
+    bank = m.rom(MAP_HEADER_BANKS[0], MAP_HEADER_BANKS[1] + map_id)
+    header = m.rom_word(MAP_HEADER_POINTERS[0], MAP_HEADER_POINTERS[1] + 2 * map_id)
+    # tileset, height, width, blocks ptr, text ptr, script ptr, connection flags
+    connections = m.rom(bank, header + 9) & 0x0F
+    objects = m.rom_word(bank, header + 10 + 11 * bin(connections).count("1"))
+    count = m.rom(bank, objects + 1)
+    return [
+        tuple(m.rom(bank, objects + 2 + 4 * i + k) for k in range(4))
+        for i in range(count)
+    ]
+
+
+def extract_map(game: PokemonGame, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Extract the walkable tiles reachable from the player's position on the
+    current map, with per-direction walk/blocked/warp results.
+
+    Returns a map data dict in the same format as map_scanner.scan_map.
+    """
+    start_time = time.time()
+    m = _Memory(game)
+
+    pos = game.get_player_position()
+    start_x, start_y = pos["x"], pos["y"]
+    map_id = pos["map_id"]
+    map_name = _map_name(map_id)
+
+    tileset = m.byte(CUR_MAP_TILESET)
+    width = m.byte(CUR_MAP_WIDTH) * 2
+    height = m.byte(CUR_MAP_HEIGHT) * 2
+    stride = m.byte(CUR_MAP_WIDTH) + 2 * MAP_BORDER
+    rows = m.byte(CUR_MAP_HEIGHT) + 2 * MAP_BORDER
+
+    # Passable tile list ($FF-terminated)
+    tileset_bank = m.byte(TILESET_BANK)
+    coll_ptr = m.word(TILESET_COLLISION_PTR)
+    passable: Set[int] = set()
+    while True:
+        tile = m.rom(tileset_bank, coll_ptr + len(passable))
+        if tile == 0xFF:
+            break
+        passable.add(tile)
+
+    blocks_ptr = m.word(TILESET_BLOCKS_PTR)
+    block_tiles: Dict[int, List[int]] = {}
+
+    def collision_tile(x: int, y: int) -> Optional[int]:
+        """Bottom-left 8x8 tile of the step square at (x, y); works into the border."""
+        bx, by = x // 2 + MAP_BORDER, y // 2 + MAP_BORDER
+        if not (0 <= bx < stride and 0 <= by < rows):
+            return None
+        block = m.byte(OVERWORLD_MAP + by * stride + bx)
+        tiles = block_tiles.get(block)
+        if tiles is None:
+            tiles = [m.rom(tileset_bank, blocks_ptr + block * 16 + i) for i in range(16)]
+            block_tiles[block] = tiles
+        return tiles[(y % 2) * 8 + 4 + (x % 2) * 2]
+
+    warp_tiles = WARP_TILE_IDS.get(tileset, set())
+    pair_collisions = {(a, b) for t, a, b in TILE_PAIR_COLLISIONS if t == tileset}
+    pair_collisions |= {(b, a) for a, b in pair_collisions}
+
+    # Current map's warps: (x, y) -> (dest map, dest warp index)
+    warp_entries: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    for i in range(m.byte(NUM_WARPS)):
+        wy, wx, dest_warp, dest_map = (m.byte(WARP_ENTRIES + 4 * i + k) for k in range(4))
+        warp_entries.setdefault((wx, wy), (dest_map, dest_warp))
+
+    dest_tables: Dict[int, List[Tuple[int, int, int, int]]] = {}
+
+    def warp_info(x: int, y: int) -> Optional[Dict[str, Any]]:
+        dest_map, dest_warp = warp_entries[(x, y)]
+        if dest_map == LAST_MAP_ID:
+            dest_map = m.byte(LAST_MAP)
+        if dest_map not in dest_tables:
+            dest_tables[dest_map] = map_warp_table(game, dest_map)
+        table = dest_tables[dest_map]
+        if dest_warp >= len(table):
+            return None
+        dest_y, dest_x = table[dest_warp][:2]
+        return {"map_id": dest_map, "map_name": _map_name(dest_map), "dest_x": dest_x, "dest_y": dest_y}
+
+    def connection_info(direction: str, x: int, y: int) -> Optional[Dict[str, Any]]:
+        bit, header = CONNECTIONS[direction]
+        if not m.byte(MAP_CONNECTIONS) & bit:
+            return None
+        dest_map = m.byte(header)
+        y_align, x_align = m.byte(header + 7), m.byte(header + 8)
+        if direction in ("up", "down"):
+            dest_x, dest_y = (x + x_align) & 0xFF, y_align
+        else:
+            dest_x, dest_y = x_align, (y + y_align) & 0xFF
+        return {"map_id": dest_map, "map_name": _map_name(dest_map), "dest_x": dest_x, "dest_y": dest_y}
+
+    def move(x: int, y: int, direction: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        dx, dy = DIRECTIONS[direction]
+        nx, ny = x + dx, y + dy
+        here, there = collision_tile(x, y), collision_tile(nx, ny)
+        collides = there not in passable or (here, there) in pair_collisions
+        if not (0 <= nx < width and 0 <= ny < height):
+            if not collides:
+                info = connection_info(direction, x, y)
+                return ("warp", info) if info else ("blocked", None)
+            if (x, y) in warp_entries:
+                # Bumping the map edge while standing on a warp (entrance mats)
+                info = warp_info(x, y)
+                return ("warp", info) if info else ("blocked", None)
+            return "blocked", None
+        if collides:
+            return "blocked", None
+        if (nx, ny) in warp_entries and there in warp_tiles:
+            info = warp_info(nx, ny)
+            return ("warp", info) if info else ("blocked", None)
+        return "walk", None
+
+    tiles: Dict[str, Dict[str, str]] = {}
+    warps: Dict[str, Dict[str, Dict]] = {}
+    queue = deque([(start_x, start_y)])
+    visited = {(start_x, start_y)}
+
+    while queue:
+        cx, cy = queue.popleft()
+        tile_key = f"{cx},{cy}"
+        tile_data = {}
+        for direction, (dx, dy) in DIRECTIONS.items():
+            result, info = move(cx, cy, direction)
+            tile_data[direction] = result
+            if result == "warp":
+                warps.setdefault(tile_key, {})[direction] = info
+            elif result == "walk" and (cx + dx, cy + dy) not in visited:
+                visited.add((cx + dx, cy + dy))
+                queue.append((cx + dx, cy + dy))
+        tiles[tile_key] = tile_data
+
+    elapsed = time.time() - start_time
+
+    all_x = [int(k.split(",")[0]) for k in tiles]
+    all_y = [int(k.split(",")[1]) for k in tiles]
+    map_data = {
+        "map_name": map_name,
+        "map_id": map_id,
+        "bounds": {
+            "min_x": min(all_x),
+            "max_x": max(all_x),
+            "min_y": min(all_y),
+            "max_y": max(all_y),
+        },
+        "tiles": tiles,
+        "warps": warps,
+        "scan_seconds": round(elapsed, 3),
+        "scan_method": "extract",
+    }
+
+    if verbose:
+        print(f"Extracted: {map_name} (id={map_id}, tileset={tileset}) — "
+              f"{len(tiles)} tiles, {len(warps)} warps in {1000 * elapsed:.1f}ms")
+
+    return map_data
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Pokemon Red — Binary Map Pack
+
+Packs every map in game_state/maps into one compact binary file
+(maps.pack) that loads without json.load. The JSON files stay the
+human-readable source of truth: each pack entry records the mtime and
+size of the JSON it was built from, and is ignored once that changes.
+
+Layout (little-endian):
+    header   magic "PKMP", version, map count
+    index    one fixed-size entry per map (source file, meta, warps, source
+             stat, grid geometry, grid offset)
+    data     string/meta/warp JSON blobs, bit-packed tile grids
+
+Grid bytes use the pathfinder's compiled tile flags (low nibble = walk
+directions, high nibble = warp directions, 0xFF = no tile), so a map can
+be searched straight out of the pack without re-compiling. Warps are kept
+as their full JSON, so a map decodes equal to its source file; maps whose
+tiles the flags can't represent are left out of the pack.
+
+Usage:
+    python scripts/map_pack.py            # rebuild maps.pack from the JSONs
+    python scripts/map_pack.py --check    # verify every entry round-trips
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+from pathfinder import MAPS_DIR, DIRECTIONS, WALK_BITS, WARP_BITS, NO_TILE, CompiledMap
+
+PACK_NAME = "maps.pack"
+MAGIC = b"PKMP"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHH")  # magic, version, map count
+# source file name (off, len), meta JSON (off, len), warps JSON (off, len),
+# source mtime_ns, source size, grid min_x, min_y, width, height, grid offset
+ENTRY = struct.Struct("<IHIIIIqqhhHHI")
+
+DIRECTION_NAMES = list(DIRECTIONS)
+
+# Tile dict for every possible flags byte, copied per tile on decode
+_TILE_TEMPLATES = [
+    {d: ("walk" if flags & WALK_BITS[d] else "warp" if flags & WARP_BITS[d] else "blocked")
+     for d in DIRECTION_NAMES}
+    for flags in range(256)
+]
+
+Signature = Tuple[int, int]  # (mtime_ns, size) of the source JSON
+
+
+def file_signature(path: Path) -> Signature:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def packable(data: Dict[str, Any]) -> bool:
+    """Whether every tile has the four directions, each walk, warp or blocked
+    (anything else wouldn't survive the grid flags)."""
+    return all(
+        tile.keys() == DIRECTIONS.keys() and all(v in ("walk", "warp", "blocked") for v in tile.values())
+        for tile in data["tiles"].values()
+    )
+
+
+def encode_pack(entries: Dict[str, Tuple[Signature, Dict[str, Any]]]) -> bytes:
+    """Encode {json file name: (source signature, map_data)} into pack bytes.
+
+    Raises ValueError for a map that isn't packable().
+    """
+    blobs = bytearray()
+    strings: Dict[str, Tuple[int, int]] = {}
+
+    def add_string(s: str) -> Tuple[int, int]:
+        if s not in strings:
+            raw = s.encode("utf-8")
+            strings[s] = (len(blobs), len(raw))
+            blobs.extend(raw)
+        return strings[s]
+
+    # Offsets below are relative to the data section; fixed up after the index
+    index: List[tuple] = []
+    grids = bytearray()
+    for file_name, (sig, data) in sorted(entries.items()):
+        if not packable(data):
+            raise ValueError(f"{file_name}: tiles can't be packed")
+        cm = CompiledMap(data)
+        meta = {k: v for k, v in data.items() if k not in ("tiles", "warps")}
+        name_off, name_len = add_string(file_name)
+        meta_off, meta_len = add_string(json.dumps(meta, separators=(",", ":")))
+        warps_off, warps_len = add_string(json.dumps(data.get("warps", {}), separators=(",", ":")))
+
+        grid_off = len(grids)
+        grids.extend(cm.grid)
+
+        index.append((name_off, name_len, meta_off, meta_len, warps_off, warps_len, sig[0], sig[1],
+                      cm.min_x, cm.min_y, cm.width, cm.height, grid_off))
+
+    data_start = HEADER.size + ENTRY.size * len(index)
+    grids_start = data_start + len(blobs)
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(index)))
+    for (name_off, name_len, meta_off, meta_len, warps_off, warps_len, mtime, size,
+         min_x, min_y, width, height, grid_off) in index:
+        out.extend(ENTRY.pack(data_start + name_off, name_len, data_start + meta_off, meta_len,
+                              data_start + warps_off, warps_len, mtime, size,
+                              min_x, min_y, width, height, grids_start + grid_off))
+    out.extend(blobs)
+    out.extend(grids)
+    return bytes(out)
+
+
+def write_pack(path: Path, entries: Dict[str, Tuple[Signature, Dict[str, Any]]]):
+    """Atomically write a pack file (through a uniquely named temp file, so
+    concurrent writers never share one)."""
+    data = encode_pack(entries)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".",
+                                     suffix=".tmp", delete=False) as f:
+        tmp_path = Path(f.name)
+        try:
+            f.write(data)
+        except BaseException:
+            f.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class MapPack:
+    """Read-only, mmap-backed view of a pack file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path}: not a v{VERSION} map pack")
+        self._index: Dict[str, tuple] = {}
+        for i in range(count):
+            entry = ENTRY.unpack_from(self._mm, HEADER.size + i * ENTRY.size)
+            self._index[self._string(entry[0], entry[1])] = entry
+
+    def _string(self, off: int, length: int) -> str:
+        return self._mm[off:off + length].decode("utf-8")
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def files(self) -> List[str]:
+        return list(self._index)
+
+    def signature(self, file_name: str) -> Optional[Signature]:
+        entry = self._index.get(file_name)
+        return (entry[6], entry[7]) if entry else None
+
+    def load(self, file_name: str) -> Tuple[Dict[str, Any], CompiledMap]:
+        """Decode one map into (map_data dict, compiled grid)."""
+        (_, _, meta_off, meta_len, warps_off, warps_len, _, _,
+         min_x, min_y, width, height, grid_off) = self._index[file_name]
+        data = json.loads(self._string(meta_off, meta_len))
+        grid = bytearray(self._mm[grid_off:grid_off + width * height])
+
+        tiles: Dict[str, Dict[str, str]] = {}
+        templates = _TILE_TEMPLATES
+        i = 0
+        for y in range(min_y, min_y + height):
+            for x in range(min_x, min_x + width):
+                flags = grid[i]
+                if flags != NO_TILE:
+                    tiles[f"{x},{y}"] = dict(templates[flags])
+                i += 1
+
+        data["tiles"] = tiles
+        data["warps"] = json.loads(self._string(warps_off, warps_len))
+        return data, CompiledMap.from_grid(data["map_name"], min_x, min_y, width, height, grid)
+
+    def load_if_current(self, file_name: str, sig: Signature) -> Optional[Tuple[Dict[str, Any], CompiledMap]]:
+        """Decode a map only if the pack entry was built from the JSON with this signature."""
+        if self.signature(file_name) != sig:
+            return None
+        return self.load(file_name)
+
+
+def open_pack(maps_dir: Path = MAPS_DIR) -> Optional[MapPack]:
+    """Open maps_dir's pack, or None if it's missing or unreadable."""
+    try:
+        return MapPack(Path(maps_dir) / PACK_NAME)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def build_pack(maps_dir: Path = MAPS_DIR,
+               known: Optional[Dict[Path, Tuple[Signature, Dict[str, Any]]]] = None) -> Path:
+    """
+    Rebuild maps_dir's pack from its JSON files.
+
+    Args:
+        known: Already-parsed maps as {json path: (signature, map_data)}. Other
+               files are taken from the existing pack when still current, and
+               only parsed from JSON otherwise.
+
+    Returns:
+        Path of the written pack
+    """
+    maps_dir = Path(maps_dir)
+    known = {Path(p).name: v for p, v in (known or {}).items()}
+    entries: Dict[str, Tuple[Signature, Dict[str, Any]]] = {}
+    old = open_pack(maps_dir)
+    try:
+        for path in sorted(maps_dir.glob("*.json")):
+            sig = file_signature(path)
+            if path.name in known and known[path.name][0] == sig:
+                entries[path.name] = known[path.name]
+                continue
+            loaded = old.load_if_current(path.name, sig) if old else None
+            if loaded:
+                entries[path.name] = (sig, loaded[0])
+                continue
+            try:
+                with open(path) as fh:
+                    data = json.load(fh)
+                data["map_name"]
+            except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                continue
+            entries[path.name] = (sig, data)
+    finally:
+        if old:
+            old.close()
+
+    # Maps the pack can't represent are read from their JSON instead
+    entries = {name: entry for name, entry in entries.items() if packable(entry[1])}
+    pack_path = maps_dir / PACK_NAME
+    write_pack(pack_path, entries)
+    return pack_path
+
+
+def main():
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Pokemon Red Map Pack")
+    parser.add_argument("--dir", default=str(MAPS_DIR), help="Maps directory")
+    parser.add_argument("--check", action="store_true", help="Verify the pack matches the JSON files")
+    args = parser.parse_args()
+    maps_dir = Path(args.dir)
+
+    if not args.check:
+        path = build_pack(maps_dir)
+        print(f"Wrote {path} ({path.stat().st_size} bytes)")
+        return
+
+    pack = open_pack(maps_dir)
+    if pack is None:
+        print(f"No readable {PACK_NAME} in {maps_dir}")
+        sys.exit(1)
+    with pack:
+        ok = True
+        for path in sorted(maps_dir.glob("*.json")):
+            t0 = time.perf_counter()
+            with open(path) as fh:
+                expected = json.load(fh)
+            t1 = time.perf_counter()
+            loaded = pack.load_if_current(path.name, file_signature(path))
+            t2 = time.perf_counter()
+            if loaded is None and not packable(expected):
+                print(f"  JSON   {path.name}  (tiles can't be packed)")
+            elif loaded is None:
+                print(f"  STALE  {path.name}")
+                ok = False
+            elif loaded[0] != expected:
+                print(f"  DIFF   {path.name}")
+                ok = False
+            else:
+                print(f"  ok     {path.name}  json {1000 * (t1 - t0):.2f}ms  pack {1000 * (t2 - t1):.2f}ms")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ to test movement. No RAM teleporting (that bypasses collision detection).
 Usage:
     python scripts/map_scanner.py --save outside_after_parcel
     python scripts/map_scanner.py --save outside_after_parcel --chain
+    python scripts/map_scanner.py --save outside_after_parcel --chain --workers 8
+    python scripts/map_scanner.py --save outside_after_parcel --chain --extract --verify 0.05
+    python scripts/map_scanner.py --save outside_after_parcel --chain --incremental
 """
 
 import os
@@ -19,19 +22,33 @@ import sys
 import io
 import json
 import time
+import pickle
+import random
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from collections import deque
-from typing import Dict, Any, Optional, Tuple, Set
+from typing import Dict, Any, List, Optional, Tuple, Set, Callable
 
 sys.path.insert(0, os.path.dirname(__file__))
 from game import PokemonGame, MAP_NAMES
+from map_pack import build_pack
+from pathfinder import MAP_CACHE, load_map
+from map_extractor import extract_map
+from state_store import StateStore
 
 PROJECT = Path(__file__).resolve().parent.parent
 ROM_PATH = PROJECT / "PokemonRed.gb"
 SAVES_DIR = PROJECT / "saves"
 MAPS_DIR = PROJECT / "game_state" / "maps"
 MAPS_DIR.mkdir(parents=True, exist_ok=True)
+CHECKPOINTS_DIR = MAPS_DIR / ".checkpoints"
+REPORTS_DIR = MAPS_DIR / "reports"
+
+# Tiles scanned between checkpoint writes (0 = never checkpoint)
+CHECKPOINT_EVERY = 50
+CHECKPOINT_VERSION = 2
 
 # Direction vectors
 DIRECTIONS = {
@@ -40,10 +57,10 @@ DIRECTIONS = {
     "left":  (-1, 0),
     "right": ( 1, 0),
 }
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
 
-# How many frames to advance after pressing a direction to let the game settle
-MOVE_FRAMES = 16
-SETTLE_FRAMES = 20
+# Share of inferred (symmetric) edges that are still emulated as a check
+INFER_VERIFY_RATE = 0.05
 
 
 def map_name_to_filename(map_name: str) -> str:
@@ -55,16 +72,24 @@ def get_map_path(map_name: str) -> Path:
     return MAPS_DIR / f"{map_name_to_filename(map_name)}.json"
 
 
+# Seconds spent saving/loading savestates in this process (scan telemetry)
+_state_io = {"load_s": 0.0, "save_s": 0.0}
+
+
 def save_pyboy_state(game: PokemonGame) -> bytes:
     """Save the current PyBoy emulator state to bytes."""
+    t0 = time.perf_counter()
     buf = io.BytesIO()
     game.pyboy.save_state(buf)
+    _state_io["save_s"] += time.perf_counter() - t0
     return buf.getvalue()
 
 
 def load_pyboy_state(game: PokemonGame, state_bytes: bytes):
     """Load a PyBoy emulator state from bytes."""
+    t0 = time.perf_counter()
     game.pyboy.load_state(io.BytesIO(state_bytes))
+    _state_io["load_s"] += time.perf_counter() - t0
 
 
 def test_direction(game: PokemonGame, state_bytes: bytes, direction: str) -> Tuple[str, Optional[Dict]]:
@@ -74,6 +99,21 @@ def test_direction(game: PokemonGame, state_bytes: bytes, direction: str) -> Tup
     
     warp_info is a dict with map_id, map_name, dest_x, dest_y if it's a warp.
     """
+    result, warp_info, _ = probe_direction(game, state_bytes, direction)
+    return result, warp_info
+
+
+def probe_direction(game: PokemonGame, state_bytes: bytes, direction: str,
+                    capture: bool = False) -> Tuple[str, Optional[Dict], Optional[bytes]]:
+    """
+    test_direction, optionally keeping the emulator state after the move.
+    
+    Args:
+        capture: If True and the move is a walk, save the state the player
+                 ends up in (standing on the neighbor tile)
+    
+    Returns: (result, warp_info_or_None, neighbor_state_or_None)
+    """
     # Load the state
     load_pyboy_state(game, state_bytes)
     game.tick(2)  # Let state settle
@@ -84,9 +124,8 @@ def test_direction(game: PokemonGame, state_bytes: bytes, direction: str) -> Tup
     before_y = before_pos["y"]
     before_map = before_pos["map_id"]
     
-    # Press the direction button
-    game.press_button(direction, hold_frames=8, wait_frames=SETTLE_FRAMES)
-    game.tick(MOVE_FRAMES)
+    # Take the step; a map change is all we need to see, not the fade-in
+    game.step(direction, wait_transition=False)
     
     # Read new position
     after_pos = game.get_player_position()
@@ -102,25 +141,253 @@ def test_direction(game: PokemonGame, state_bytes: bytes, direction: str) -> Tup
             "map_name": MAP_NAMES.get(after_map, f"Unknown_0x{after_map:02X}"),
             "dest_x": after_x,
             "dest_y": after_y,
-        }
+        }, None
     
     dx, dy = DIRECTIONS[direction]
     expected_x = before_x + dx
     expected_y = before_y + dy
     
     if after_x == expected_x and after_y == expected_y:
-        return "walk", None
+        return "walk", None, save_pyboy_state(game) if capture else None
     else:
-        return "blocked", None
+        return "blocked", None, None
 
 
-def scan_map(game: PokemonGame, verbose: bool = True) -> Dict[str, Any]:
+def probe_tile(game: PokemonGame, state_bytes: bytes, cx: int, cy: int,
+               skip: Set[Tuple[int, int]],
+               inferred: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], Dict[str, Dict], Dict[Tuple[int, int], bytes], Dict[str, float]]:
+    """
+    Test all 4 directions from one tile.
+    
+    A walk into an undiscovered tile keeps the state it ends in, so every
+    edge is emulated exactly once.
+    
+    Args:
+        state_bytes: Saved state with the player standing on (cx, cy)
+        skip: Tiles already discovered — no neighbor state is kept for them
+        inferred: Directions whose result is already known (see
+                  infer_edges); these aren't emulated
+    
+    Returns:
+        (tile_data, warps from this tile by direction,
+         {newly found walkable neighbor: saved state there},
+         stats: frames emulated, probes, and seconds probing / loading /
+         saving states)
+    """
+    tile_data = {}
+    tile_warps = {}
+    neighbors: Dict[Tuple[int, int], bytes] = {}
+    start_frame = game.frame_count
+    start_io = dict(_state_io)
+    t0 = time.perf_counter()
+    
+    for direction in ["up", "down", "left", "right"]:
+        if inferred and direction in inferred:
+            tile_data[direction] = inferred[direction]
+            continue
+        dx, dy = DIRECTIONS[direction]
+        neighbor = (cx + dx, cy + dy)
+        result, warp_info, neighbor_state = probe_direction(
+            game, state_bytes, direction, capture=neighbor not in skip)
+        tile_data[direction] = result
+        
+        if result == "warp" and warp_info:
+            tile_warps[direction] = warp_info
+        elif neighbor_state is not None:
+            neighbors[neighbor] = neighbor_state
+    
+    stats = {
+        "frames": game.frame_count - start_frame,
+        "probes": 4 - len(inferred or ()),
+        "probe_s": time.perf_counter() - t0,
+        "load_s": _state_io["load_s"] - start_io["load_s"],
+        "save_s": _state_io["save_s"] - start_io["save_s"],
+    }
+    return tile_data, tile_warps, neighbors, stats
+
+
+def infer_edges(tiles: Dict[str, Dict[str, str]], warps: Dict[str, Dict],
+                cx: int, cy: int, start_key: str) -> Dict[str, str]:
+    """
+    Directions from (cx, cy) whose result follows from a scanned neighbor.
+    
+    If the neighbor walked into this tile, walking back is a walk too. Only
+    walk edges are mirrored: ledges (recorded "blocked" from both sides),
+    warps and map-edge moves are always emulated. Neighbors with warps and
+    the scan's start tile (which may be a staircase the player arrived on)
+    are never inferred into. Incomplete neighbors (see incomplete_tiles)
+    only count for the directions they have.
+    """
+    inferred = {}
+    for direction, (dx, dy) in DIRECTIONS.items():
+        key = f"{cx + dx},{cy + dy}"
+        neighbor = tiles.get(key)
+        if neighbor and neighbor.get(OPPOSITE[direction]) == "walk" and key not in warps and key != start_key:
+            inferred[direction] = "walk"
+    return inferred
+
+
+# ============================================================
+# Checkpoints
+# A scan in progress is written to game_state/maps/.checkpoints/ every
+# CHECKPOINT_EVERY tiles: results so far, the visited set, and the BFS
+# queue with the saved state of every queued tile (plus warp tiles, which
+# chain scanning needs) and the start state they're delta-encoded against.
+# scan_map resumes from it and deletes it when done.
+# ============================================================
+
+def get_checkpoint_path(map_id: int) -> Path:
+    return CHECKPOINTS_DIR / f"map_{map_id:02x}.ckpt"
+
+
+def save_checkpoint(checkpoint: Dict[str, Any]):
+    """Atomically write a scan checkpoint."""
+    CHECKPOINTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = get_checkpoint_path(checkpoint["map_id"])
+    tmp_path = path.with_suffix(".ckpt.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(map_id: int) -> Optional[Dict[str, Any]]:
+    """The checkpoint of an unfinished scan of map_id, or None."""
+    path = get_checkpoint_path(map_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            checkpoint = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        print(f"  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("map_id") != map_id:
+        return None
+    return checkpoint
+
+
+def clear_checkpoint(map_id: int):
+    get_checkpoint_path(map_id).unlink(missing_ok=True)
+
+
+def incomplete_tiles(map_data: Dict[str, Any]) -> Set[str]:
+    """Keys of a map's tiles that don't have a result for all four directions."""
+    return {key for key, tile_data in map_data["tiles"].items() if tile_data.keys() != DIRECTIONS.keys()}
+
+
+def missing_tiles(map_data: Dict[str, Any]) -> Set[Tuple[int, int]]:
+    """Tiles a map's walk edges lead to that the map has no entry for."""
+    tiles = map_data["tiles"]
+    missing = set()
+    for key, tile_data in tiles.items():
+        x, y = (int(c) for c in key.split(","))
+        for direction, result in tile_data.items():
+            dx, dy = DIRECTIONS[direction]
+            if result == "walk" and f"{x + dx},{y + dy}" not in tiles:
+                missing.add((x + dx, y + dy))
+    return missing
+
+
+# ============================================================
+# Scan reports
+# Telemetry of each scan goes to game_state/maps/reports/<map>.json, so
+# scanner modes can be compared and slow phases spotted.
+# ============================================================
+
+def get_report_path(map_name: str) -> Path:
+    return REPORTS_DIR / f"{map_name_to_filename(map_name)}.json"
+
+
+def result_histogram(tiles: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, int]]:
+    """Per direction, how many tiles came out walk/blocked/warp."""
+    histogram = {d: {"walk": 0, "blocked": 0, "warp": 0} for d in DIRECTIONS}
+    for tile_data in tiles.values():
+        for direction, result in tile_data.items():
+            histogram[direction][result] = histogram[direction].get(result, 0) + 1
+    return histogram
+
+
+def save_scan_report(report: Dict[str, Any], verbose: bool = True) -> Path:
+    """Write a scan's telemetry report next to the map files."""
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = get_report_path(report["map_name"])
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+    if verbose:
+        print(f"  Report: {path}")
+    return path
+
+
+# ============================================================
+# Parallel scanning
+# Each worker process owns its own emulator. The BFS runs level by level:
+# the whole frontier is sharded across workers as (state bytes, tile)
+# tasks, and results are merged in frontier order, so the map (and which
+# state each tile keeps) comes out exactly as from a serial scan. A
+# frontier mixing both (x + y) parities (after a resume or incremental
+# seeding) goes out as two waves, one per parity: walk edges only join
+# tiles of opposite parity, so no two tiles in flight are neighbors and
+# edge inference sees every neighbor recorded before it.
+# ============================================================
+
+_worker_game: Optional[PokemonGame] = None
+
+
+def _init_worker(rom_path: str, save_dir: str):
+    global _worker_game
+    _worker_game = PokemonGame(rom_path, headless=True, speed=0, save_dir=save_dir, render=False)
+    if not _worker_game.start():
+        raise RuntimeError("Failed to start emulator in scan worker")
+
+
+def _probe_tile_task(state_bytes: bytes, cx: int, cy: int, skip: Set[Tuple[int, int]],
+                     inferred: Optional[Dict[str, str]] = None):
+    return probe_tile(_worker_game, state_bytes, cx, cy, skip, inferred)
+
+
+def make_scan_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool of `workers` emulator instances for scan_map(pool=...)."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(str(ROM_PATH), str(SAVES_DIR)),
+    )
+
+
+def scan_map(game: PokemonGame, verbose: bool = True,
+             pool: Optional[ProcessPoolExecutor] = None,
+             existing: Optional[Dict[str, Any]] = None,
+             checkpoint_every: int = CHECKPOINT_EVERY,
+             resume: bool = True,
+             infer: bool = True,
+             verify_rate: float = INFER_VERIFY_RATE,
+             report: bool = True,
+             reports: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
     BFS flood-fill scan of the current map from the player's current position.
     
     For each reachable tile, tests all 4 directions and records whether
     movement is walk/blocked/warp.
     
+    Args:
+        game: Emulator positioned on the map to scan
+        verbose: Print progress
+        pool: Optional worker pool from make_scan_pool(); tiles are then
+              probed in parallel, one BFS level at a time
+        existing: Earlier map data for this map (incremental scan): its tiles
+                  are kept and only tiles missing from it are probed
+        checkpoint_every: Tiles between checkpoint writes (0 = off)
+        resume: Continue from this map's checkpoint if there is one
+        infer: Mirror walk edges from scanned neighbors instead of
+               emulating them (see infer_edges)
+        verify_rate: Share of inferable edges emulated anyway and compared
+        report: Write a telemetry report (see save_scan_report)
+        reports: Append the report here instead of writing it (scan
+                 workers hand it to the main process)
+    
     Returns a map data dict ready to save as JSON.
     """
     start_time = time.time()
@@ -132,69 +399,145 @@ def scan_map(game: PokemonGame, verbose: bool = True) -> Dict[str, Any]:
     map_name = MAP_NAMES.get(map_id, f"Unknown_0x{map_id:02X}")
     
     if verbose:
-        print(f"Scanning: {map_name} (id={map_id}) starting at ({start_x}, {start_y})")
+        mode = " (parallel)" if pool else ""
+        print(f"Scanning: {map_name} (id={map_id}) starting at ({start_x}, {start_y}){mode}")
     
     # Data structures
     tiles: Dict[str, Dict[str, str]] = {}
     warps: Dict[str, Dict[str, Dict]] = {}
-    tile_states: Dict[str, bytes] = {}  # (x,y) key -> saved state bytes
+    tile_states = StateStore()  # (x,y) key -> saved state bytes, compressed
     
     # BFS queue: positions to explore
     queue = deque()
     visited: Set[Tuple[int, int]] = set()
     
-    # Save initial state and start BFS
-    initial_state = save_pyboy_state(game)
+    tile_count = 0
+    frames = 0
+    resumed_seconds = 0.0
     start_key = f"{start_x},{start_y}"
-    tile_states[start_key] = initial_state
-    queue.append((start_x, start_y))
-    visited.add((start_x, start_y))
+    rng = random.Random(map_id)
+    inferred_count = verified_count = 0
+    mismatches = []
+    # Seconds (summed over workers when parallel) and emulated probes
+    telemetry = {"probes": 0, "probe_s": 0.0, "load_s": 0.0, "save_s": 0.0, "expansion_s": 0.0}
     
-    tile_count = 0
+    checkpoint = load_checkpoint(map_id) if resume and checkpoint_every > 0 else None
+    if checkpoint:
+        tiles, warps = checkpoint["tiles"], checkpoint["warps"]
+        tile_states = StateStore(base=checkpoint["base"])
+        tile_states.update(checkpoint["states"])
+        start_key = checkpoint.get("start_key", start_key)
+        visited = set(checkpoint["visited"])
+        queue.extend(checkpoint["queue"])
+        tile_count, frames = checkpoint["tile_count"], checkpoint["frames"]
+        resumed_seconds = checkpoint["seconds"]
+        telemetry.update(checkpoint.get("telemetry", {}))
+        if verbose:
+            print(f"  Resuming from checkpoint: {len(tiles)} tiles done, {len(queue)} queued")
+    else:
+        # Save initial state and start BFS
+        initial_state = save_pyboy_state(game)
+        # Every state on this map is stored as a delta against the start
+        tile_states.base = initial_state
+        tile_states[start_key] = initial_state
+        queue.append((start_x, start_y))
+        visited.add((start_x, start_y))
     
-    while queue:
-        cx, cy = queue.popleft()
+    def plan(cx: int, cy: int) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Split a tile's inferable edges into (skip emulating, emulate and check)."""
+        nonlocal inferred_count
+        if not infer:
+            return {}, {}
+        inferred, checks = {}, {}
+        for direction, result in infer_edges(tiles, warps, cx, cy, start_key).items():
+            (checks if rng.random() < verify_rate else inferred)[direction] = result
+        inferred_count += len(inferred)
+        return inferred, checks
+    
+    def record(cx: int, cy: int, result, checks: Dict[str, str]) -> None:
+        nonlocal tile_count, frames, verified_count
+        tile_data, tile_warps, neighbors, stats = result
+        frames += stats["frames"]
+        for k in ("probes", "probe_s", "load_s", "save_s"):
+            telemetry[k] += stats[k]
+        t0 = time.perf_counter()
         tile_key = f"{cx},{cy}"
-        state = tile_states[tile_key]
+        for direction, expected in checks.items():
+            verified_count += 1
+            if tile_data[direction] != expected:
+                mismatches.append((tile_key, direction, expected, tile_data[direction]))
+        tiles[tile_key] = tile_data
+        if tile_warps:
+            warps[tile_key] = tile_warps
+        for (nx, ny), neighbor_state in neighbors.items():
+            if (nx, ny) in visited:
+                continue  # found by an earlier tile in the same parallel level
+            visited.add((nx, ny))
+            tile_states[f"{nx},{ny}"] = neighbor_state
+            queue.append((nx, ny))
+        telemetry["expansion_s"] += time.perf_counter() - t0
         
         tile_count += 1
         if verbose and tile_count % 20 == 0:
             print(f"  Scanned {tile_count} tiles... (queue: {len(queue)})")
-        
-        tile_data = {}
-        
-        for direction in ["up", "down", "left", "right"]:
-            result, warp_info = test_direction(game, state, direction)
-            tile_data[direction] = result
-            
-            if result == "warp" and warp_info:
-                if tile_key not in warps:
-                    warps[tile_key] = {}
-                warps[tile_key][direction] = warp_info
-            
-            elif result == "walk":
-                # The neighbor tile is walkable — add it to BFS if not visited
-                dx, dy = DIRECTIONS[direction]
-                nx, ny = cx + dx, cy + dy
-                if (nx, ny) not in visited:
-                    visited.add((nx, ny))
-                    # We need a state AT the neighbor tile
-                    # Load the original state and walk there
-                    load_pyboy_state(game, state)
-                    game.tick(2)
-                    game.press_button(direction, hold_frames=8, wait_frames=SETTLE_FRAMES)
-                    game.tick(MOVE_FRAMES)
-                    
-                    # Verify we actually arrived
-                    check_pos = game.get_player_position()
-                    if check_pos["x"] == nx and check_pos["y"] == ny and check_pos["map_id"] == map_id:
-                        neighbor_key = f"{nx},{ny}"
-                        tile_states[neighbor_key] = save_pyboy_state(game)
-                        queue.append((nx, ny))
-        
-        tiles[tile_key] = tile_data
     
-    elapsed = time.time() - start_time
+    if existing and not checkpoint:
+        _seed_incremental(game, existing, start_key, initial_state,
+                          tiles, warps, tile_states, queue, visited, record, verbose)
+    
+    last_checkpoint = tile_count
+    
+    def maybe_checkpoint() -> None:
+        nonlocal last_checkpoint
+        if checkpoint_every <= 0 or tile_count - last_checkpoint < checkpoint_every or not queue:
+            return
+        last_checkpoint = tile_count
+        keep = {f"{x},{y}" for x, y in queue} | set(warps)
+        save_checkpoint({
+            "version": CHECKPOINT_VERSION,
+            "map_id": map_id,
+            "map_name": map_name,
+            "tiles": tiles,
+            "warps": warps,
+            "states": {k: tile_states[k] for k in keep if k in tile_states},
+            "base": tile_states.base,
+            "visited": sorted(visited),
+            "queue": list(queue),
+            "start_key": start_key,
+            "tile_count": tile_count,
+            "frames": frames,
+            "telemetry": telemetry,
+            "seconds": resumed_seconds + time.time() - start_time,
+        })
+    
+    if pool is None:
+        while queue:
+            cx, cy = queue.popleft()
+            state = tile_states[f"{cx},{cy}"]
+            inferred, checks = plan(cx, cy)
+            record(cx, cy, probe_tile(game, state, cx, cy, visited, inferred), checks)
+            maybe_checkpoint()
+    else:
+        while queue:
+            frontier = list(queue)
+            queue.clear()
+            first = sum(frontier[0]) % 2
+            for parity in (first, 1 - first):
+                wave = [(cx, cy) for cx, cy in frontier if (cx + cy) % 2 == parity]
+                futures = []
+                for cx, cy in wave:
+                    skip = {(cx + dx, cy + dy) for dx, dy in DIRECTIONS.values()} & visited
+                    inferred, checks = plan(cx, cy)
+                    futures.append((checks, pool.submit(_probe_tile_task, tile_states[f"{cx},{cy}"],
+                                                        cx, cy, skip, inferred)))
+                for (cx, cy), (checks, future) in zip(wave, futures):
+                    record(cx, cy, future.result(), checks)
+            # Only between levels: mid-level, queued tiles aren't all recorded yet
+            maybe_checkpoint()
+    
+    elapsed = resumed_seconds + time.time() - start_time
+    if checkpoint_every > 0:
+        clear_checkpoint(map_id)
     
     # Calculate bounds
     all_x = [int(k.split(",")[0]) for k in tiles]
@@ -212,10 +555,50 @@ def scan_map(game: PokemonGame, verbose: bool = True) -> Dict[str, Any]:
         "tiles": tiles,
         "warps": warps,
         "scan_seconds": round(elapsed, 1),
+        "scan_frames": frames,
     }
     
+    store = tile_states.stats()
+    scan_report = {
+        "map_name": map_name,
+        "map_id": map_id,
+        "mode": "parallel" if pool else "serial",
+        "incremental": bool(existing),
+        "resumed": bool(checkpoint),
+        "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tiles": len(tiles),
+        "warps": len(warps),
+        "seconds": round(elapsed, 3),
+        "tiles_per_sec": round(tile_count / elapsed, 1) if elapsed else 0.0,
+        "frames": frames,
+        "frames_per_tile": round(frames / tile_count, 1) if tile_count else 0.0,
+        "probes": telemetry["probes"],
+        "inferred_edges": inferred_count,
+        "inference_checks": verified_count,
+        "inference_mismatches": len(mismatches),
+        "time": {k: round(telemetry[k], 3) for k in ("probe_s", "load_s", "save_s", "expansion_s")},
+        "states": store,
+        "results": result_histogram(tiles),
+    }
+    if reports is not None:
+        reports.append(scan_report)
+    elif report:
+        save_scan_report(scan_report, verbose=verbose)
+    
     if verbose:
         print(f"Scan complete: {len(tiles)} tiles, {len(warps)} warps in {elapsed:.1f}s")
+        print(f"  {1000 * elapsed / len(tiles):.1f}ms/tile, {frames} frames emulated ({frames / len(tiles):.0f}/tile)")
+        t = scan_report["time"]
+        print(f"  probing {t['probe_s']:.1f}s (state load {t['load_s']:.1f}s, save {t['save_s']:.1f}s), "
+              f"expansion {t['expansion_s']:.1f}s")
+        if infer:
+            print(f"  {inferred_count} edges inferred from neighbors; {verified_count} checked by "
+                  f"emulation, {len(mismatches)} mismatch(es)")
+            for tile_key, direction, expected, got in mismatches:
+                print(f"    {tile_key} {direction}: inferred {expected}, emulated {got}")
+        print(f"  {store['states']} states: {store['raw_bytes'] / 1e6:.1f}MB raw, "
+              f"{store['stored_bytes'] / 1e6:.2f}MB stored (x{store['ratio']}), "
+              f"{store['spilled_bytes'] / 1e6:.2f}MB spilled to disk")
         for warp_key, warp_dirs in warps.items():
             for d, info in warp_dirs.items():
                 print(f"  Warp: {warp_key} {d} → {info['map_name']} ({info['dest_x']},{info['dest_y']})")
@@ -223,17 +606,332 @@ def scan_map(game: PokemonGame, verbose: bool = True) -> Dict[str, Any]:
     return map_data, tile_states
 
 
+def _seed_incremental(game, existing, start_key, initial_state, tiles, warps,
+                      tile_states, queue, visited, record, verbose):
+    """Queue the tiles an existing map is missing, with states to probe them from.
+    
+    Existing tiles with all four directions are kept as scanned; ones
+    without are probed again. Each of those, and each missing tile, is
+    reached by walking (lazily, via TileStates) to it or to a known
+    neighbor and stepping in.
+    """
+    tiles.update({k: dict(v) for k, v in existing["tiles"].items()})
+    warps.update({k: dict(v) for k, v in existing.get("warps", {}).items()})
+    visited.update(tuple(int(c) for c in k.split(",")) for k in tiles)
+    incomplete = incomplete_tiles({"tiles": tiles})
+    
+    queue.popleft()  # The start tile, queued by scan_map
+    if start_key not in tiles or start_key in incomplete:
+        # Standing somewhere new: probe here first so the old tiles are reachable
+        sx, sy = (int(c) for c in start_key.split(","))
+        incomplete.discard(start_key)
+        record(sx, sy, probe_tile(game, initial_state, sx, sy, visited), {})
+    
+    lazy = TileStates(game, {"tiles": tiles}, start_key, initial_state)
+    for key in sorted(incomplete):
+        state = lazy.get(key)
+        if state is not None:
+            tile_states[key] = state
+            queue.append(tuple(int(c) for c in key.split(",")))
+
+    missing = missing_tiles({"tiles": tiles}) - visited
+    for key, tile_data in list(tiles.items()):
+        x, y = (int(c) for c in key.split(","))
+        for direction, result in tile_data.items():
+            dx, dy = DIRECTIONS[direction]
+            neighbor = (x + dx, y + dy)
+            if result != "walk" or neighbor not in missing or neighbor in visited:
+                continue
+            state = lazy.get(key)
+            if state is None:
+                continue
+            result, _, neighbor_state = probe_direction(game, state, direction, capture=True)
+            if neighbor_state is not None:
+                visited.add(neighbor)
+                tile_states[f"{neighbor[0]},{neighbor[1]}"] = neighbor_state
+                queue.append(neighbor)
+    
+    if verbose:
+        print(f"  Incremental: {len(existing['tiles']) - len(incomplete)} tiles kept, "
+              f"{len(queue)} missing or incomplete tile(s) to probe")
+
+
+# ============================================================
+# Extraction mode
+# extract_map reads the collision map out of RAM/ROM without emulating any
+# moves. Tile states (for chain scanning and verification) are then only
+# emulated on demand, by walking from the start along the BFS tree.
+# ============================================================
+
+class TileStates:
+    """
+    Tile key -> saved state for an extracted map, materialised lazily.
+
+    Supports the parts of the dict interface scan_from_save uses (in, get).
+    """
+
+    def __init__(self, game: PokemonGame, map_data: Dict[str, Any], start_key: str, start_state: bytes):
+        self.game = game
+        self._states: Dict[str, Optional[bytes]] = {start_key: start_state}
+        # BFS tree over walk edges: tile key -> (parent key, direction from parent)
+        self._parents: Dict[str, Tuple[str, str]] = {}
+        tiles = map_data["tiles"]
+        queue = deque([start_key])
+        seen = {start_key}
+        while queue:
+            key = queue.popleft()
+            x, y = (int(c) for c in key.split(","))
+            for direction, result in tiles[key].items():
+                dx, dy = DIRECTIONS[direction]
+                nkey = f"{x + dx},{y + dy}"
+                if result == "walk" and nkey in tiles and nkey not in seen:
+                    seen.add(nkey)
+                    self._parents[nkey] = (key, direction)
+                    queue.append(nkey)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._states or key in self._parents
+
+    def get(self, key: str, default: Optional[bytes] = None) -> Optional[bytes]:
+        """State standing on the tile, or default if it can't be reached."""
+        if key not in self:
+            return default
+        # Climb to the nearest tile with a state, then walk back down
+        chain: List[str] = []
+        while key not in self._states:
+            chain.append(key)
+            key = self._parents[key][0]
+        state = self._states[key]
+        for key in reversed(chain):
+            if state is not None:
+                _, direction = self._parents[key]
+                _, _, state = probe_direction(self.game, state, direction, capture=True)
+            self._states[key] = state  # None: an NPC or a wrong edge stopped the walk
+        return default if state is None else state
+
+
+def verify_map(game: PokemonGame, map_data: Dict[str, Any], tile_states: TileStates,
+               fraction: float, seed: int = 0, verbose: bool = True) -> List[Dict[str, Any]]:
+    """
+    Probe a random sample of an extracted map's tiles and compare every
+    direction with the extracted result.
+
+    Args:
+        fraction: Share of tiles to probe (0-1)
+        seed: Sample seed
+
+    Returns:
+        Mismatches as {"tile", "direction", "extracted", "probed"} dicts.
+        NPCs standing in the way show up here as extracted "walk" vs probed
+        "blocked".
+    """
+    keys = sorted(map_data["tiles"])
+    sample = random.Random(seed).sample(keys, max(1, round(len(keys) * fraction)))
+    mismatches = []
+    probed = 0
+    for key in sample:
+        state = tile_states.get(key)
+        if state is None:
+            continue
+        probed += 1
+        for direction, expected in map_data["tiles"][key].items():
+            result, warp_info = test_direction(game, state, direction)
+            extracted = map_data["warps"].get(key, {}).get(direction)
+            if result != expected or (result == "warp" and warp_info != extracted):
+                mismatches.append({
+                    "tile": key,
+                    "direction": direction,
+                    "extracted": extracted if expected == "warp" else expected,
+                    "probed": warp_info if result == "warp" else result,
+                })
+
+    map_data["verified"] = {"tiles": probed, "mismatches": len(mismatches)}
+    if verbose:
+        print(f"  Verified {probed}/{len(keys)} tiles by probing: {len(mismatches)} mismatch(es)")
+        for m in mismatches:
+            print(f"    {m['tile']} {m['direction']}: extracted {m['extracted']}, probed {m['probed']}")
+    return mismatches
+
+
+def extract_current_map(game: PokemonGame, verify: float = 0.0, verbose: bool = True,
+                        reports: Optional[List[Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], TileStates]:
+    """
+    extract_map plus lazy tile states, optionally spot-checked by probing.
+    
+    Returns (map_data, tile_states) like scan_map, and writes (or appends to
+    reports) a telemetry report the same way.
+    """
+    pos = game.get_player_position()
+    start_state = save_pyboy_state(game)
+    map_data = extract_map(game, verbose=verbose)
+    tile_states = TileStates(game, map_data, f"{pos['x']},{pos['y']}", start_state)
+    mismatches = []
+    t0 = time.perf_counter()
+    if verify > 0:
+        mismatches = verify_map(game, map_data, tile_states, verify, verbose=verbose)
+        load_pyboy_state(game, start_state)
+    seconds = map_data["scan_seconds"]
+    extract_report = {
+        "map_name": map_data["map_name"],
+        "map_id": map_data["map_id"],
+        "mode": "extract",
+        "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tiles": len(map_data["tiles"]),
+        "warps": len(map_data["warps"]),
+        "seconds": seconds,
+        "tiles_per_sec": round(len(map_data["tiles"]) / seconds, 1) if seconds else 0.0,
+        "verified_tiles": map_data.get("verified", {}).get("tiles", 0),
+        "verify_mismatches": len(mismatches),
+        "verify_seconds": round(time.perf_counter() - t0, 3),
+        "results": result_histogram(map_data["tiles"]),
+    }
+    if reports is not None:
+        reports.append(extract_report)
+    else:
+        save_scan_report(extract_report, verbose=verbose)
+    return map_data, tile_states
+
+
 def save_map(map_data: Dict[str, Any], verbose: bool = True) -> Path:
     """Save map data to JSON file."""
     path = get_map_path(map_data["map_name"])
-    with open(path, "w") as f:
+    # Write-then-rename so a running server's map cache never sees a partial file
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
         json.dump(map_data, f, indent=2)
+    os.replace(tmp_path, path)
+    # Let this process's map cache (load_map) see the new file right away
+    MAP_CACHE.invalidate()
     if verbose:
         print(f"Saved: {path}")
     return path
 
 
-def scan_from_save(save_name: str, chain: bool = False, verbose: bool = True) -> Dict[str, Any]:
+def _scan_here(game: PokemonGame, options: Dict[str, Any], verbose: bool = True,
+               pool: Optional[ProcessPoolExecutor] = None,
+               reports: Optional[List[Dict[str, Any]]] = None):
+    """Scan (or extract) the map the player is on, per scan_from_save's options."""
+    if options.get("extract"):
+        return extract_current_map(game, verify=options.get("verify", 0.0), verbose=verbose,
+                                   reports=reports)
+    existing = None
+    if options.get("incremental"):
+        map_id = game.get_player_position()["map_id"]
+        existing = load_map(MAP_NAMES.get(map_id, f"Unknown_0x{map_id:02X}"))
+    return scan_map(game, verbose=verbose, pool=pool, existing=existing,
+                    checkpoint_every=options.get("checkpoint_every", CHECKPOINT_EVERY),
+                    infer=options.get("infer", True),
+                    verify_rate=options.get("infer_verify", INFER_VERIFY_RATE),
+                    reports=reports)
+
+
+def _warp_entry_states(game: PokemonGame, map_data: Dict[str, Any], tile_states,
+                       skip_maps: Set[int], save_name: str,
+                       log: Callable[[str], None] = print) -> List[Dict[str, Any]]:
+    """One entry state per warp destination not in skip_maps (for chain scanning).
+    Progress messages go to log."""
+    entries: List[Dict[str, Any]] = []
+    reached = set(skip_maps)
+    for warp_key, warp_dirs in map_data["warps"].items():
+        for direction, warp_info in warp_dirs.items():
+            dest_map_id = warp_info["map_id"]
+            if dest_map_id not in reached:
+                n = len(entries)
+                _create_warp_state(game, map_data, warp_key, direction,
+                                   {"save_name": save_name}, dest_map_id, entries, tile_states, log)
+                if len(entries) > n:
+                    reached.add(dest_map_id)
+    return entries
+
+
+# ============================================================
+# Parallel chain scanning
+# Each worker scans whole maps: a task is (map_id, entry state), and it
+# returns the map plus entry states for the warp destinations it found,
+# its telemetry report and its progress messages. Workers write nothing
+# (no checkpoints either; a map is one task): the main process
+# deduplicates by map_id, queues new destinations, and saves each map and
+# report as soon as its task finishes.
+# ============================================================
+
+def _scan_map_task(map_id: int, state_bytes: bytes, skip_maps: Set[int],
+                   options: Dict[str, Any], save_name: str):
+    game = _worker_game
+    load_pyboy_state(game, state_bytes)
+    game.tick(10)
+    if game.get_player_position()["map_id"] != map_id:
+        return None, [], [], []
+    reports: List[Dict[str, Any]] = []
+    messages: List[str] = []
+    map_data, tile_states = _scan_here(game, dict(options, checkpoint_every=0), verbose=False,
+                                       reports=reports)
+    entries = _warp_entry_states(game, map_data, tile_states, skip_maps | {map_id}, save_name,
+                                 log=messages.append)
+    return map_data, [(e["map_id"], e["state_bytes"]) for e in entries], reports, messages
+
+
+def chain_scan_parallel(game: PokemonGame, pool: ProcessPoolExecutor, save_name: str,
+                        options: Dict[str, Any], verbose: bool = True) -> Dict[str, Any]:
+    """
+    Chain-scan from the player's current map, one map per worker at a time.
+    
+    Args:
+        game: Emulator positioned on the first map (only its state is used)
+        pool: Worker pool from make_scan_pool()
+        save_name: Recorded as the origin of queued entries
+        options: scan_from_save's scan options (extract, incremental, ...)
+    
+    Returns:
+        Dict of map_name -> map_data for all scanned maps
+    """
+    scanned_maps: Dict[str, Any] = {}
+    scheduled: Set[int] = set()
+    pending = {}
+    
+    def submit(map_id: int, state_bytes: bytes):
+        scheduled.add(map_id)
+        future = pool.submit(_scan_map_task, map_id, state_bytes, set(scheduled), options, save_name)
+        pending[future] = map_id
+    
+    submit(game.get_player_position()["map_id"], save_pyboy_state(game))
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            map_id = pending.pop(future)
+            name = MAP_NAMES.get(map_id, f"0x{map_id:02X}")
+            try:
+                map_data, entries, reports, messages = future.result()
+            except Exception as e:
+                print(f"  Chain-scan: scanning {name} failed: {e}")
+                continue
+            if map_data is None:
+                print(f"  Skipping map_id {map_id} — entry state landed elsewhere")
+                continue
+            scanned_maps[map_data["map_name"]] = map_data
+            save_map(map_data, verbose=verbose)
+            for scan_report in reports:
+                save_scan_report(scan_report, verbose=verbose)
+            # A checkpoint left by an earlier serial scan is obsolete now
+            clear_checkpoint(map_id)
+            if verbose:
+                for message in messages:
+                    print(message)
+            if verbose:
+                print(f"  {map_data['map_name']}: {len(map_data['tiles'])} tiles, "
+                      f"{len(map_data['warps'])} warps ({len(pending)} map(s) still running)")
+            for dest_map_id, state_bytes in entries:
+                if dest_map_id not in scheduled:
+                    if verbose:
+                        print(f"  Chain-scan: queued {MAP_NAMES.get(dest_map_id, f'0x{dest_map_id:02X}')} from {name}")
+                    submit(dest_map_id, state_bytes)
+    return scanned_maps
+
+
+def scan_from_save(save_name: str, chain: bool = False, verbose: bool = True,
+                   workers: int = 1, extract: bool = False,
+                   verify: float = 0.0, incremental: bool = False,
+                   checkpoint_every: int = CHECKPOINT_EVERY, infer: bool = True,
+                   infer_verify: float = INFER_VERIFY_RATE) -> Dict[str, Any]:
     """
     Load a save state, scan the current map, optionally chain-scan warp destinations.
     
@@ -241,19 +939,38 @@ def scan_from_save(save_name: str, chain: bool = False, verbose: bool = True) ->
         save_name: Name of the save state (without .state extension)
         chain: If True, follow warps and scan connected maps too
         verbose: Print progress
+        workers: Emulator processes (1 = scan serially). With chain, each
+                 worker scans whole maps from a shared queue; otherwise the
+                 workers probe one map's tiles in parallel
+        extract: Read collision maps from RAM/ROM instead of probing every tile
+        verify: With extract, share of tiles to spot-check by probing
+        incremental: Keep already-saved maps and probe only their missing tiles
+        checkpoint_every: Tiles between checkpoint writes (0 = off); an
+                          interrupted map scan resumes from its checkpoint
+        infer: Mirror walk edges from scanned neighbors instead of emulating them
+        infer_verify: Share of inferable edges emulated anyway as a check
     
     Returns:
         Dict of map_name -> map_data for all scanned maps
     """
-    game = PokemonGame(str(ROM_PATH), headless=True, speed=0, save_dir=str(SAVES_DIR))
+    game = PokemonGame(str(ROM_PATH), headless=True, speed=0, save_dir=str(SAVES_DIR),
+                       render=False)
     if not game.start():
         raise RuntimeError("Failed to start emulator")
+    options = {
+        "extract": extract, "verify": verify, "incremental": incremental,
+        "checkpoint_every": checkpoint_every, "infer": infer, "infer_verify": infer_verify,
+    }
+    pool = make_scan_pool(workers) if workers > 1 and (chain or not extract) else None
     
     try:
         if not game.load_state(save_name):
             raise RuntimeError(f"Failed to load save state: {save_name}")
         game.tick(30)
         
+        if chain and pool is not None:
+            return chain_scan_parallel(game, pool, save_name, options, verbose=verbose)
+        
         scanned_maps: Dict[str, Any] = {}
         maps_to_scan: deque = deque()
         scanned_map_ids: Set[int] = set()
@@ -294,43 +1011,42 @@ def scan_from_save(save_name: str, chain: bool = False, verbose: bool = True) ->
                     continue
             
             # Scan this map
-            map_data, tile_states = scan_map(game, verbose=verbose)
+            map_data, tile_states = _scan_here(game, options, verbose=verbose, pool=pool)
             scanned_map_ids.add(scan_info["map_id"])
             scanned_maps[map_data["map_name"]] = map_data
             save_map(map_data, verbose=verbose)
             
             # If chaining, queue up warp destinations
             if chain:
-                for warp_key, warp_dirs in map_data["warps"].items():
-                    for direction, warp_info in warp_dirs.items():
-                        dest_map_id = warp_info["map_id"]
-                        if dest_map_id not in scanned_map_ids:
-                            _create_warp_state(game, map_data, warp_key, direction, 
-                                             scan_info, dest_map_id, maps_to_scan, tile_states)
+                maps_to_scan.extend(_warp_entry_states(game, map_data, tile_states,
+                                                       scanned_map_ids, scan_info["save_name"]))
         
         return scanned_maps
     finally:
+        if pool is not None:
+            pool.shutdown()
         game.stop()
 
 
-def _create_warp_state(game, map_data, warp_key, direction, scan_info, dest_map_id, maps_to_scan, tile_states):
+def _create_warp_state(game, map_data, warp_key, direction, scan_info, dest_map_id, maps_to_scan, tile_states,
+                       log=print):
     """Helper to create a save state on the other side of a warp for chain scanning.
     
     Uses the tile_states dict (warp_key -> saved state bytes) to load the state 
-    at the warp tile, then walks through the warp.
+    at the warp tile, then walks through the warp. Progress messages go to log.
     """
-    if warp_key not in tile_states:
-        print(f"  Chain-scan: no saved state for warp tile {warp_key}")
+    state = tile_states.get(warp_key)
+    if state is None:
+        log(f"  Chain-scan: no saved state for warp tile {warp_key}")
         return
     
     try:
         # Load state at the warp tile
-        load_pyboy_state(game, tile_states[warp_key])
+        load_pyboy_state(game, state)
         game.tick(5)
         
-        # Walk through the warp
-        game.press_button(direction, hold_frames=8, wait_frames=20)
-        game.tick(40)
+        # Walk through the warp (step() waits out the fade-in)
+        game.step(direction)
         
         # Mash B to dismiss any transition text
         for _ in range(5):
@@ -345,11 +1061,11 @@ def _create_warp_state(game, map_data, warp_key, direction, scan_info, dest_map_
                 "map_id": dest_map_id,
                 "state_bytes": state_bytes,
             })
-            print(f"  Chain-scan: queued {MAP_NAMES.get(dest_map_id, f'0x{dest_map_id:02X}')} via warp {warp_key} {direction}")
+            log(f"  Chain-scan: queued {MAP_NAMES.get(dest_map_id, f'0x{dest_map_id:02X}')} via warp {warp_key} {direction}")
         else:
-            print(f"  Chain-scan: warp {warp_key} {direction} landed on map {check['map_id']}, expected {dest_map_id}")
+            log(f"  Chain-scan: warp {warp_key} {direction} landed on map {check['map_id']}, expected {dest_map_id}")
     except Exception as e:
-        print(f"  Chain-scan: error at warp {warp_key} {direction}: {e}")
+        log(f"  Chain-scan: error at warp {warp_key} {direction}: {e}")
 
 
 def scan_current_map(game: PokemonGame) -> Dict[str, Any]:
@@ -357,18 +1073,22 @@ def scan_current_map(game: PokemonGame) -> Dict[str, Any]:
     Scan the map the player is currently on. 
     Saves and returns the map data.
     Used by llm_player for on-the-fly scanning.
+    
+    A saved map is returned as is when complete (the map cache's shared,
+    read-only dict); one with walk edges into unscanned tiles, or tiles
+    missing a direction, is completed incrementally, and an interrupted
+    scan resumes from its checkpoint.
     """
     pos = game.get_player_position()
-    map_name = pos["map_name"]
-    map_path = get_map_path(map_name)
+    existing = load_map(pos["map_name"])
     
     # Check if already scanned
-    if map_path.exists():
-        with open(map_path) as f:
-            return json.load(f)
+    if (existing is not None and not missing_tiles(existing) and not incomplete_tiles(existing)
+            and not get_checkpoint_path(pos["map_id"]).exists()):
+        return existing
     
     # Scan it
-    map_data, _tile_states = scan_map(game, verbose=False)
+    map_data, _tile_states = scan_map(game, verbose=False, existing=existing)
     save_map(map_data, verbose=False)
     return map_data
 
@@ -378,14 +1098,38 @@ def main():
     parser.add_argument("--save", required=True, help="Save state name (without .state)")
     parser.add_argument("--chain", action="store_true", help="Chain-scan through warps")
     parser.add_argument("--quiet", action="store_true", help="Less output")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Emulator processes probing tiles in parallel (default: 1, serial)")
+    parser.add_argument("--extract", action="store_true",
+                        help="Read collision maps from RAM/ROM instead of probing every tile")
+    parser.add_argument("--verify", type=float, default=0.0, metavar="FRACTION",
+                        help="With --extract, spot-check this share of tiles by probing (e.g. 0.05)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep saved maps and probe only the tiles they're missing")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY, metavar="TILES",
+                        help=f"Tiles between scan checkpoints, 0 to disable (default: {CHECKPOINT_EVERY})")
+    parser.add_argument("--no-infer", action="store_true",
+                        help="Emulate every edge instead of mirroring walks from scanned neighbors")
+    parser.add_argument("--infer-verify", type=float, default=INFER_VERIFY_RATE, metavar="RATE",
+                        help=f"Share of inferred edges still emulated as a check (default: {INFER_VERIFY_RATE})")
     args = parser.parse_args()
     
-    results = scan_from_save(args.save, chain=args.chain, verbose=not args.quiet)
+    results = scan_from_save(args.save, chain=args.chain, verbose=not args.quiet,
+                             workers=args.workers, extract=args.extract, verify=args.verify,
+                             incremental=args.incremental, checkpoint_every=args.checkpoint_every,
+                             infer=not args.no_infer, infer_verify=args.infer_verify)
     
     print(f"\n{'='*50}")
     print(f"Scan complete! {len(results)} map(s) scanned:")
     for name, data in results.items():
         print(f"  {name}: {len(data['tiles'])} tiles, {len(data['warps'])} warps")
+    
+    # Refresh the binary map pack once, now that every JSON is written
+    if results:
+        try:
+            print(f"Map pack: {build_pack(MAPS_DIR)}")
+        except OSError as e:
+            print(f"Map pack not updated: {e}")
 
 
 if __name__ == "__main__":
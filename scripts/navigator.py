@@ -8,10 +8,10 @@ Handles route execution, battle interruptions, and collision recovery.
 Usage:
     from navigator import Navigator
     
-    nav = Navigator(game)
-    result = nav.navigate_to("Viridian Pokecenter")
-    result = nav.go_heal()
-    result = nav.go_to_map("Route 1")
+    with Navigator(game) as nav:
+        result = nav.navigate_to("Viridian Pokecenter")
+        result = nav.go_heal()
+        result = nav.go_to_map("Route 1")
 """
 
 import os
@@ -22,8 +22,11 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 
 sys.path.insert(0, os.path.dirname(__file__))
-from game import PokemonGame, MAP_NAMES
-from pathfinder import find_path, find_path_to_warp, find_route, load_map
+from game import PokemonGame, WatchEvent, MAP_NAMES
+from pathfinder import (
+    find_path, find_warp_path, find_route, route_problem, load_map, warm_flow_fields,
+    Replanner, replanner_for_path, MAP_CACHE,
+)
 
 PROJECT = Path(__file__).resolve().parent.parent
 MAPS_DIR = PROJECT / "game_state" / "maps"
@@ -67,6 +70,24 @@ DESTINATIONS = {
     "cerulean gym":         ("Cerulean City", 14, 8),   # Approximate
 }
 
+# Blocked-step detours: at most MAX_DETOURS per path, each at most
+# MAX_DETOUR_EXTRA steps longer than the path it replaces
+MAX_DETOURS = 4
+MAX_DETOUR_EXTRA = 12
+
+# Pokecenter visit from the door tile, as input macros (see PokemonGame.run_macro):
+# walk in and up to the counter, talk, confirm, wait out the healing ...
+NURSE_HEAL_MACRO = [
+    {"press": "up", "hold": 8, "wait": 20}, {"wait": 30},
+    {"repeat": 4, "do": [{"press": "up", "hold": 8, "wait": 20}]},
+    {"press": "a", "hold": 8, "wait": 20}, {"wait": 30},
+    {"press": "a", "hold": 8, "wait": 20}, {"wait": 120},
+]
+# ... then dismiss the goodbye text (several boxes, so every press is made)
+NURSE_DISMISS_MACRO = [
+    {"repeat": 5, "do": [{"press": "a", "hold": 8, "wait": 20}, {"wait": 20}]},
+]
+
 # Pokecenter locations by map name (for go_heal)
 POKECENTERS = {
     "Viridian City": ("Viridian City", 23, 26),
@@ -81,6 +102,21 @@ POKECENTERS = {
 }
 
 
+# (map cache generation, fields built) of the last warm_destinations() run
+_warmed: Tuple[int, int] = (-1, 0)
+
+
+def warm_destinations() -> int:
+    """Prebuild pathfinder flow fields for every named destination and Pokecenter,
+    once per map cache generation. Returns how many are available (destinations
+    on unscanned maps are skipped)."""
+    global _warmed
+    generation = MAP_CACHE.current_generation()
+    if _warmed[0] != generation:
+        _warmed = (generation, warm_flow_fields(set(DESTINATIONS.values()) | set(POKECENTERS.values())))
+    return _warmed[1]
+
+
 class NavigationResult:
     """Result of a navigation attempt."""
     
@@ -114,9 +150,32 @@ class Navigator:
     def __init__(self, game: PokemonGame, verbose: bool = True):
         self.game = game
         self.verbose = verbose
-        self._step_hold = 8
-        self._step_wait = 20
-        self._settle_frames = 10
+        # Frame the current battle started on (None outside battle), kept
+        # by a battle_type watch so battles starting mid-wait are noticed too,
+        # and re-read from RAM when a state load or rewind replaces the game
+        self._battle_frame: Optional[int] = None
+        self._sync_battle()
+        game.watch("battle_type", self._on_battle_type)
+        game.load_callbacks.append(self._sync_battle)
+        warm_destinations()
+    
+    def close(self):
+        """Stop watching the game (the navigator is unusable afterwards)."""
+        self.game.unwatch("battle_type", self._on_battle_type)
+        if self._sync_battle in self.game.load_callbacks:
+            self.game.load_callbacks.remove(self._sync_battle)
+    
+    def __enter__(self) -> "Navigator":
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _on_battle_type(self, event: WatchEvent):
+        self._battle_frame = event.frame if event.new != b"\x00" else None
+    
+    def _sync_battle(self):
+        self._battle_frame = self.game.frame_count if self.game.is_in_battle() else None
     
     def _log(self, msg: str):
         if self.verbose:
@@ -132,15 +191,15 @@ class Navigator:
         """
         before = self._get_pos()
         
-        # Dismiss any stray text first
-        self.game.press_button("b", hold_frames=4, wait_frames=8)
+        # Take the step — advances only until the game reports it finished
+        step = self.game.step(direction)
         
-        # Take the step
-        self.game.press_button(direction, hold_frames=self._step_hold, wait_frames=self._step_wait)
-        self.game.tick(self._settle_frames)
+        if step["result"] == "blocked":
+            # Stray text swallows input — dismiss it before any retry
+            self.game.press_button("b", hold_frames=4, wait_frames=8)
         
         # Check for battle
-        if self.game.is_in_battle():
+        if step["result"] == "battle" or self._battle_frame is not None:
             return False, True
         
         after = self._get_pos()
@@ -149,43 +208,68 @@ class Navigator:
         
         return moved, False
     
-    def execute_path(self, path: List[str], max_retries: int = 2) -> NavigationResult:
+    def execute_path(self, path: List[str], max_retries: int = 2,
+                     max_detours: int = MAX_DETOURS) -> NavigationResult:
         """
         Execute a sequence of movement steps.
-        Handles NPC blocking with retries and detects battles.
+        Handles NPC blocking with detours and retries, and detects battles.
+        
+        A blocked step marks the tile ahead as impassable and repairs the rest
+        of the path around it (D* Lite). If there's no reasonable detour, it
+        waits and retries the same direction as before.
         
         Args:
             path: List of direction strings
             max_retries: Times to retry a blocked step before giving up
+            max_detours: Times to route around a blocked tile before
+                         falling back to waiting only
         
         Returns:
             NavigationResult
         """
+        # Nobody watches the frames in between; the screen is current on return
+        with self.game.fast_forward():
+            return self._walk_path(path, max_retries, max_detours)
+    
+    def _walk_path(self, path: List[str], max_retries: int,
+                   max_detours: int) -> NavigationResult:
+        """execute_path's step loop."""
         steps_taken = 0
+        remaining = list(path)
+        replanner: Optional[Replanner] = None
+        detours = 0
         
-        for i, direction in enumerate(path):
+        i = 0
+        while i < len(remaining):
+            direction = remaining[i]
             retries = 0
             while True:
                 moved, battle = self._execute_step(direction)
                 
                 if battle:
-                    return NavigationResult(
-                        success=False,
-                        message=f"Battle interrupted at step {i+1}/{len(path)}",
-                        battle_interrupted=True,
-                        steps_taken=steps_taken,
-                        final_position=self._get_pos(),
-                    )
+                    return self._battle_result(i, len(remaining), steps_taken)
                 
                 if moved:
                     steps_taken += 1
                     break
                 
+                if detours < max_detours:
+                    pos = self._get_pos()
+                    if replanner is None:
+                        replanner = replanner_for_path(pos["map_name"], pos["x"], pos["y"], remaining[i:])
+                    detour = self._detour(replanner, pos, remaining[i:]) if replanner else None
+                    if detour is not None:
+                        detours += 1
+                        self._log(f"Blocked going {direction}, detour of {len(detour)} steps")
+                        remaining = remaining[:i] + detour
+                        direction = remaining[i]
+                        continue
+                
                 retries += 1
                 if retries > max_retries:
                     return NavigationResult(
                         success=False,
-                        message=f"Blocked at step {i+1}/{len(path)} going {direction} (NPC or obstacle?)",
+                        message=f"Blocked at step {i+1}/{len(remaining)} going {direction} (NPC or obstacle?)",
                         steps_taken=steps_taken,
                         final_position=self._get_pos(),
                     )
@@ -193,6 +277,9 @@ class Navigator:
                 # Wait a bit and try again (NPC may move)
                 self._log(f"Blocked going {direction}, retry {retries}...")
                 self.game.tick(30)
+                if self._battle_frame is not None:
+                    return self._battle_result(i, len(remaining), steps_taken)
+            i += 1
         
         return NavigationResult(
             success=True,
@@ -201,6 +288,38 @@ class Navigator:
             final_position=self._get_pos(),
         )
     
+    def _battle_result(self, step: int, total: int, steps_taken: int) -> NavigationResult:
+        return NavigationResult(
+            success=False,
+            message=f"Battle interrupted at step {step+1}/{total} (frame {self._battle_frame})",
+            battle_interrupted=True,
+            steps_taken=steps_taken,
+            final_position=self._get_pos(),
+        )
+    
+    def _detour(self, replanner: Replanner, pos: Dict, remaining: List[str]) -> Optional[List[str]]:
+        """
+        Block the tile ahead of a failed step and repair the path around it.
+        
+        Blocks stay in place for the rest of this path. Returns the new
+        remaining steps, or None if there's no detour within MAX_DETOUR_EXTRA
+        extra steps (waiting for the NPC to move is then the better bet).
+        """
+        here = replanner.cm.index(pos["x"], pos["y"])
+        if here is None:
+            return None
+        replanner.move_to(here)
+        ahead = replanner.step_target(here, remaining[0])
+        if ahead is None or ahead == replanner.goal:
+            # Warp step or the destination itself — nothing to go around
+            return None
+        replanner.block(ahead)
+        detour = replanner.path()
+        if detour is None or len(detour) > len(remaining) + MAX_DETOUR_EXTRA:
+            replanner.unblock(ahead)
+            return None
+        return detour
+    
     def navigate_to(self, destination: str) -> NavigationResult:
         """
         Navigate to a named destination.
@@ -262,9 +381,11 @@ class Navigator:
             # Cross-map routing
             route = find_route(current_map, pos["x"], pos["y"], target_map, target_x, target_y)
             if route is None:
+                problem = route_problem(current_map, pos["x"], pos["y"], target_map, target_x, target_y)
                 return NavigationResult(
                     success=False,
-                    message=f"No route found from {current_map} to {target_map}. Maps may not be scanned yet.",
+                    message=f"No route found from {current_map} to {target_map}: "
+                            f"{problem or 'no connecting warps'}. Maps may not be scanned yet.",
                     final_position=pos,
                 )
             
@@ -281,9 +402,7 @@ class Navigator:
                     result.steps_taken = total_taken
                     return result
                 
-                # After a warp, wait for map transition
-                self.game.tick(30)
-                # Dismiss any text
+                # The warp step already waited out the transition; dismiss any text
                 for _ in range(3):
                     self.game.press_button("b", hold_frames=4, wait_frames=8)
             
@@ -309,13 +428,13 @@ class Navigator:
         # Try direct warp first
         map_data = load_map(current_map)
         if map_data:
-            path = find_path_to_warp(current_map, pos["x"], pos["y"], target_map_name, map_data=map_data)
-            if path:
-                self._log(f"Direct warp to {target_map_name}: {len(path)} steps")
+            warp = find_warp_path(current_map, pos["x"], pos["y"], target_map_name, map_data=map_data)
+            if warp:
+                path, (wx, wy), direction, _info = warp
+                self._log(f"Direct warp to {target_map_name} via ({wx},{wy}) {direction}: {len(path)} steps")
                 result = self.execute_path(path)
                 if result.success:
-                    # Wait for warp transition
-                    self.game.tick(30)
+                    # Dismiss any text after the warp
                     for _ in range(3):
                         self.game.press_button("b", hold_frames=4, wait_frames=8)
                 return result
@@ -352,9 +471,11 @@ class Navigator:
         
         route = find_route(pos["map_name"], pos["x"], pos["y"], map_name, x, y)
         if route is None:
+            problem = route_problem(pos["map_name"], pos["x"], pos["y"], map_name, x, y)
             return NavigationResult(
                 success=False,
-                message=f"No route from {pos['map_name']} to {map_name}({x},{y})",
+                message=f"No route from {pos['map_name']} to {map_name}({x},{y})"
+                        + (f": {problem}" if problem else ""),
                 final_position=pos,
             )
         
@@ -365,7 +486,6 @@ class Navigator:
             if not result.success:
                 result.steps_taken = total_taken
                 return result
-            self.game.tick(30)
             for _ in range(3):
                 self.game.press_button("b", hold_frames=4, wait_frames=8)
         
@@ -423,26 +543,9 @@ class Navigator:
         """After arriving at Pokecenter door, enter and talk to nurse."""
         self._log("Entering Pokecenter and healing...")
         
-        # Walk into the Pokecenter (up through door)
-        self.game.press_button("up", hold_frames=8, wait_frames=20)
-        self.game.tick(30)
-        
-        # Walk up to the nurse (she's at the counter, usually top-center)
-        for _ in range(4):
-            self.game.press_button("up", hold_frames=8, wait_frames=20)
-        
-        # Talk to nurse
-        self.game.press_button("a", hold_frames=8, wait_frames=20)
-        self.game.tick(30)
-        
-        # Confirm healing
-        self.game.press_button("a", hold_frames=8, wait_frames=20)
-        self.game.tick(120)  # Healing animation
-        
-        # Dismiss dialogue
-        for _ in range(5):
-            self.game.press_button("a", hold_frames=8, wait_frames=20)
-            self.game.tick(20)
+        heal = self.game.run_macro(NURSE_HEAL_MACRO)
+        dismiss = self.game.run_macro(NURSE_DISMISS_MACRO)
+        self._log(f"Nurse visit: {heal['frames'] + dismiss['frames']} frames")
         
         pos = self._get_pos()
         party = self.game.get_party()
@@ -6,7 +6,7 @@ Loads map JSON files and finds optimal paths between tiles.
 Supports single-map pathfinding, warp-to-map routing, and cross-map routing.
 
 Usage:
-    from pathfinder import find_path, find_path_to_warp, find_route
+    from pathfinder import find_path, find_path_to_warp, find_warp_path, find_route
     
     # Single map
     path = find_path("Pallet Town", 12, 12, 10, 0)
@@ -15,6 +15,7 @@ Usage:
     # Find warp to another map
     path = find_path_to_warp("Pallet Town", 9, 12, "Route 1")
     # → ['up', 'up', ...]
+    path, (wx, wy), direction, info = find_warp_path("Pallet Town", 9, 12, "Route 1")
     
     # Cross-map routing
     route = find_route("Pallet Town", 9, 12, "Viridian City", 15, 8)
@@ -25,9 +26,11 @@ import os
 import sys
 import json
 import heapq
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple, Set
-from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
 
 PROJECT = Path(__file__).resolve().parent.parent
 MAPS_DIR = PROJECT / "game_state" / "maps"
@@ -51,196 +54,1148 @@ def map_name_to_filename(map_name: str) -> str:
     return map_name.lower().replace("'", "").replace(" ", "_").replace(".", "")
 
 
+# ============================================================
+# Map cache
+#
+# Parsed map files are shared process-wide. The directory is re-checked at
+# most once per CHECK_INTERVAL seconds, and a file is only re-parsed when
+# its mtime or size changes, so the scanner can drop in new maps while the
+# server is running. Maps whose JSON is unchanged since maps.pack was built
+# are decoded from the pack (see map_pack.py) instead of json.load; the
+# cache only reads the pack, it's rebuilt by map_pack.py or the scanner CLI.
+# ============================================================
+
+class MapCache:
+    """Process-wide cache of parsed map files with a map_name -> file index."""
+
+    CHECK_INTERVAL = 1.0  # seconds between directory stat sweeps
+
+    def __init__(self, maps_dir: Path):
+        self.maps_dir = Path(maps_dir)
+        self.generation = 0  # bumped whenever any map is added, changed or removed
+        self._lock = threading.Lock()
+        self._entries: Dict[Path, Tuple[Optional[Tuple[int, int]], Dict[str, Any]]] = {}
+        self._names: Dict[str, Path] = {}
+        self._checked_at = float("-inf")
+
+    def _refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.CHECK_INTERVAL:
+            return
+        self._checked_at = now
+
+        seen: Dict[Path, Tuple[int, int]] = {}
+        if self.maps_dir.is_dir():
+            for entry in os.scandir(self.maps_dir):
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    seen[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+
+        changed = False
+        for path in list(self._entries):
+            if path not in seen:
+                del self._entries[path]
+                changed = True
+
+        pack = None
+        for path, sig in seen.items():
+            cached = self._entries.get(path)
+            if cached is not None and cached[0] == sig:
+                continue
+            if pack is None:
+                import map_pack
+                pack = map_pack.open_pack(self.maps_dir) or False
+            loaded = pack.load_if_current(path.name, sig) if pack else None
+            if loaded is not None:
+                data, compiled = loaded
+                with _compiled_lock:
+                    _compiled_maps[data["map_name"]] = (data, compiled)
+            else:
+                try:
+                    with open(path) as fh:
+                        data = json.load(fh)
+                    data["map_name"]
+                except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                    # Possibly mid-write — forget it and retry on the next sweep
+                    if self._entries.pop(path, None) is not None:
+                        changed = True
+                    continue
+            self._entries[path] = (sig, data)
+            changed = True
+        if pack:
+            pack.close()
+
+        if changed:
+            self._names = {data["map_name"]: path for path, (_, data) in self._entries.items()}
+            self.generation += 1
+
+    def get(self, map_name: str) -> Optional[Dict[str, Any]]:
+        """Map data by map name (or filename stem). Returns None if not found."""
+        with self._lock:
+            self._refresh()
+            path = self._names.get(map_name)
+            if path is None:
+                path = self.maps_dir / f"{map_name_to_filename(map_name)}.json"
+            entry = self._entries.get(path)
+            return entry[1] if entry else None
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """All cached maps as map_name -> map_data."""
+        with self._lock:
+            self._refresh()
+            return {data["map_name"]: data for _, data in self._entries.values()}
+
+    def files(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        """(path, map_data) for every cached map file, sorted by path."""
+        with self._lock:
+            self._refresh()
+            return sorted(((p, data) for p, (_, data) in self._entries.items()), key=lambda e: e[0])
+
+    def current_generation(self) -> int:
+        """Generation after picking up any changes on disk."""
+        with self._lock:
+            self._refresh()
+            return self.generation
+
+    def invalidate(self):
+        """Force the next access to re-check the maps directory."""
+        with self._lock:
+            self._checked_at = float("-inf")
+
+
+MAP_CACHE = MapCache(MAPS_DIR)
+
+
 def load_map(map_name: str) -> Optional[Dict[str, Any]]:
-    """Load a map JSON file by name. Returns None if not found."""
-    path = MAPS_DIR / f"{map_name_to_filename(map_name)}.json"
-    if not path.exists():
-        # Try exact filename match
-        for f in MAPS_DIR.glob("*.json"):
-            with open(f) as fh:
-                data = json.load(fh)
-                if data.get("map_name") == map_name:
-                    return data
-        return None
-    with open(path) as f:
-        return json.load(f)
+    """Load a map by name from the shared cache. Returns None if not found.
+
+    The returned dict is shared — treat it as read-only.
+    """
+    return MAP_CACHE.get(map_name)
 
 
 def load_all_maps() -> Dict[str, Dict[str, Any]]:
     """Load all available map files. Returns dict of map_name -> map_data."""
-    maps = {}
-    for f in MAPS_DIR.glob("*.json"):
+    return MAP_CACHE.all()
+
+
+# ============================================================
+# Compiled grid representation
+#
+# Each map is compiled once into a dense bytearray indexed by
+# (y - min_y) * width + (x - min_x). The grid carries a one-tile border
+# of NO_TILE cells so neighbor offsets never wrap around a row edge.
+# ============================================================
+
+# Per-tile flags: low nibble = walkable directions, high nibble = warp directions
+WALK_BITS = {"up": 0x01, "down": 0x02, "left": 0x04, "right": 0x08}
+WARP_BITS = {"up": 0x10, "down": 0x20, "left": 0x40, "right": 0x80}
+
+# Position of each direction in CompiledMap.moves
+DIRECTION_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+
+# All walk AND all warp bits set can't come from real tile data
+NO_TILE = 0xFF
+
+
+class CompiledMap:
+    """Dense, bit-packed grid of a map's tiles for fast searching."""
+
+    __slots__ = ("map_name", "min_x", "min_y", "width", "height", "grid", "moves", "_open_ratio")
+
+    def __init__(self, map_data: Dict[str, Any]):
+        tiles = map_data["tiles"]
+        coords = [tuple(int(c) for c in key.split(",")) for key in tiles]
+        if coords:
+            min_x = min(x for x, _ in coords)
+            max_x = max(x for x, _ in coords)
+            min_y = min(y for _, y in coords)
+            max_y = max(y for _, y in coords)
+        else:
+            min_x = max_x = min_y = max_y = 0
+
+        self.map_name = map_data.get("map_name", "")
+        self.min_x = min_x - 1
+        self.min_y = min_y - 1
+        self.width = max_x - min_x + 3
+        self.height = max_y - min_y + 3
+        self.grid = bytearray([NO_TILE]) * (self.width * self.height)
+
+        for (x, y), tile in zip(coords, tiles.values()):
+            flags = 0
+            for direction, movement in tile.items():
+                if movement == "walk":
+                    flags |= WALK_BITS[direction]
+                elif movement == "warp":
+                    flags |= WARP_BITS[direction]
+            self.grid[(y - self.min_y) * self.width + (x - self.min_x)] = flags
+
+        # (walk bit, index offset, direction) in DIRECTIONS order
+        self.moves = tuple(
+            (WALK_BITS[d], dy * self.width + dx, d) for d, (dx, dy) in DIRECTIONS.items()
+        )
+        self._open_ratio = None
+
+    @classmethod
+    def from_grid(cls, map_name: str, min_x: int, min_y: int,
+                  width: int, height: int, grid: bytearray) -> "CompiledMap":
+        """Rebuild a compiled map from already-packed grid bytes (see map_pack)."""
+        cm = cls.__new__(cls)
+        cm.map_name = map_name
+        cm.min_x = min_x
+        cm.min_y = min_y
+        cm.width = width
+        cm.height = height
+        cm.grid = grid
+        cm.moves = tuple(
+            (WALK_BITS[d], dy * width + dx, d) for d, (dx, dy) in DIRECTIONS.items()
+        )
+        cm._open_ratio = None
+        return cm
+
+    def open_ratio(self) -> float:
+        """Fraction of tiles that can be walked off in all four directions."""
+        if self._open_ratio is None:
+            tiles = [flags for flags in self.grid if flags != NO_TILE]
+            open_tiles = sum(1 for flags in tiles if flags & 0x0F == 0x0F)
+            self._open_ratio = open_tiles / len(tiles) if tiles else 0.0
+        return self._open_ratio
+
+    def index(self, x: int, y: int) -> Optional[int]:
+        """Grid index of tile (x, y), or None if it isn't a known tile."""
+        cx, cy = x - self.min_x, y - self.min_y
+        if not (0 <= cx < self.width and 0 <= cy < self.height):
+            return None
+        i = cy * self.width + cx
+        return i if self.grid[i] != NO_TILE else None
+
+    def coords(self, i: int) -> Tuple[int, int]:
+        """Map coordinates of grid index i."""
+        cy, cx = divmod(i, self.width)
+        return cx + self.min_x, cy + self.min_y
+
+
+# map_name -> (source map_data, compiled grid). Holding the source dict keeps
+# the identity check valid for as long as the entry lives.
+_compiled_lock = threading.Lock()
+_compiled_maps: Dict[str, Tuple[Dict[str, Any], CompiledMap]] = {}
+
+# Search counters (for benchmarking): number of searches and nodes expanded
+_search_stats = {"searches": 0, "expanded": 0}
+
+
+def _count_search(expanded: int):
+    _search_stats["searches"] += 1
+    _search_stats["expanded"] += expanded
+
+
+def search_stats() -> Dict[str, int]:
+    """Cumulative search counters since the last reset_search_stats()."""
+    return dict(_search_stats)
+
+
+def reset_search_stats():
+    for key in _search_stats:
+        _search_stats[key] = 0
+
+
+def compile_map(map_data: Dict[str, Any]) -> CompiledMap:
+    """Return the compiled grid for map_data, reusing it while the dict is unchanged."""
+    name = map_data.get("map_name", "")
+    with _compiled_lock:
+        cached = _compiled_maps.get(name)
+    if cached is not None and cached[0] is map_data:
+        return cached[1]
+    compiled = CompiledMap(map_data)
+    with _compiled_lock:
+        _compiled_maps[name] = (map_data, compiled)
+    return compiled
+
+
+# With JPS_AUTO set, find_path's auto mode uses Jump Point Search instead of
+# A* on maps at least JPS_OPEN_RATIO open (outdoor routes and cities). Off by
+# default: JPS paths are as short as A*'s but may take a different one of
+# several equal-length routes (bench_pathfinder.py reports how often).
+JPS_AUTO = False
+JPS_OPEN_RATIO = 0.4
+
+
+def _astar(cm: CompiledMap, start: int, goal: int) -> Optional[List[str]]:
+    """A* between two grid indices. Warp edges are never followed."""
+    grid = cm.grid
+    moves = cm.moves
+    width = cm.width
+    goal_y, goal_x = divmod(goal, width)
+
+    g_score = [-1] * len(grid)
+    came_from = bytearray(len(grid))  # index into moves, valid where g_score >= 0
+    closed = bytearray(len(grid))
+
+    # Priority queue: (f_score, counter, index)
+    counter = 0
+    sy, sx = divmod(start, width)
+    open_set = [(abs(sx - goal_x) + abs(sy - goal_y), counter, start)]
+    g_score[start] = 0
+    expanded = 0
+
+    while open_set:
+        _, _, cur = heapq.heappop(open_set)
+
+        if cur == goal:
+            _count_search(expanded)
+            # Reconstruct path
+            path = []
+            while cur != start:
+                move = moves[came_from[cur]]
+                path.append(move[2])
+                cur -= move[1]
+            path.reverse()
+            return path
+
+        if closed[cur]:
+            continue
+        closed[cur] = 1
+        expanded += 1
+
+        flags = grid[cur]
+        new_g = g_score[cur] + 1
+        for m, (bit, offset, _direction) in enumerate(moves):
+            if not flags & bit:
+                continue
+            nxt = cur + offset
+            if grid[nxt] == NO_TILE or closed[nxt]:
+                continue
+            old_g = g_score[nxt]
+            if old_g < 0 or new_g < old_g:
+                g_score[nxt] = new_g
+                ny, nx = divmod(nxt, width)
+                counter += 1
+                heapq.heappush(open_set, (new_g + abs(nx - goal_x) + abs(ny - goal_y), counter, nxt))
+                came_from[nxt] = m
+
+    _count_search(expanded)
+    return None  # No path found
+
+
+class _JumpTable:
+    """
+    Precomputed straight-line jumps for Jump Point Search on one map.
+
+    For each tile and direction: the first jump point met going that way
+    (ignoring the goal), or -1 if the run hits a wall first, and the last
+    tile of the run. Goal checks are then a range test, so every jump is
+    O(1) instead of a tile-by-tile scan.
+
+    Paths are canonical vertical-first: a horizontal run only turns
+    vertical where it's forced to (the tile behind it has no two-step way
+    into the same row), while a vertical run may branch sideways anywhere,
+    so it stops wherever a sideways jump would find something. The forced
+    test checks the actual two-step detour, so one-way edges stay correct.
+    """
+
+    __slots__ = ("cm", "stop", "end")
+
+    def __init__(self, cm: CompiledMap):
+        self.cm = cm
+        grid = cm.grid
+        moves = cm.moves
+        width = cm.width
+        size = len(grid)
+        up, down, left, right = moves
+        self.stop = [[-1] * size for _ in moves]
+        self.end = [list(range(size)) for _ in moves]
+
+        def step(i: int, m: Tuple[int, int, str]) -> bool:
+            return bool(grid[i] & m[0]) and grid[i + m[1]] != NO_TILE
+
+        def forced(prev: int, i: int, h: Tuple[int, int, str]) -> bool:
+            for v in (up, down):
+                side = prev + v[1]
+                if step(i, v) and not (step(prev, v) and step(side, h)):
+                    return True
+            return False
+
+        # Horizontal runs, filled from the far end of each row backwards
+        for m in (2, 3):
+            h = moves[m]
+            stop, end = self.stop[m], self.end[m]
+            xs = range(width - 1, -1, -1) if h[1] > 0 else range(width)
+            for row in range(0, size, width):
+                for x in xs:
+                    i = row + x
+                    if grid[i] != NO_TILE and step(i, h):
+                        nxt = i + h[1]
+                        end[i] = end[nxt]
+                        stop[i] = nxt if forced(i, nxt, h) else stop[nxt]
+
+        # Vertical runs stop where a sideways jump finds a jump point
+        sideways = [self.stop[2][i] >= 0 or self.stop[3][i] >= 0 for i in range(size)]
+        for m in (0, 1):
+            v = moves[m]
+            stop, end = self.stop[m], self.end[m]
+            ys = range(size - width, -1, -width) if v[1] > 0 else range(0, size, width)
+            for row in ys:
+                for i in range(row, row + width):
+                    if grid[i] != NO_TILE and step(i, v):
+                        nxt = i + v[1]
+                        end[i] = end[nxt]
+                        stop[i] = nxt if sideways[nxt] else stop[nxt]
+
+
+_jump_lock = threading.Lock()
+_jump_tables: Dict[str, _JumpTable] = {}
+
+
+def _jump_table_for(cm: CompiledMap) -> _JumpTable:
+    with _jump_lock:
+        table = _jump_tables.get(cm.map_name)
+    if table is None or table.cm is not cm:
+        table = _JumpTable(cm)
+        with _jump_lock:
+            _jump_tables[cm.map_name] = table
+    return table
+
+
+def _jps(cm: CompiledMap, start: int, goal: int) -> Optional[List[str]]:
+    """Jump Point Search (4-connected) between two grid indices. See _JumpTable."""
+    table = _jump_table_for(cm)
+    stops, ends = table.stop, table.end
+    moves = cm.moves
+    width = cm.width
+    goal_y, goal_x = divmod(goal, width)
+
+    def jump(i: int, d: int) -> int:
+        end = ends[d][i]
+        if end == i:
+            return -1
+        off = moves[d][1]
+        stop = stops[d][i]
+        y, x = divmod(i, width)
+        if d >= 2:
+            # Horizontal: the goal counts if it's on this row within the run
+            if goal_y == y and 0 < (goal - i) // off <= (end - i) // off:
+                if stop < 0 or (goal - i) // off < (stop - i) // off:
+                    return goal
+            return stop
+        # Vertical: stop at the goal's row if a sideways run from there reaches it
+        if 0 < (goal_y - y) * (1 if off > 0 else -1) <= (end - i) // off:
+            cross = i + (goal_y - y) * width
+            if stop < 0 or (cross - i) // off < (stop - i) // off:
+                if cross == goal:
+                    return goal
+                side = 3 if goal_x > x else 2
+                reach = ends[side][cross]
+                if 0 < (goal - cross) // moves[side][1] <= (reach - cross) // moves[side][1]:
+                    return cross
+        return stop
+
+    g_score = {start: 0}
+    came_from = {start: -1}
+    arrived = {start: -1}  # move index that reached each jump point
+    closed = set()
+    counter = 0
+    sy, sx = divmod(start, width)
+    open_set = [(abs(sx - goal_x) + abs(sy - goal_y), counter, start)]
+    expanded = 0
+
+    while open_set:
+        _, _, cur = heapq.heappop(open_set)
+
+        if cur == goal:
+            _count_search(expanded)
+            path = []
+            while cur != start:
+                prev = came_from[cur]
+                move = moves[arrived[cur]]
+                path.extend([move[2]] * ((cur - prev) // move[1]))
+                cur = prev
+            path.reverse()
+            return path
+
+        if cur in closed:
+            continue
+        closed.add(cur)
+        expanded += 1
+
+        m = arrived[cur]
+        if m < 0:
+            directions = (0, 1, 2, 3)
+        elif m < 2:
+            directions = (m, 2, 3)  # vertical: straight on or sideways
+        else:
+            # horizontal: straight on, or turn where the turn is forced
+            prev = cur - moves[m][1]
+            directions = (m,) + tuple(
+                v for v in (0, 1)
+                if ends[v][cur] != cur and not (
+                    ends[v][prev] != prev and ends[m][prev + moves[v][1]] != prev + moves[v][1]
+                )
+            )
+
+        cy, cx = divmod(cur, width)
+        for d in directions:
+            jp = jump(cur, d)
+            if jp < 0 or jp in closed:
+                continue
+            jy, jx = divmod(jp, width)
+            new_g = g_score[cur] + abs(jx - cx) + abs(jy - cy)
+            if new_g < g_score.get(jp, new_g + 1):
+                g_score[jp] = new_g
+                came_from[jp] = cur
+                arrived[jp] = d
+                counter += 1
+                heapq.heappush(open_set, (new_g + abs(jx - goal_x) + abs(jy - goal_y), counter, jp))
+
+    _count_search(expanded)
+    return None
+
+
+# ============================================================
+# Flow fields
+#
+# A reverse BFS from one goal tile gives every tile its distance to the
+# goal and the first step toward it. Once built, a path to that goal from
+# any start is a walk down the table, so repeated trips to the fixed
+# destinations (and resuming after a battle or NPC block) don't search.
+# ============================================================
+
+FLOW_FIELD_CACHE_SIZE = 128
+
+
+class FlowField:
+    """Distance to, and next step toward, one goal tile from every tile on a map."""
+
+    __slots__ = ("cm", "goal", "dist", "next_move")
+
+    def __init__(self, cm: CompiledMap, goal: int):
+        self.cm = cm
+        self.goal = goal
+        grid = cm.grid
+        moves = cm.moves
+        dist = [-1] * len(grid)
+        next_move = bytearray(len(grid))
+        dist[goal] = 0
+        frontier = [goal]
+        d = 0
+        expanded = 0
+        while frontier:
+            d += 1
+            expanded += len(frontier)
+            next_frontier = []
+            for cur in frontier:
+                for m, (bit, offset, _direction) in enumerate(moves):
+                    prev = cur - offset
+                    if dist[prev] < 0 and grid[prev] != NO_TILE and grid[prev] & bit:
+                        dist[prev] = d
+                        next_move[prev] = m
+                        next_frontier.append(prev)
+            frontier = next_frontier
+        self.dist = dist
+        self.next_move = next_move
+        _count_search(expanded)
+
+    def distance(self, x: int, y: int) -> Optional[int]:
+        """Steps from (x, y) to the goal, or None if unreachable."""
+        idx = self.cm.index(x, y)
+        if idx is None or self.dist[idx] < 0:
+            return None
+        return self.dist[idx]
+
+    def path_from_index(self, idx: int) -> Optional[List[str]]:
+        if self.dist[idx] < 0:
+            return None
+        moves = self.cm.moves
+        path = []
+        while idx != self.goal:
+            move = moves[self.next_move[idx]]
+            path.append(move[2])
+            idx += move[1]
+        return path
+
+    def path_from(self, x: int, y: int) -> Optional[List[str]]:
+        """Steps from (x, y) to the goal, or None if unreachable."""
+        idx = self.cm.index(x, y)
+        return self.path_from_index(idx) if idx is not None else None
+
+
+_flow_lock = threading.Lock()
+_flow_fields: Tuple[int, "OrderedDict[Tuple[str, int], FlowField]"] = (-1, OrderedDict())
+
+
+def _flow_field_for(cm: CompiledMap, goal: int, build: bool = True) -> Optional[FlowField]:
+    """LRU-cached flow field toward grid index goal. With build=False only returns a cached one."""
+    global _flow_fields
+    generation = MAP_CACHE.current_generation()
+    key = (cm.map_name, goal)
+    with _flow_lock:
+        if _flow_fields[0] != generation:
+            _flow_fields = (generation, OrderedDict())
+        fields = _flow_fields[1]
+        field = fields.get(key)
+        if field is not None and field.cm is cm:
+            fields.move_to_end(key)
+            return field
+    if not build:
+        return None
+    field = FlowField(cm, goal)
+    with _flow_lock:
+        if _flow_fields[0] == generation:
+            fields[key] = field
+            if len(fields) > FLOW_FIELD_CACHE_SIZE:
+                fields.popitem(last=False)
+    return field
+
+
+def get_flow_field(map_name: str, goal_x: int, goal_y: int,
+                   map_data: Optional[Dict] = None) -> FlowField:
+    """Flow field toward (goal_x, goal_y) on map_name, built on first use and cached."""
+    if map_data is None:
+        map_data = load_map(map_name)
+    if map_data is None:
+        raise ValueError(f"Map '{map_name}' not found in {MAPS_DIR}")
+    cm = compile_map(map_data)
+    goal = cm.index(goal_x, goal_y)
+    if goal is None:
+        raise ValueError(f"Goal tile {goal_x},{goal_y} not in map data for {map_name}")
+    return _flow_field_for(cm, goal)
+
+
+def warm_flow_fields(targets) -> int:
+    """Prebuild flow fields for (map_name, x, y) targets. Unscanned maps/tiles
+    are skipped. Returns the number of fields available."""
+    count = 0
+    for map_name, x, y in targets:
         try:
-            with open(f) as fh:
-                data = json.load(fh)
-                maps[data["map_name"]] = data
-        except (json.JSONDecodeError, KeyError):
+            get_flow_field(map_name, x, y)
+            count += 1
+        except ValueError:
             continue
-    return maps
+    return count
+
+
+# ============================================================
+# Incremental replanning (D* Lite)
+#
+# When an NPC steps into the path, the navigator blocks that tile and
+# asks for a detour. D* Lite keeps a goal-rooted distance field (seeded
+# from the goal's flow field, so nothing is searched up front) and on
+# each block/unblock repairs only the tiles whose distance changed,
+# instead of searching the whole map again.
+# ============================================================
+
+_INF = 1 << 30
+
+
+class Replanner:
+    """D* Lite toward one goal tile, with tiles that can be blocked temporarily."""
+
+    def __init__(self, cm: CompiledMap, goal: int, start: int, tail: Tuple[str, ...] = ()):
+        """
+        Args:
+            cm: Compiled map to plan on
+            goal: Grid index of the goal tile
+            start: Grid index of the player's tile
+            tail: Steps taken from the goal tile that leave the map (a warp
+                  step); appended to every path returned
+        """
+        self.cm = cm
+        self.goal = goal
+        self.start = start
+        self.tail = list(tail)
+        self.blocked = set()
+        field = _flow_field_for(cm, goal)
+        self._g = [d if d >= 0 else _INF for d in field.dist]
+        self._rhs = list(self._g)
+        self._queue: List[Tuple[int, int, int]] = []
+        self._km = 0
+        self._last = start
+
+    def _h(self, a: int, b: int) -> int:
+        ay, ax = divmod(a, self.cm.width)
+        by, bx = divmod(b, self.cm.width)
+        return abs(ax - bx) + abs(ay - by)
+
+    def _key(self, s: int) -> Tuple[int, int]:
+        m = min(self._g[s], self._rhs[s])
+        return m + self._h(self.start, s) + self._km, m
 
+    def _successors(self, s: int):
+        grid = self.cm.grid
+        flags = grid[s]
+        for bit, offset, _direction in self.cm.moves:
+            if flags & bit and grid[s + offset] != NO_TILE:
+                yield s + offset
 
-def _heuristic(x1: int, y1: int, x2: int, y2: int) -> int:
-    """Manhattan distance heuristic for A*."""
-    return abs(x1 - x2) + abs(y1 - y2)
+    def _predecessors(self, s: int):
+        grid = self.cm.grid
+        for bit, offset, _direction in self.cm.moves:
+            p = s - offset
+            if grid[p] != NO_TILE and grid[p] & bit:
+                yield p
+
+    def _update(self, s: int):
+        if s != self.goal:
+            best = _INF
+            if s not in self.blocked:
+                g = self._g
+                blocked = self.blocked
+                for n in self._successors(s):
+                    if n not in blocked and g[n] + 1 < best:
+                        best = g[n] + 1
+            self._rhs[s] = best
+        if self._g[s] != self._rhs[s]:
+            heapq.heappush(self._queue, (*self._key(s), s))
+
+    def _compute(self):
+        g, rhs, queue = self._g, self._rhs, self._queue
+        expanded = 0
+        while queue:
+            k1, k2, s = queue[0]
+            if g[s] == rhs[s]:
+                heapq.heappop(queue)  # stale entry
+                continue
+            if (k1, k2) >= self._key(self.start) and rhs[self.start] == g[self.start]:
+                break
+            heapq.heappop(queue)
+            new_key = self._key(s)
+            if (k1, k2) < new_key:
+                heapq.heappush(queue, (*new_key, s))
+                continue
+            expanded += 1
+            if g[s] > rhs[s]:
+                g[s] = rhs[s]
+            else:
+                g[s] = _INF
+                self._update(s)
+            for p in self._predecessors(s):
+                self._update(p)
+        _count_search(expanded)
+
+    def _cost_changed(self, s: int):
+        self._km += self._h(self._last, self.start)
+        self._last = self.start
+        self._update(s)
+        for p in self._predecessors(s):
+            self._update(p)
+
+    def move_to(self, idx: int):
+        """Record that the player now stands on grid index idx."""
+        self.start = idx
+
+    def step_target(self, idx: int, direction: str) -> Optional[int]:
+        """Tile reached by walking direction from idx, or None if it isn't a walk step."""
+        bit, offset, _direction = self.cm.moves[DIRECTION_INDEX[direction]]
+        if self.cm.grid[idx] & bit and self.cm.grid[idx + offset] != NO_TILE:
+            return idx + offset
+        return None
+
+    def block(self, idx: int):
+        """Treat tile idx as impassable until unblock()."""
+        if idx not in self.blocked:
+            self.blocked.add(idx)
+            self._cost_changed(idx)
+
+    def unblock(self, idx: int):
+        if idx in self.blocked:
+            self.blocked.discard(idx)
+            self._cost_changed(idx)
+
+    def path(self) -> Optional[List[str]]:
+        """Shortest steps from the current start avoiding blocked tiles (plus tail), or None."""
+        self._compute()
+        g = self._g
+        if g[self.start] >= _INF:
+            return None
+        moves = self.cm.moves
+        grid = self.cm.grid
+        blocked = self.blocked
+        path = []
+        cur = self.start
+        while cur != self.goal:
+            flags = grid[cur]
+            best, best_move = _INF, None
+            for bit, offset, direction in moves:
+                n = cur + offset
+                if flags & bit and grid[n] != NO_TILE and n not in blocked and g[n] < best:
+                    best, best_move = g[n], (offset, direction)
+            if best_move is None or best >= g[cur]:
+                return None
+            cur += best_move[0]
+            path.append(best_move[1])
+        return path + self.tail
+
+
+def replanner_for_path(map_name: str, start_x: int, start_y: int, path: List[str],
+                       map_data: Optional[Dict] = None) -> Optional[Replanner]:
+    """
+    Build a Replanner for a path about to be (or being) walked.
+
+    The goal is where the path's walk steps end; any steps after that (the
+    warp step at the end of a route segment) become the replanner's tail.
+
+    Returns:
+        Replanner, or None if the map/start is unknown or the path doesn't
+        follow the map's walk edges
+    """
+    if map_data is None:
+        map_data = load_map(map_name)
+    if map_data is None:
+        return None
+    cm = compile_map(map_data)
+    start = cm.index(start_x, start_y)
+    if start is None:
+        return None
+    grid = cm.grid
+    cur = start
+    for i, direction in enumerate(path):
+        bit, offset, _direction = cm.moves[DIRECTION_INDEX[direction]]
+        if grid[cur] & bit and grid[cur + offset] != NO_TILE:
+            cur += offset
+        elif grid[cur] & WARP_BITS[direction]:
+            return Replanner(cm, cur, start, tuple(path[i:]))
+        else:
+            return None
+    return Replanner(cm, cur, start)
 
 
 def find_path(map_name: str, start_x: int, start_y: int, 
               goal_x: int, goal_y: int, 
-              map_data: Optional[Dict] = None) -> Optional[List[str]]:
+              map_data: Optional[Dict] = None,
+              algorithm: str = "auto",
+              jps_auto: Optional[bool] = None) -> Optional[List[str]]:
     """
-    A* pathfinding on a single map.
+    Shortest-path search on a single map.
     
     Args:
         map_name: Name of the map to pathfind on
         start_x, start_y: Starting tile coordinates
         goal_x, goal_y: Goal tile coordinates
         map_data: Optional pre-loaded map data (skips file load)
+        algorithm: "astar", "jps", or "auto" — a cached flow field if there
+                   is one, else A* (or JPS on open maps, see jps_auto). All
+                   return paths of the same (shortest) length, but JPS
+                   breaks ties between equal-length paths differently.
+        jps_auto: Let auto use JPS on maps with open_ratio() >= JPS_OPEN_RATIO
+                  (default JPS_AUTO)
     
     Returns:
         List of direction strings ['up', 'right', ...] or None if no path found
     """
+    if algorithm not in ("auto", "astar", "jps"):
+        raise ValueError(f"Unknown algorithm '{algorithm}' (expected auto, astar or jps)")
     if map_data is None:
         map_data = load_map(map_name)
     if map_data is None:
         raise ValueError(f"Map '{map_name}' not found in {MAPS_DIR}")
     
-    tiles = map_data["tiles"]
-    start_key = f"{start_x},{start_y}"
-    goal_key = f"{goal_x},{goal_y}"
+    cm = compile_map(map_data)
+    start = cm.index(start_x, start_y)
+    goal = cm.index(goal_x, goal_y)
     
     # Verify start and goal exist in tile data
-    if start_key not in tiles:
-        raise ValueError(f"Start tile {start_key} not in map data for {map_name}")
-    if goal_key not in tiles:
-        raise ValueError(f"Goal tile {goal_key} not in map data for {map_name}")
-    
-    # A* search
-    # Priority queue: (f_score, counter, x, y)
-    counter = 0
-    open_set = [(0 + _heuristic(start_x, start_y, goal_x, goal_y), counter, start_x, start_y)]
-    came_from: Dict[Tuple[int, int], Tuple[int, int, str]] = {}  # (x,y) -> (prev_x, prev_y, direction)
-    g_score: Dict[Tuple[int, int], int] = {(start_x, start_y): 0}
-    closed: Set[Tuple[int, int]] = set()
+    if start is None:
+        raise ValueError(f"Start tile {start_x},{start_y} not in map data for {map_name}")
+    if goal is None:
+        raise ValueError(f"Goal tile {goal_x},{goal_y} not in map data for {map_name}")
     
-    while open_set:
-        f, _, cx, cy = heapq.heappop(open_set)
-        
-        if cx == goal_x and cy == goal_y:
-            # Reconstruct path
-            path = []
-            cur = (goal_x, goal_y)
-            while cur in came_from:
-                px, py, direction = came_from[cur]
-                path.append(direction)
-                cur = (px, py)
-            path.reverse()
-            return path
-        
-        if (cx, cy) in closed:
-            continue
-        closed.add((cx, cy))
-        
-        tile_key = f"{cx},{cy}"
-        tile = tiles.get(tile_key)
-        if tile is None:
-            continue
-        
-        for direction, (dx, dy) in DIRECTIONS.items():
-            # Check if this direction is walkable (walk or warp counts as passable on same map)
-            movement = tile.get(direction, "blocked")
-            if movement == "blocked":
-                continue
-            
-            # For warps, they leave the map — don't follow them in single-map pathfinding
-            # unless the warp destination is actually the goal (edge case)
-            if movement == "warp":
-                # Check if stepping in this direction reaches the goal
-                # Warps change maps, so normally skip. But the warp tile itself
-                # might be the goal — that's already handled since we arrive AT the tile.
-                continue
-            
-            nx, ny = cx + dx, cy + dy
-            neighbor_key = f"{nx},{ny}"
-            
-            if neighbor_key not in tiles:
-                continue
-            if (nx, ny) in closed:
-                continue
-            
-            new_g = g_score[(cx, cy)] + 1
-            if new_g < g_score.get((nx, ny), float('inf')):
-                g_score[(nx, ny)] = new_g
-                f_score = new_g + _heuristic(nx, ny, goal_x, goal_y)
-                counter += 1
-                heapq.heappush(open_set, (f_score, counter, nx, ny))
-                came_from[(nx, ny)] = (cx, cy, direction)
+    if algorithm == "auto":
+        # A cached flow field toward this goal answers without searching
+        field = _flow_field_for(cm, goal, build=False)
+        if field is not None:
+            return field.path_from_index(start)
+        if (JPS_AUTO if jps_auto is None else jps_auto) and cm.open_ratio() >= JPS_OPEN_RATIO:
+            algorithm = "jps"
     
-    return None  # No path found
+    if algorithm == "jps":
+        return _jps(cm, start, goal)
+    return _astar(cm, start, goal)
 
 
-def find_path_to_warp(map_name: str, start_x: int, start_y: int, 
-                      target_map_name: str,
-                      map_data: Optional[Dict] = None) -> Optional[List[str]]:
+def _nearest_goal(cm: CompiledMap, start: int, goals) -> Optional[Tuple[int, bytearray]]:
     """
-    Find path to the nearest warp that leads to target_map_name.
+    Multi-goal BFS over walk edges. Stops at the first goal reached, which is
+    the nearest one since every step costs the same.
     
-    The returned path includes the final step INTO the warp.
+    Returns:
+        (goal index, parent move field) or None if no goal is reachable
+    """
+    grid = cm.grid
+    moves = cm.moves
+    parent = bytearray(len(grid))
+    if start in goals:
+        _count_search(0)
+        return start, parent
+    seen = bytearray(len(grid))
+    seen[start] = 1
+    frontier = [start]
+    expanded = 0
+    while frontier:
+        next_frontier = []
+        for cur in frontier:
+            expanded += 1
+            flags = grid[cur]
+            for m, (bit, offset, _direction) in enumerate(moves):
+                if flags & bit:
+                    nxt = cur + offset
+                    if not seen[nxt] and grid[nxt] != NO_TILE:
+                        seen[nxt] = 1
+                        parent[nxt] = m
+                        if nxt in goals:
+                            _count_search(expanded)
+                            return nxt, parent
+                        next_frontier.append(nxt)
+        frontier = next_frontier
+    _count_search(expanded)
+    return None
+
+
+def find_warp_path(map_name: str, start_x: int, start_y: int,
+                   target_map_name: str,
+                   map_data: Optional[Dict] = None) -> Optional[Tuple[List[str], Tuple[int, int], str, Dict]]:
+    """
+    Find the nearest warp that leads to target_map_name in a single search
+    seeded with every qualifying warp tile.
     
     Returns:
-        List of direction strings, or None if no path/warp found
+        (path, (warp_x, warp_y), exit_direction, warp_info) or None if no
+        path/warp found. The path includes the final step INTO the warp.
     """
     if map_data is None:
         map_data = load_map(map_name)
     if map_data is None:
         raise ValueError(f"Map '{map_name}' not found")
     
-    warps = map_data.get("warps", {})
+    cm = compile_map(map_data)
     
-    # Find all warp tiles that lead to target map
-    warp_targets = []
-    for warp_key, warp_dirs in warps.items():
+    # Every warp tile that leads to the target map -> (direction, warp_info)
+    goals: Dict[int, Tuple[str, Dict]] = {}
+    for warp_key, warp_dirs in map_data.get("warps", {}).items():
         for direction, info in warp_dirs.items():
             if info.get("map_name") == target_map_name:
                 wx, wy = [int(c) for c in warp_key.split(",")]
-                warp_targets.append((wx, wy, direction))
+                idx = cm.index(wx, wy)
+                if idx is not None and idx not in goals:
+                    goals[idx] = (direction, info)
     
-    if not warp_targets:
+    if not goals:
         return None
     
-    # Find shortest path to any warp tile, then add the warp step
-    best_path = None
-    
-    for wx, wy, warp_direction in warp_targets:
-        try:
-            path = find_path(map_name, start_x, start_y, wx, wy, map_data=map_data)
-            if path is not None:
-                # Add the warp step
-                full_path = path + [warp_direction]
-                if best_path is None or len(full_path) < len(best_path):
-                    best_path = full_path
-        except ValueError:
-            continue
+    start = cm.index(start_x, start_y)
+    if start is None:
+        return None
     
-    return best_path
+    found = _nearest_goal(cm, start, goals)
+    if found is None:
+        return None
+    goal, parent = found
+    direction, info = goals[goal]
+    path = _trace_field(cm, parent, start, goal) + [direction]
+    return path, cm.coords(goal), direction, info
 
 
-def _build_map_graph() -> Dict[str, List[Tuple[str, str, int, int]]]:
-    """
-    Build a graph of map connections from all available map data.
-    Returns: dict of map_name -> list of (dest_map_name, warp_tile_key, dest_x, dest_y)
+def find_path_to_warp(map_name: str, start_x: int, start_y: int, 
+                      target_map_name: str,
+                      map_data: Optional[Dict] = None) -> Optional[List[str]]:
     """
-    all_maps = load_all_maps()
-    graph: Dict[str, List[Tuple[str, str, int, int]]] = defaultdict(list)
+    Find path to the nearest warp that leads to target_map_name.
     
-    for map_name, data in all_maps.items():
-        for warp_key, warp_dirs in data.get("warps", {}).items():
-            for direction, info in warp_dirs.items():
-                dest_name = info.get("map_name", "")
-                dest_x = info.get("dest_x", 0)
-                dest_y = info.get("dest_y", 0)
-                graph[map_name].append((dest_name, warp_key, dest_x, dest_y))
+    The returned path includes the final step INTO the warp.
     
-    return graph
+    Returns:
+        List of direction strings, or None if no path/warp found
+    """
+    result = find_warp_path(map_name, start_x, start_y, target_map_name, map_data=map_data)
+    return result[0] if result else None
+
+
+# ============================================================
+# Cross-map routing over a warp-node graph
+#
+# Nodes are tiles the player can stand on after a warp (plus the start
+# tile). Edges run from a node to every warp on the same map, weighted by
+# the real walking distance + 1 for the warp step, so Dijkstra over the
+# graph returns the route with the fewest total steps. Per-map BFS fields
+# and edge lists are computed once per map cache generation.
+# ============================================================
+
+def _bfs_field(cm: CompiledMap, source: int) -> Tuple[List[int], bytearray]:
+    """BFS from source over walk edges. Returns (distance, parent move) per grid index."""
+    grid = cm.grid
+    moves = cm.moves
+    dist = [-1] * len(grid)
+    parent = bytearray(len(grid))
+    dist[source] = 0
+    frontier = [source]
+    d = 0
+    expanded = 0
+    while frontier:
+        d += 1
+        expanded += len(frontier)
+        next_frontier = []
+        for cur in frontier:
+            flags = grid[cur]
+            for m, (bit, offset, _direction) in enumerate(moves):
+                if flags & bit:
+                    nxt = cur + offset
+                    if dist[nxt] < 0 and grid[nxt] != NO_TILE:
+                        dist[nxt] = d
+                        parent[nxt] = m
+                        next_frontier.append(nxt)
+        frontier = next_frontier
+    _count_search(expanded)
+    return dist, parent
+
+
+def _trace_field(cm: CompiledMap, parent: bytearray, source: int, target: int) -> List[str]:
+    """Direction steps from source to target along a BFS parent field."""
+    path = []
+    cur = target
+    while cur != source:
+        move = cm.moves[parent[cur]]
+        path.append(move[2])
+        cur -= move[1]
+    path.reverse()
+    return path
+
+
+class _MapRouting:
+    """Per-map routing data: compiled grid, warp exits and cached BFS fields."""
+
+    def __init__(self, map_data: Dict[str, Any]):
+        self.map_name = map_data["map_name"]
+        self.cm = compile_map(map_data)
+        # (warp tile index, direction, dest map name, dest_x, dest_y)
+        self.exits: List[Tuple[int, str, str, int, int]] = []
+        for warp_key, warp_dirs in map_data.get("warps", {}).items():
+            wx, wy = [int(c) for c in warp_key.split(",")]
+            idx = self.cm.index(wx, wy)
+            if idx is None:
+                continue
+            for direction, info in warp_dirs.items():
+                self.exits.append((idx, direction, info.get("map_name", ""),
+                                   info.get("dest_x", 0), info.get("dest_y", 0)))
+        # Filled lazily; the lock guards the dicts, values are built outside it
+        self._lock = threading.Lock()
+        self._fields: Dict[int, Tuple[List[int], bytearray]] = {}
+        self._edges: Dict[int, List[Tuple[int, Tuple[int, str, str, int, int]]]] = {}
+        self._landings: Dict[Tuple[int, str, str, int, int], Optional[int]] = {}
+
+    def field(self, source: int, cache: bool = True) -> Tuple[List[int], bytearray]:
+        with self._lock:
+            field = self._fields.get(source)
+        if field is None:
+            field = _bfs_field(self.cm, source)
+            if cache:
+                with self._lock:
+                    field = self._fields.setdefault(source, field)
+        return field
+
+    def edges(self, source: int, cache: bool = True) -> List[Tuple[int, Tuple[int, str, str, int, int]]]:
+        """(cost, exit) for every warp reachable from source; cost includes the warp step."""
+        with self._lock:
+            edges = self._edges.get(source)
+        if edges is None:
+            dist = self.field(source, cache)[0]
+            edges = [(dist[e[0]] + 1, e) for e in self.exits if dist[e[0]] >= 0]
+            if cache:
+                with self._lock:
+                    edges = self._edges.setdefault(source, edges)
+        return edges
+
+
+    def landing(self, exit: Tuple[int, str, str, int, int]) -> Optional[int]:
+        """Grid index (on the destination map) where the player ends up after exit."""
+        with self._lock:
+            if exit in self._landings:
+                return self._landings[exit]
+        landing = self._resolve_landing(exit)
+        with self._lock:
+            return self._landings.setdefault(exit, landing)
+
+    def _resolve_landing(self, exit: Tuple[int, str, str, int, int]) -> Optional[int]:
+        dest = _get_routing(exit[2])
+        if dest is None:
+            return None
+        idx = _door_landing(dest.cm, exit[3], exit[4])
+        if idx is not None:
+            return idx
+        # The scanner records building entrances with stale coordinates (read
+        # before the new map's position is set). The player actually lands on
+        # the mat that warps back out to the tile we entered from.
+        for back in dest.exits:
+            if back[2] == self.map_name and _door_landing(self.cm, back[3], back[4]) == exit[0]:
+                return back[0]
+        return None
+
+
+def _door_landing(cm: CompiledMap, x: int, y: int) -> Optional[int]:
+    """Index of tile (x, y), or of the tile below it when (x, y) is a door the
+    game auto-steps the player out of."""
+    idx = cm.index(x, y)
+    if idx is not None:
+        return idx
+    below = cm.index(x, y + 1)
+    if below is not None and cm.grid[below] & WARP_BITS["up"]:
+        return below
+    return None
+
+
+_routing_lock = threading.Lock()
+_routing: Tuple[int, Dict[str, Optional[_MapRouting]]] = (-1, {})
+
+
+def _get_routing(map_name: str) -> Optional[_MapRouting]:
+    """Routing data for map_name, rebuilt when the map cache generation changes."""
+    global _routing
+    generation = MAP_CACHE.current_generation()
+    with _routing_lock:
+        if _routing[0] != generation:
+            _routing = (generation, {})
+        maps = _routing[1]
+        if map_name in maps:
+            return maps[map_name]
+    data = load_map(map_name)
+    routing = _MapRouting(data) if data is not None else None
+    with _routing_lock:
+        if _routing[0] == generation:
+            # Another thread may have built it meanwhile; keep the first
+            routing = maps.setdefault(map_name, routing)
+    return routing
+
+
+def clear_caches(compiled: bool = False):
+    """Drop derived search caches (routing graph, BFS/flow fields, jump tables,
+    finished routes) and zero the route cache counters. With compiled=True
+    the compiled grids go too. Parsed maps stay cached."""
+    global _routing, _flow_fields, _route_cache
+    with _jump_lock:
+        _jump_tables.clear()
+    with _routing_lock:
+        _routing = (-1, {})
+    with _flow_lock:
+        _flow_fields = (-1, OrderedDict())
+    with _route_lock:
+        _route_cache = (-1, OrderedDict())
+        _route_stats["hits"] = _route_stats["misses"] = 0
+    if compiled:
+        with _compiled_lock:
+            _compiled_maps.clear()
+
+
+# Finished routes, LRU by (map, x, y, dest map, dest x, dest y). The agent
+# re-asks for the same destination from the same tile across turns (e.g.
+# after a battle), so repeats are answered without touching the graph.
+ROUTE_CACHE_SIZE = 256
+
+_route_lock = threading.Lock()
+_route_cache: Tuple[int, "OrderedDict[Tuple[str, int, int, str, int, int], Optional[List]]"] = (-1, OrderedDict())
+_route_stats = {"hits": 0, "misses": 0}
+
+
+def route_cache_stats() -> Dict[str, int]:
+    """Route cache hits/misses since the last clear_caches(), and current size."""
+    with _route_lock:
+        return {**_route_stats, "size": len(_route_cache[1])}
 
 
 def find_route(current_map: str, cx: int, cy: int,
@@ -248,72 +1203,130 @@ def find_route(current_map: str, cx: int, cy: int,
     """
     Cross-map routing: find a route from (current_map, cx, cy) to (dest_map, dx, dy).
     
-    Uses BFS on the map graph to find the sequence of maps to traverse,
-    then A* within each map to get the step-by-step path.
+    Runs Dijkstra over the warp-node graph, so the route has the fewest
+    total steps rather than the fewest map hops. Results (including "no
+    route") are cached until any map file changes.
     
     Returns:
-        List of (map_name, path_steps) tuples, or None if no route found.
-        The path_steps for the last segment end at the destination.
+        List of (map_name, path_steps) tuples, or None if no route found
+        (including when either map or tile isn't in the scanned map data;
+        route_problem says which). The path_steps for the last segment end at the destination.
         Intermediate segments end with a warp step.
     """
+    global _route_cache
+    generation = MAP_CACHE.current_generation()
+    key = (current_map, cx, cy, dest_map, dx, dy)
+    with _route_lock:
+        if _route_cache[0] != generation:
+            _route_cache = (generation, OrderedDict())
+        routes = _route_cache[1]
+        if key in routes:
+            routes.move_to_end(key)
+            _route_stats["hits"] += 1
+            route = routes[key]
+            return [(m, list(steps)) for m, steps in route] if route is not None else None
+        _route_stats["misses"] += 1
+    
+    route = _compute_route(current_map, cx, cy, dest_map, dx, dy)
+    
+    with _route_lock:
+        if _route_cache[0] == generation:
+            routes[key] = route
+            if len(routes) > ROUTE_CACHE_SIZE:
+                routes.popitem(last=False)
+    return [(m, list(steps)) for m, steps in route] if route is not None else None
+
+
+def route_problem(current_map: str, cx: int, cy: int,
+                  dest_map: str, dx: int, dy: int) -> Optional[str]:
+    """
+    Why find_route can't search between these tiles: a map or tile missing
+    from the scanned map data. None when both ends are known (find_route
+    may still find no route between them).
+    """
+    for name in (current_map, dest_map):
+        if _get_routing(name) is None:
+            return f"map '{name}' not found in {MAPS_DIR}"
+    if _get_routing(current_map).cm.index(cx, cy) is None:
+        return f"start tile {cx},{cy} not in map data for {current_map}"
+    if _get_routing(dest_map).cm.index(dx, dy) is None:
+        return f"goal tile {dx},{dy} not in map data for {dest_map}"
+    return None
+
+
+def _compute_route(current_map: str, cx: int, cy: int,
+                   dest_map: str, dx: int, dy: int) -> Optional[List[Tuple[str, List[str]]]]:
+    """Uncached find_route. Unknown maps or tiles give None, like no route."""
+    if route_problem(current_map, cx, cy, dest_map, dx, dy) is not None:
+        return None
+    start_routing = _get_routing(current_map)
+    dest_routing = _get_routing(dest_map)
+    start = start_routing.cm.index(cx, cy)
+    goal = dest_routing.cm.index(dx, dy)
+    
     if current_map == dest_map:
         # Same map — just pathfind directly
         path = find_path(current_map, cx, cy, dx, dy)
         if path is not None:
             return [(current_map, path)]
-        return None
     
-    # BFS on the map graph to find sequence of maps
-    graph = _build_map_graph()
-    all_maps = load_all_maps()
+    # Final legs read distances from the destination's flow field
+    goal_field = _flow_field_for(dest_routing.cm, goal)
     
-    # BFS: find shortest chain of maps from current_map to dest_map
-    from collections import deque
-    queue = deque()
-    queue.append((current_map, [(current_map, cx, cy)]))
-    visited_maps: Set[str] = {current_map}
+    # Dijkstra. Nodes are (map_name, grid index); the goal is (None, goal).
+    source = (current_map, start)
+    goal_node = (None, goal)
+    best: Dict[Tuple[Optional[str], int], int] = {source: 0}
+    prev: Dict[Tuple[Optional[str], int], Tuple[Tuple[str, int], Optional[Tuple]]] = {}
+    counter = 0
+    heap = [(0, counter, current_map, start)]
     
-    map_chains = []
+    def relax(node, cost, via):
+        nonlocal counter
+        if cost < best.get(node, cost + 1):
+            best[node] = cost
+            prev[node] = via
+            counter += 1
+            heapq.heappush(heap, (cost, counter, node[0], node[1]))
     
-    while queue:
-        cur_map, chain = queue.popleft()
+    while heap:
+        cost, _, m, idx = heapq.heappop(heap)
+        node = (m, idx)
+        if cost > best[node]:
+            continue
+        if m is None:
+            break
         
-        if cur_map == dest_map:
-            map_chains.append(chain)
-            continue  # Keep searching for alternatives
+        routing = _get_routing(m)
+        cache = node != source
+        if m == dest_map and goal_field.dist[idx] >= 0:
+            relax(goal_node, cost + goal_field.dist[idx], (node, None))
         
-        for dest_name, warp_key, dest_x, dest_y in graph.get(cur_map, []):
-            if dest_name not in visited_maps and dest_name in all_maps:
-                visited_maps.add(dest_name)
-                new_chain = chain + [(dest_name, dest_x, dest_y)]
-                queue.append((dest_name, new_chain))
+        for edge_cost, exit in routing.edges(idx, cache):
+            next_idx = routing.landing(exit)
+            if next_idx is not None:
+                relax((exit[2], next_idx), cost + edge_cost, (node, exit))
     
-    if not map_chains:
+    if goal_node not in prev:
         return None
     
-    # Use the shortest chain
-    best_chain = min(map_chains, key=len)
+    # Walk the chain back from the goal, then expand each leg into steps
+    legs = []
+    node = goal_node
+    while node != source:
+        from_node, exit = prev[node]
+        legs.append((from_node, exit))
+        node = from_node
+    legs.reverse()
     
-    # Now build the actual paths for each segment
     route = []
-    
-    for i in range(len(best_chain)):
-        seg_map, seg_x, seg_y = best_chain[i]
-        
-        if i == len(best_chain) - 1:
-            # Last segment: pathfind to final destination
-            if seg_map == dest_map:
-                path = find_path(seg_map, seg_x, seg_y, dx, dy)
-                if path is None:
-                    return None
-                route.append((seg_map, path))
-        else:
-            # Intermediate: pathfind to warp leading to next map
-            next_map = best_chain[i + 1][0]
-            path = find_path_to_warp(seg_map, seg_x, seg_y, next_map)
-            if path is None:
-                return None
-            route.append((seg_map, path))
+    for (m, idx), exit in legs:
+        if exit is None:
+            route.append((m, goal_field.path_from_index(idx)))
+            continue
+        routing = _get_routing(m)
+        parent = routing.field(idx, cache=(m, idx) != source)[1]
+        route.append((m, _trace_field(routing.cm, parent, idx, exit[0]) + [exit[1]]))
     
     return route
 
@@ -368,16 +1381,24 @@ def main():
     parser.add_argument("--to", dest="goal", required=True, help="Goal coords 'x,y'")
     parser.add_argument("--visual", action="store_true", help="Show visual path")
     parser.add_argument("--to-map", help="Find path to warp leading to this map")
+    parser.add_argument("--algorithm", choices=["auto", "astar", "jps"], default="auto",
+                        help="Single-map search algorithm")
+    parser.add_argument("--jps-auto", action="store_true",
+                        help="Let auto use JPS on open maps (see JPS_AUTO)")
     args = parser.parse_args()
     
     sx, sy = [int(c) for c in args.start.split(",")]
     
     if args.to_map:
-        path = find_path_to_warp(args.map, sx, sy, args.to_map)
+        result = find_warp_path(args.map, sx, sy, args.to_map)
+        path = result[0] if result else None
+        if result:
+            (wx, wy), direction = result[1], result[2]
+            print(f"Nearest warp to {args.to_map}: ({wx},{wy}) going {direction}")
         print(f"Path to {args.to_map}: {path}")
     else:
         gx, gy = [int(c) for c in args.goal.split(",")]
-        path = find_path(args.map, sx, sy, gx, gy)
+        path = find_path(args.map, sx, sy, gx, gy, algorithm=args.algorithm, jps_auto=args.jps_auto or None)
         print(f"Path ({len(path)} steps): {path}")
     
     if path and args.visual:
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Pokemon Red — Game State Model
+
+Typed, slotted classes for the state PokemonGame.get_state() decodes from a
+single RamSnapshot. States compare field by field, diff() reports only the
+fields that changed, and to_dict() gives the same nested dict
+get_full_state() has always returned.
+
+Usage:
+    before = game.get_state()
+    game.press_button("up")
+    after = game.get_state()
+    after.diff(before)        # {"position": {"y": 4}}
+    after.position == before.position
+"""
+
+import json
+from typing import Dict, Any, Optional, Tuple
+
+BADGE_NAMES = ("Boulder", "Cascade", "Thunder", "Rainbow",
+               "Soul", "Marsh", "Volcano", "Earth")
+
+
+def _plain(value: Any) -> Any:
+    """A field value in to_dict() form."""
+    if isinstance(value, _Model):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _diff_value(new: Any, old: Any) -> Any:
+    """What changed from old to new: a nested diff where both sides line up, else new."""
+    if isinstance(new, _Model) and type(old) is type(new):
+        return new.diff(old)
+    if isinstance(new, tuple) and isinstance(old, tuple) and len(new) == len(old):
+        return {i: _diff_value(n, o) for i, (n, o) in enumerate(zip(new, old)) if n != o}
+    if isinstance(new, dict) and isinstance(old, dict) and new.keys() == old.keys():
+        return {k: v for k, v in new.items() if old[k] != v}
+    return _plain(new)
+
+
+class _Model:
+    """
+    Base for the state classes: equality and diff() over the fields in
+    _compared (every slot unless a class leaves some out).
+    """
+
+    __slots__ = ()
+    _compared: Tuple[str, ...] = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._compared)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def diff(self, other: "_Model") -> Dict[str, Any]:
+        """
+        Fields that differ from other, with their new values.
+
+        Nested objects diff recursively, equal-length lists by index
+        ({"party": {0: {"hp": 17}}}); anything else comes out whole, in
+        to_dict() form. Empty when nothing changed.
+        """
+        changes = {}
+        for f in self._compared:
+            new, old = getattr(self, f), getattr(other, f)
+            if new != old:
+                changes[f] = _diff_value(new, old)
+        return changes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f: _plain(getattr(self, f)) for f in self.__slots__}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+
+# ============================================================
+# State classes
+# ============================================================
+
+class Position(_Model):
+    """Player position: tile x/y, map and facing direction."""
+
+    __slots__ = ("x", "y", "map_id", "map_name", "facing")
+    _compared = __slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"x": self.x, "y": self.y, "map_id": self.map_id,
+                "map_name": self.map_name, "facing": self.facing}
+
+
+class Move(_Model):
+    """A known move and its remaining PP."""
+
+    __slots__ = ("id", "name", "pp")
+    _compared = __slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "pp": self.pp}
+
+
+class PartyMember(_Model):
+    """One Pokemon in the party (moves is a tuple of Move)."""
+
+    __slots__ = ("species_id", "name", "level", "hp", "max_hp", "status", "moves")
+    _compared = __slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "species_id": self.species_id,
+            "name": self.name,
+            "level": self.level,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "status": self.status,
+            "moves": [m.to_dict() for m in self.moves],
+        }
+
+
+class Combatant(_Model):
+    """A Pokemon in battle; species is only known for the enemy side."""
+
+    __slots__ = ("hp", "level", "species_id", "name")
+    _compared = __slots__
+
+    def __init__(self, hp: int, level: int, species_id: Optional[int] = None,
+                 name: Optional[str] = None):
+        self.hp = hp
+        self.level = level
+        self.species_id = species_id
+        self.name = name
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.species_id is None:
+            return {"hp": self.hp, "level": self.level}
+        return {"species_id": self.species_id, "name": self.name,
+                "hp": self.hp, "level": self.level}
+
+
+class BattleState(_Model):
+    """Battle type ("wild"/"trainer") and the two active Pokemon."""
+
+    __slots__ = ("type", "enemy", "player")
+    _compared = __slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "enemy": self.enemy.to_dict(),
+                "player": self.player.to_dict()}
+
+
+class GameState(_Model):
+    """
+    Everything get_full_state reports, from one frame.
+
+    frame is when the state was read; it isn't compared, so two reads of an
+    unchanged game are equal and diff() to {}.
+    """
+
+    __slots__ = ("position", "party", "badges", "money", "in_battle",
+                 "text_active", "battle", "frame")
+    _compared = __slots__[:-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The get_full_state() dict ("battle" only present in battle)."""
+        state = {
+            "position": self.position.to_dict(),
+            "party": [p.to_dict() for p in self.party],
+            "badges": dict(self.badges),
+            "money": self.money,
+            "in_battle": self.in_battle,
+            "text_active": self.text_active,
+            "frame": self.frame,
+        }
+        if self.battle is not None:
+            state["battle"] = self.battle.to_dict()
+        return state
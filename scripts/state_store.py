@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Pokemon Red — Compressed Savestate Store
+
+The scanner keeps a PyBoy savestate for every tile it has reached. Raw,
+those are tens of KB each; states taken on the same map differ from each
+other in only a few hundred bytes (position, sprite data, timers).
+
+StateStore keeps each state as a zlib (or lzma) compressed XOR delta
+against a base state, holds a small LRU of decompressed states for the
+tiles being worked on, and moves compressed blobs to an anonymous temp
+file once the in-memory total passes a limit.
+
+SavestateRing builds a bounded, memory-only rewind history on the same
+encoding: the newest N states by frame, oldest dropped first.
+
+Usage:
+    store = StateStore(base=initial_state)
+    store["3,4"] = state_bytes
+    state_bytes = store["3,4"]
+    print(store.stats())
+"""
+
+import lzma
+import tempfile
+import zlib
+from collections import OrderedDict, deque
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+# Decompressed states kept for repeat reads (a tile is read 4x while probed)
+STATE_CACHE_SIZE = 16
+# Compressed bytes held in memory before blobs spill to a temp file
+SPILL_BYTES = 64 * 1024 * 1024
+
+CODECS = {
+    "zlib": (lambda raw: zlib.compress(raw, 1), zlib.decompress),
+    "lzma": (lambda raw: lzma.compress(raw, preset=0), lzma.decompress),
+}
+
+# SavestateRing defaults: states kept, and compressed bytes they may use
+RING_CAPACITY = 120
+RING_MAX_BYTES = 32 * 1024 * 1024
+
+# Blob header byte: how the payload relates to the base state
+_PLAIN = b"P"
+_DELTA = b"D"
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    """Bytewise XOR of two equal-length buffers."""
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+class StateStore:
+    """
+    Mapping of key -> savestate bytes, stored compressed.
+
+    Supports the dict operations the scanner uses: [], []=, in, get, len,
+    keys, del.
+    """
+
+    def __init__(self, base: Optional[bytes] = None, codec: str = "zlib",
+                 cache_size: int = STATE_CACHE_SIZE, spill_bytes: int = SPILL_BYTES):
+        """
+        Args:
+            base: State to delta-encode against (e.g. the scan's start state);
+                  states of a different length are stored whole
+            codec: "zlib" (fast) or "lzma" (smaller, slower)
+            cache_size: Decompressed states kept in the LRU
+            spill_bytes: In-memory compressed total before spilling to disk
+                         (0 = never spill)
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}. Valid: {list(CODECS)}")
+        self.base = base
+        self.codec = codec
+        self._compress, self._decompress = CODECS[codec]
+        self.cache_size = cache_size
+        self.spill_bytes = spill_bytes
+
+        # key -> compressed blob (in memory) or (offset, length) in the spill file
+        self._blobs: Dict[str, Union[bytes, Tuple[int, int]]] = {}
+        self._raw_sizes: Dict[str, int] = {}
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._spill = None
+        self._memory_bytes = 0
+
+        self.raw_bytes = 0
+        self.spilled_bytes = 0
+        self.peak_memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ==========================================
+    # Encoding
+    # ==========================================
+
+    def _encode(self, state: bytes) -> bytes:
+        if self.base is not None and len(state) == len(self.base):
+            return _DELTA + self._compress(_xor(state, self.base))
+        return _PLAIN + self._compress(state)
+
+    def _decode(self, blob: bytes) -> bytes:
+        raw = self._decompress(blob[1:])
+        return _xor(raw, self.base) if blob[:1] == _DELTA else raw
+
+    def _read_blob(self, key: str) -> bytes:
+        blob = self._blobs[key]
+        if isinstance(blob, tuple):
+            offset, length = blob
+            self._spill.seek(offset)
+            return self._spill.read(length)
+        return blob
+
+    def _cache_put(self, key: str, state: bytes):
+        self._cache[key] = state
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ==========================================
+    # Mapping interface
+    # ==========================================
+
+    def __setitem__(self, key: str, state: bytes):
+        if key in self._blobs:
+            del self[key]
+        blob = self._encode(state)
+        self._raw_sizes[key] = len(state)
+        self.raw_bytes += len(state)
+        if self.spill_bytes and self._memory_bytes + len(blob) > self.spill_bytes:
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(prefix="pokemon_states_")
+            self._spill.seek(0, 2)
+            self._blobs[key] = (self._spill.tell(), len(blob))
+            self._spill.write(blob)
+            self.spilled_bytes += len(blob)
+        else:
+            self._blobs[key] = blob
+            self._memory_bytes += len(blob)
+            self.peak_memory_bytes = max(self.peak_memory_bytes, self._memory_bytes)
+        if self.cache_size:
+            self._cache_put(key, state)
+
+    def __getitem__(self, key: str) -> bytes:
+        state = self._cache.get(key)
+        if state is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return state
+        self.misses += 1
+        state = self._decode(self._read_blob(key))
+        if self.cache_size:
+            self._cache_put(key, state)
+        return state
+
+    def __delitem__(self, key: str):
+        blob = self._blobs.pop(key)
+        self.raw_bytes -= self._raw_sizes.pop(key)
+        if isinstance(blob, tuple):
+            self.spilled_bytes -= blob[1]  # The file space itself isn't reclaimed
+        else:
+            self._memory_bytes -= len(blob)
+        self._cache.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._blobs
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._blobs)
+
+    def keys(self):
+        return self._blobs.keys()
+
+    def get(self, key: str, default: Optional[bytes] = None) -> Optional[bytes]:
+        return self[key] if key in self._blobs else default
+
+    def update(self, states: Dict[str, bytes]):
+        for key, state in states.items():
+            self[key] = state
+
+    def close(self):
+        """Drop everything and delete the spill file."""
+        self._blobs.clear()
+        self._raw_sizes.clear()
+        self._cache.clear()
+        self.raw_bytes = 0
+        self._memory_bytes = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __del__(self):
+        if self._spill is not None:
+            self._spill.close()
+
+    # ==========================================
+    # Stats
+    # ==========================================
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, byte totals and cache hit rate."""
+        stored = self._memory_bytes + self.spilled_bytes
+        return {
+            "states": len(self._blobs),
+            "codec": self.codec,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": stored,
+            "memory_bytes": self._memory_bytes,
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "spilled_bytes": self.spilled_bytes,
+            "cached_states": len(self._cache),
+            "ratio": round(self.raw_bytes / stored, 1) if stored else 0.0,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+class SavestateRing:
+    """
+    The newest savestates by emulator frame, compressed, never on disk.
+
+    Each entry is (frame, reason). The first state pushed becomes the delta
+    base. The oldest entries are dropped once there are more than
+    `capacity` or their compressed size passes `max_bytes`.
+    """
+
+    def __init__(self, capacity: int = RING_CAPACITY, max_bytes: int = RING_MAX_BYTES,
+                 codec: str = "zlib"):
+        """
+        Args:
+            capacity: Most states kept
+            max_bytes: Most compressed bytes kept (at least one state is)
+            codec: StateStore codec
+        """
+        if capacity < 1:
+            raise ValueError(f"Ring capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.store = StateStore(codec=codec, cache_size=0, spill_bytes=0)
+        self._entries: deque = deque()  # (frame, reason), oldest first
+        self.pushed = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, frame: int, state: bytes, reason: str = "periodic"):
+        """Add a state taken at `frame`; replaces one already held for that frame."""
+        if self.store.base is None:
+            self.store.base = state
+        self.truncate(frame - 1)
+        self.store[str(frame)] = state
+        self._entries.append((frame, reason))
+        self.pushed += 1
+        while len(self._entries) > 1 and (len(self._entries) > self.capacity
+                                          or self.store.stats()["memory_bytes"] > self.max_bytes):
+            old_frame, _ = self._entries.popleft()
+            del self.store[str(old_frame)]
+            self.dropped += 1
+
+    def find(self, frame: int) -> Optional[Tuple[int, str]]:
+        """Newest (frame, reason) taken at or before `frame`, or None."""
+        for entry in reversed(self._entries):
+            if entry[0] <= frame:
+                return entry
+        return None
+
+    def get(self, frame: int) -> bytes:
+        """The state taken at exactly `frame` (KeyError if not held)."""
+        return self.store[str(frame)]
+
+    def truncate(self, frame: int):
+        """Drop states newer than `frame` (after a rewind they are another timeline)."""
+        while self._entries and self._entries[-1][0] > frame:
+            newer, _ = self._entries.pop()
+            del self.store[str(newer)]
+
+    def clear(self):
+        """Drop every state; the next push becomes the new delta base."""
+        self.truncate(-1)
+        self.store.base = None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Held states, oldest first."""
+        return [{"frame": frame, "reason": reason} for frame, reason in self._entries]
+
+    def stats(self) -> Dict[str, Any]:
+        """Count, frame span, byte totals and push/drop counts."""
+        store = self.store.stats()
+        return {
+            "states": len(self._entries),
+            "capacity": self.capacity,
+            "oldest_frame": self._entries[0][0] if self._entries else None,
+            "newest_frame": self._entries[-1][0] if self._entries else None,
+            "raw_bytes": store["raw_bytes"],
+            "memory_bytes": store["memory_bytes"],
+            "max_bytes": self.max_bytes,
+            "ratio": store["ratio"],
+            "pushed": self.pushed,
+            "dropped": self.dropped,
+        }
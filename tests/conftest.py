@@ -0,0 +1,80 @@
+"""Shared fixtures: the scripts directory on sys.path, and a PokemonGame
+driven by an in-memory stand-in for PyBoy (no ROM needed)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+
+class FakePyBoy:
+    """Just enough of PyBoy for PokemonGame: 64 KiB of memory, a frame
+    counter, and savestates that are a copy of both.
+
+    Set walkable to a set of (x, y) tiles for a world to walk in: a
+    direction press moves the player one tile on the next frame if the
+    tile there is walkable, and does nothing otherwise.
+    """
+
+    def __init__(self):
+        self.memory = bytearray(0x10000)
+        self.frames = 0
+        self.ticks = []      # (count, render) for every tick() call
+        self.pressed = []    # buttons held right now
+        self.on_frame = None  # called with the frame number after each frame
+        self.walkable = None
+        self._step = None     # direction pressed and not yet walked
+
+    def tick(self, count: int = 1, render: bool = True, sound: bool = True) -> bool:
+        self.ticks.append((count, render))
+        for _ in range(count):
+            self.frames += 1
+            if self._step is not None:
+                self._walk(self._step)
+                self._step = None
+            if self.on_frame is not None:
+                self.on_frame(self.frames)
+        return True
+
+    def _walk(self, direction: str):
+        from game import ADDR
+        dx, dy = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}[direction]
+        x, y = self.memory[ADDR["player_x"]] + dx, self.memory[ADDR["player_y"]] + dy
+        if (x, y) in self.walkable:
+            self.memory[ADDR["player_x"]], self.memory[ADDR["player_y"]] = x, y
+
+    def button_press(self, button: str):
+        self.pressed.append(button)
+        if self.walkable is not None and button in ("up", "down", "left", "right"):
+            self._step = button
+
+    def button_release(self, button: str):
+        self.pressed.remove(button)
+
+    def set_emulation_speed(self, speed: int):
+        pass
+
+    def save_state(self, f):
+        f.write(self.frames.to_bytes(4, "little") + bytes(self.memory))
+
+    def load_state(self, f):
+        data = f.read()
+        self.frames = int.from_bytes(data[:4], "little")
+        self.memory[:] = data[4:]
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def game(tmp_path):
+    pytest.importorskip("pyboy")
+    pytest.importorskip("PIL")
+    from game import PokemonGame
+
+    g = PokemonGame("missing.gb", save_dir=str(tmp_path / "saves"),
+                    screenshot_dir=str(tmp_path / "screenshots"))
+    g.pyboy = FakePyBoy()
+    return g
@@ -0,0 +1,139 @@
+from game import ADDR
+
+
+def test_rewind_across_map_change_fires_no_events(game):
+    game.enable_rewind(every=10)
+    fired = []
+    game.watch("map_id", fired.append)
+    game.watch("battle_type", fired.append)
+
+    game.tick(20)
+    game.pyboy.memory[ADDR["map_id"]] = 0x0C
+    game.tick(20)
+    assert [e.name for e in fired] == ["map_id"]
+    game.poll_events()
+    fired.clear()
+
+    entry = game.rewind(25)
+    assert entry is not None and entry["frame"] <= 20
+    assert game.pyboy.memory[ADDR["map_id"]] == 0
+    pushed = len(game.rewind_ring)
+
+    game.tick(5)
+    assert fired == []
+    assert game.poll_events() == []
+    assert len(game.rewind_ring) == pushed
+
+
+def test_navigator_close_drops_its_watch(game):
+    from navigator import Navigator
+
+    with Navigator(game, verbose=False) as nav:
+        assert nav._on_battle_type in game._watches["battle_type"].callbacks
+    assert "battle_type" not in game._watches
+    assert game.load_callbacks == []
+
+
+def test_navigator_battle_frame_follows_rewind_and_load(game):
+    from navigator import Navigator
+
+    game.enable_rewind(every=10)
+    game.tick(20)
+    game.save_state("battle")  # saved outside battle; battle starts below
+    with Navigator(game, verbose=False) as nav:
+        game.pyboy.memory[ADDR["battle_type"]] = 1
+        game.tick(20)
+        assert nav._battle_frame == 40
+        # Back to before the battle: no event fires, but RAM says no battle
+        game.rewind(25)
+        assert nav._battle_frame is None
+
+        game.pyboy.memory[ADDR["battle_type"]] = 1
+        game.tick(5)
+        game.save_state("in_battle")
+        game.pyboy.memory[ADDR["battle_type"]] = 0
+        game.tick(5)
+        assert nav._battle_frame is None
+        assert game.load_state("in_battle")
+        assert nav._battle_frame == game.frame_count
+        assert game.load_state("battle")
+        assert nav._battle_frame is None
+
+
+def test_tick_stays_batched_while_watched(game):
+    fired = []
+    game.watch("map_id", fired.append)
+    game.pyboy.on_frame = lambda f: f == 7 and game.pyboy.memory.__setitem__(ADDR["map_id"], 1)
+
+    game.tick(10)
+    assert game.pyboy.ticks == [(10, True)]
+    assert len(fired) == 1
+    assert (fired[0].since, fired[0].frame) == (0, 10)
+
+
+def test_exact_watch_reports_frame_of_change(game):
+    fired = []
+    game.watch("map_id", fired.append, exact=True)
+    game.pyboy.on_frame = lambda f: f == 7 and game.pyboy.memory.__setitem__(ADDR["map_id"], 1)
+
+    game.tick(10)
+    assert len(game.pyboy.ticks) == 10
+    assert (fired[0].since, fired[0].frame) == (6, 7)
+
+
+def test_rewind_after_load_state_stays_on_loaded_timeline(game):
+    game.pyboy.memory[ADDR["map_id"]] = 0x0C
+    game.save_state("route1")
+    game.pyboy.memory[ADDR["map_id"]] = 0
+
+    game.enable_rewind(every=10)
+    game.tick(50)
+    assert game.load_state("route1")
+    assert [e["reason"] for e in game.rewind_ring.entries()] == ["load"]
+
+    game.tick(5)
+    entry = game.rewind(5)
+    assert entry == {"frame": 50, "reason": "load"}
+    assert game.pyboy.memory[ADDR["map_id"]] == 0x0C
+
+
+def test_mash_a_makes_every_press_across_text_boxes(game):
+    box = ADDR["text_box_id"]
+    # A box closes after frame 10 and another opens after frame 30
+    game.pyboy.memory[box] = 1
+    game.pyboy.on_frame = lambda f: game.pyboy.memory.__setitem__(box, 0 if 10 <= f < 30 else 1)
+
+    result = game.mash_a(times=5)
+    assert result["stopped"] is None
+    assert sum("press" in t for t in result["trace"]) == 5
+
+    game.pyboy.frames = 0
+    result = game.mash_a(times=5, until=("text_closed",))
+    assert result["stopped"] == "text_closed"
+    assert sum("press" in t for t in result["trace"]) == 1
+
+
+def test_run_macro_counts_its_closing_render_frame(game):
+    start = game.frame_count
+    result = game.run_macro([{"wait": 10}], until=("map_change",))
+    assert result["frames"] == game.frame_count - start == 11
+    assert game.pyboy.ticks[-1] == (1, True)
+
+    # A stop condition on that last frame (11 + 10 waited + 1) isn't missed
+    game.pyboy.on_frame = lambda f: f == 22 and game.pyboy.memory.__setitem__(ADDR["map_id"], 5)
+    result = game.run_macro([{"wait": 10}], until=("map_change",))
+    assert result["stopped"] == "map_change"
+    assert result["frames"] == 11
+
+
+def test_navigators_warm_flow_fields_once_per_generation(game, monkeypatch):
+    import navigator
+
+    calls = []
+    real = navigator.warm_flow_fields
+    monkeypatch.setattr(navigator, "warm_flow_fields", lambda targets: calls.append(1) or real(targets))
+    monkeypatch.setattr(navigator, "_warmed", (-1, 0))
+
+    for _ in range(3):
+        navigator.Navigator(game, verbose=False).close()
+    assert len(calls) == 1
@@ -0,0 +1,66 @@
+import json
+import shutil
+from pathlib import Path
+
+import map_pack
+import pathfinder
+
+MAPS_DIR = Path(__file__).resolve().parent.parent / "game_state" / "maps"
+
+
+def copy_maps(tmp_path: Path) -> Path:
+    maps_dir = tmp_path / "maps"
+    maps_dir.mkdir()
+    for path in MAPS_DIR.glob("*.json"):
+        shutil.copy2(path, maps_dir / path.name)
+    return maps_dir
+
+
+def test_map_cache_never_writes_the_pack(tmp_path):
+    maps_dir = copy_maps(tmp_path)
+    cache = pathfinder.MapCache(maps_dir)
+    assert cache.all()
+    assert not (maps_dir / map_pack.PACK_NAME).exists()
+
+
+def test_build_pack_leaves_no_temp_file(tmp_path):
+    maps_dir = copy_maps(tmp_path)
+    path = map_pack.build_pack(maps_dir)
+    assert path.exists()
+    assert [p.name for p in maps_dir.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_pack_round_trips_every_bundled_map(tmp_path):
+    maps_dir = copy_maps(tmp_path)
+    map_pack.build_pack(maps_dir)
+    with map_pack.open_pack(maps_dir) as pack:
+        for path in sorted(maps_dir.glob("*.json")):
+            with open(path) as fh:
+                expected = json.load(fh)
+            loaded = pack.load_if_current(path.name, map_pack.file_signature(path))
+            assert loaded is not None, path.name
+            assert loaded[0] == expected, path.name
+
+
+def test_pack_keeps_extra_warp_keys_and_skips_unpackable_tiles(tmp_path):
+    maps_dir = copy_maps(tmp_path)
+    path = maps_dir / "pallet_town.json"
+    with open(path) as fh:
+        data = json.load(fh)
+    warp_key = next(iter(data["warps"]))
+    for info in data["warps"][warp_key].values():
+        info["map_id"] = 0x1FF
+        info["via"] = "door"
+    with open(path, "w") as fh:
+        json.dump(data, fh)
+    odd = maps_dir / "route_1.json"
+    with open(odd) as fh:
+        route = json.load(fh)
+    next(iter(route["tiles"].values()))["up"] = "ledge"
+    with open(odd, "w") as fh:
+        json.dump(route, fh)
+
+    map_pack.build_pack(maps_dir)
+    with map_pack.open_pack(maps_dir) as pack:
+        assert pack.load(path.name)[0] == data
+        assert odd.name not in pack.files()
@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip("pyboy")
+pytest.importorskip("PIL")
+
+import map_scanner  # noqa: E402
+
+
+def test_incomplete_and_missing_tiles():
+    full = {"up": "walk", "down": "blocked", "left": "blocked", "right": "walk"}
+    map_data = {"tiles": {"0,0": full, "1,0": {"up": "blocked", "left": "walk"}}}
+    assert map_scanner.incomplete_tiles(map_data) == {"1,0"}
+    assert map_scanner.missing_tiles(map_data) == {(0, -1)}
+
+
+def test_warp_state_messages_go_to_log():
+    messages, entries = [], []
+    map_scanner._create_warp_state(None, {}, "3,4", "up", {"save_name": "x"}, 1, entries, {},
+                                   log=messages.append)
+    assert entries == []
+    assert messages == ["  Chain-scan: no saved state for warp tile 3,4"]
+
+
+@pytest.fixture
+def scanner(game, tmp_path, monkeypatch):
+    """The game fixture walking in a FakePyBoy world, with scanner output in tmp_path."""
+    for name in ("MAPS_DIR", "CHECKPOINTS_DIR", "REPORTS_DIR"):
+        monkeypatch.setattr(map_scanner, name, tmp_path / name.lower())
+    return game
+
+
+def place(game, walkable, x=0, y=0):
+    from game import ADDR
+    game.pyboy.walkable = walkable
+    game.pyboy.memory[ADDR["player_x"]], game.pyboy.memory[ADDR["player_y"]] = x, y
+
+
+def test_incremental_scan_with_incomplete_neighbor(scanner):
+    # Corridor 0,0 - 3,0. 1,0 is missing, so 2,0 (incomplete) can't be
+    # walked to and is still incomplete when 1,0 infers its edges
+    place(scanner, {(0, 0), (1, 0), (2, 0), (3, 0)})
+    existing = {"tiles": {
+        "0,0": {"up": "blocked", "down": "blocked", "left": "blocked", "right": "walk"},
+        "2,0": {"up": "blocked", "down": "blocked", "right": "walk"},
+        "3,0": {"up": "blocked", "down": "blocked", "left": "walk", "right": "blocked"},
+    }}
+    map_data, _ = map_scanner.scan_map(scanner, verbose=False, existing=existing, checkpoint_every=0,
+                                       report=False)
+    assert map_data["tiles"]["1,0"] == {"up": "blocked", "down": "blocked", "left": "walk", "right": "walk"}
+
+
+ROOM = {(x, y) for x in range(3) for y in range(3)} - {(1, 1)}
+PROBE_TILE = map_scanner.probe_tile
+
+
+def count_probes(monkeypatch, fail_after=None):
+    probed = []
+    probe_tile = PROBE_TILE
+
+    def counted(game, state, cx, cy, *args, **kwargs):
+        if fail_after is not None and len(probed) == fail_after:
+            raise RuntimeError("scan interrupted")
+        probed.append((cx, cy))
+        return probe_tile(game, state, cx, cy, *args, **kwargs)
+
+    monkeypatch.setattr(map_scanner, "probe_tile", counted)
+    return probed
+
+
+def test_scan_resumes_from_checkpoint(scanner, monkeypatch):
+    place(scanner, ROOM)
+    full, _ = map_scanner.scan_map(scanner, verbose=False, checkpoint_every=0, report=False)
+    assert len(full["tiles"]) == 8
+
+    place(scanner, ROOM)
+    count_probes(monkeypatch, fail_after=5)
+    with pytest.raises(RuntimeError):
+        map_scanner.scan_map(scanner, verbose=False, checkpoint_every=2, report=False)
+    checkpoint = map_scanner.load_checkpoint(0)
+    assert len(checkpoint["tiles"]) == 4
+
+    probed = count_probes(monkeypatch)
+    reports = []
+    map_data, _ = map_scanner.scan_map(scanner, verbose=False, checkpoint_every=2, reports=reports)
+    assert map_data["tiles"] == full["tiles"]
+    assert reports[0]["resumed"]
+    assert not {f"{x},{y}" for x, y in probed} & set(checkpoint["tiles"])
+    assert map_scanner.load_checkpoint(0) is None
+
+
+def test_incremental_scan_skips_complete_tiles(scanner, monkeypatch):
+    place(scanner, ROOM)
+    full, _ = map_scanner.scan_map(scanner, verbose=False, checkpoint_every=0, report=False)
+    existing = {"tiles": {k: dict(v) for k, v in full["tiles"].items() if k != "2,2"}}
+    del existing["tiles"]["2,0"]["down"]
+
+    place(scanner, ROOM)
+    probed = count_probes(monkeypatch)
+    map_data, _ = map_scanner.scan_map(scanner, verbose=False, existing=existing, checkpoint_every=0,
+                                       report=False)
+    assert map_data["tiles"] == full["tiles"]
+    assert sorted(probed) == [(2, 0), (2, 2)]
@@ -0,0 +1,106 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pathfinder
+
+
+def test_find_route_unknown_start_or_goal_returns_none():
+    pathfinder.clear_caches()
+    assert pathfinder.find_route("Pallet Town", 9, 12, "Viridian City", 18, 20) is not None
+    assert pathfinder.find_route("Nowhere", 1, 1, "Pallet Town", 9, 12) is None
+    assert pathfinder.find_route("Pallet Town", 9, 12, "Nowhere", 1, 1) is None
+    assert pathfinder.find_route("Pallet Town", -50, -50, "Route 1", 10, 30) is None
+    assert pathfinder.find_route("Pallet Town", 9, 12, "Route 1", -50, -50) is None
+    assert pathfinder.find_route("Pallet Town", 9, 12, "Pallet Town", -50, -50) is None
+    # Cached "no route" answers keep the same failure mode
+    assert pathfinder.find_route("Pallet Town", 9, 12, "Route 1", -50, -50) is None
+    assert pathfinder.route_cache_stats()["hits"] == 1
+
+
+def test_route_problem_names_the_missing_map_or_tile(capsys):
+    assert pathfinder.route_problem("Pallet Town", 9, 12, "Viridian City", 18, 20) is None
+    assert pathfinder.route_problem("Nowhere", 1, 1, "Pallet Town", 9, 12).startswith("map 'Nowhere' not found")
+    assert pathfinder.route_problem("Pallet Town", -50, -50, "Route 1", 10, 30) == \
+        "start tile -50,-50 not in map data for Pallet Town"
+    assert pathfinder.route_problem("Pallet Town", 9, 12, "Route 1", -50, -50) == \
+        "goal tile -50,-50 not in map data for Route 1"
+    assert pathfinder.find_route("Pallet Town", 9, 12, "Route 1", -60, -60) is None
+    assert capsys.readouterr().out == ""
+
+
+def test_jps_matches_astar_lengths_and_auto_matches_astar_sequences():
+    rng = random.Random(0)
+    pathfinder.clear_caches()
+    for name, data in sorted(pathfinder.load_all_maps().items()):
+        tiles = [tuple(int(c) for c in key.split(",")) for key in data["tiles"]]
+        for _ in range(50):
+            (sx, sy), (gx, gy) = rng.choice(tiles), rng.choice(tiles)
+            astar = pathfinder.find_path(name, sx, sy, gx, gy, algorithm="astar")
+            jps = pathfinder.find_path(name, sx, sy, gx, gy, algorithm="jps")
+            auto = pathfinder.find_path(name, sx, sy, gx, gy)
+            auto_jps = pathfinder.find_path(name, sx, sy, gx, gy, jps_auto=True)
+            assert (astar is None) == (jps is None) == (auto_jps is None), (name, sx, sy, gx, gy)
+            if astar is not None:
+                assert len(jps) == len(auto_jps) == len(astar), (name, sx, sy, gx, gy)
+            assert auto == astar, (name, sx, sy, gx, gy)
+
+
+def walk(cm, start, path, blocked):
+    """End index of path from start, asserting every step is a walk into an open tile."""
+    cur = start
+    for direction in path:
+        bit, offset, _direction = cm.moves[pathfinder.DIRECTION_INDEX[direction]]
+        assert cm.grid[cur] & bit and cm.grid[cur + offset] != pathfinder.NO_TILE
+        cur += offset
+        assert cur not in blocked
+    return cur
+
+
+def test_replanner_matches_fresh_astar_after_blocking():
+    rng = random.Random(1)
+    checked = 0
+    pathfinder.clear_caches()
+    for name in ("Pallet Town", "Viridian City", "Route 1"):
+        cm = pathfinder.compile_map(pathfinder.load_map(name))
+        tiles = [i for i, flags in enumerate(cm.grid) if flags != pathfinder.NO_TILE]
+        for _ in range(20):
+            start, goal = rng.choice(tiles), rng.choice(tiles)
+            path = pathfinder._astar(cm, start, goal)
+            if not path or len(path) < 3:
+                continue
+            replanner = pathfinder.replanner_for_path(name, *cm.coords(start), path)
+            on_path = [start]
+            for direction in path:
+                on_path.append(replanner.step_target(on_path[-1], direction))
+            # Walk part of the way, then find the next tile occupied
+            replanner.move_to(on_path[1])
+            blocked = rng.choice(on_path[2:-1])
+            replanner.block(blocked)
+
+            grid = bytearray(cm.grid)
+            grid[blocked] = pathfinder.NO_TILE
+            fresh = pathfinder._astar(
+                pathfinder.CompiledMap.from_grid(name, cm.min_x, cm.min_y, cm.width, cm.height, grid),
+                on_path[1], goal)
+            replanned = replanner.path()
+            checked += 1
+            assert (replanned is None) == (fresh is None), (name, start, goal, blocked)
+            if fresh is not None:
+                assert len(replanned) == len(fresh), (name, start, goal, blocked)
+                assert walk(cm, on_path[1], replanned, {blocked}) == goal
+
+            replanner.unblock(blocked)
+            assert len(replanner.path()) == len(path) - 1
+    assert checked > 30
+
+
+def test_routing_caches_shared_across_threads():
+    queries = [("Pallet Town", 9, 12, "Viridian City", 18, 20), ("Route 1", 10, 30, "Pallet Town", 5, 6),
+               ("Viridian City", 18, 20, "Pallet Town", 9, 12)] * 8
+    pathfinder.clear_caches(compiled=True)
+    expected = [pathfinder._compute_route(*q) for q in queries]
+    for _ in range(5):
+        pathfinder.clear_caches(compiled=True)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(lambda q: pathfinder._compute_route(*q), queries)) == expected
+    assert all(route is not None for route in expected)
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from state_store import SavestateRing, StateStore
+
+BASE = os.urandom(4096)
+
+
+def near(base: bytes, i: int) -> bytes:
+    """base with a few bytes changed, like another tile's savestate."""
+    state = bytearray(base)
+    state[i:i + 8] = os.urandom(8)
+    return bytes(state)
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+def test_delta_and_plain_round_trip(codec):
+    store = StateStore(base=BASE, codec=codec, cache_size=0)
+    states = {"0,0": BASE, "1,0": near(BASE, 100), "short": BASE[:1000], "long": BASE + b"tail"}
+    store.update(states)
+    assert {k: store[k] for k in states} == states
+    assert store._blobs["1,0"][:1] == b"D"
+    assert store._blobs["short"][:1] == store._blobs["long"][:1] == b"P"
+    assert store.stats()["raw_bytes"] == sum(map(len, states.values()))
+
+
+def test_spilled_states_read_back():
+    store = StateStore(base=BASE, cache_size=0, spill_bytes=1)
+    states = {str(i): near(BASE, i * 64) for i in range(10)}
+    store.update(states)
+    stats = store.stats()
+    assert stats["memory_bytes"] == 0 and stats["spilled_bytes"] > 0
+    assert {k: store[k] for k in reversed(list(states))} == states
+    store.close()
+
+
+def test_delete_keeps_byte_accounting():
+    store = StateStore(base=BASE, spill_bytes=0)
+    store["a"] = near(BASE, 0)
+    store["b"] = BASE + b"x"
+    del store["a"]
+    stats = store.stats()
+    assert stats["raw_bytes"] == len(BASE) + 1
+    assert stats["memory_bytes"] == len(store._blobs["b"])
+    assert "a" not in store and "a" not in store._cache
+
+    spilling = StateStore(base=BASE, spill_bytes=1)
+    spilling["a"] = near(BASE, 0)
+    spilling["b"] = near(BASE, 64)
+    spilling["a"] = near(BASE, 128)  # overwrite deletes the old blob first
+    del spilling["b"]
+    stats = spilling.stats()
+    assert stats["states"] == 1
+    assert stats["raw_bytes"] == len(BASE)
+    assert stats["spilled_bytes"] == spilling._blobs["a"][1]
+    spilling.close()
+
+
+def test_ring_truncate_and_clear():
+    ring = SavestateRing(capacity=4)
+    states = [near(BASE, frame) for frame in range(6)]
+    for frame, state in enumerate(states, 1):
+        ring.push(frame * 10, state)
+    assert [e["frame"] for e in ring.entries()] == [30, 40, 50, 60]
+    assert ring.store.base == states[0]  # Kept after its own entry is dropped
+    assert ring.get(60) == states[5]
+
+    ring.truncate(45)
+    assert [e["frame"] for e in ring.entries()] == [30, 40]
+    assert ring.find(100) == (40, "periodic")
+
+    ring.clear()
+    assert len(ring) == 0 and ring.store.base is None
+    assert ring.stats()["raw_bytes"] == 0
+    other = BASE[::-1]
+    ring.push(5, other, "load")
+    assert ring.store.base == other
+    assert ring.get(5) == other